@@ -6,6 +6,7 @@ Common definitions for
 """
 
 import contextlib
+import json
 import os
 import shutil
 import subprocess
@@ -25,6 +26,11 @@ TEST_REPORT_DIR = os.path.join(TOP_DIR, "test-results", "html")
 TEST_TMPL_DIR = os.path.join(_basedir, "templates")
 TEST_STATIC_DIR = os.path.join(_basedir, "static")
 
+# Cache for the dependencies between framework wrappers, the information
+# for a wrapper is updated when its setup.py is changed.
+DEPENDENCY_CACHE = os.path.join(TOP_DIR, ".framework-dependencies.json")
+_DEPENDENCY_CACHE_VERSION = 1
+
 
 def mac_ver():
     # Return a macOS version string that includes the Build ID
@@ -153,11 +159,74 @@ def setup_variant(ver, variant):
     os.symlink(variant, tgt)
 
 
+def _framework_requires(setup):
+    """
+    Return the framework wrappers in install_requires in *setup*
+    """
+    requires = None
+    with open(setup) as fp:
+        for ln in fp:
+            if requires is None:
+                if ln.strip().startswith("install_requires"):
+                    requires = []
+
+                    if "]" in ln:
+                        # Dependencies on a single line
+                        start = ln.find("[")
+                        deps = ln[start + 1 :].strip().split(",")
+                        for d in deps:
+                            d = d.strip()[1:]
+                            if d.startswith("pyobjc-framework-"):
+                                d = d.split(">")[0]
+                                requires.append(d)
+            else:
+                if ln.strip().startswith("]"):
+                    break
+
+                dep = ln.strip()[1:-1]
+                if dep.startswith("pyobjc-framework"):
+                    dep = dep.split(">")[0]
+                    requires.append(dep)
+
+    return requires or []
+
+
+def _load_dependency_cache():
+    try:
+        with open(DEPENDENCY_CACHE) as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != _DEPENDENCY_CACHE_VERSION:
+        return {}
+    return data.get("wrappers", {})
+
+
+def _save_dependency_cache(wrappers):
+    tmp_path = f"{DEPENDENCY_CACHE}.{os.getpid()}"
+    try:
+        with open(tmp_path, "w") as fp:
+            json.dump(
+                {"version": _DEPENDENCY_CACHE_VERSION, "wrappers": wrappers},
+                fp,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, DEPENDENCY_CACHE)
+    except OSError:
+        pass
+
+
 def sort_framework_wrappers():
     """
     Returns a list of framework wrappers in the order they should
     be build in.
+
+    Raises _topsort.CycleError when there is a dependency cycle.
     """
+    cache = _load_dependency_cache()
+    wrappers = {}
     frameworks = []
     partial_order = []
 
@@ -166,35 +235,19 @@ def sort_framework_wrappers():
             continue
 
         setup = os.path.join(TOP_DIR, subdir, "setup.py")
+        mtime = os.stat(setup).st_mtime_ns
 
-        requires = None
-        with open(setup) as fp:
-            for ln in fp:
-                if requires is None:
-                    if ln.strip().startswith("install_requires"):
-                        requires = []
-
-                        if "]" in ln:
-                            # Dependencies on a single line
-                            start = ln.find("[")
-                            deps = ln[start + 1 :].strip().split(",")
-                            for d in deps:
-                                d = d.strip()[1:]
-                                if d.startswith("pyobjc-framework-"):
-                                    d = d.split(">")[0]
-                                    requires.append(d)
-                else:
-                    if ln.strip().startswith("]"):
-                        break
-
-                    dep = ln.strip()[1:-1]
-                    if dep.startswith("pyobjc-framework"):
-                        dep = dep.split(">")[0]
-                        requires.append(dep)
+        info = cache.get(subdir)
+        if info is None or info.get("mtime") != mtime:
+            info = {"mtime": mtime, "requires": _framework_requires(setup)}
+        wrappers[subdir] = info
 
         frameworks.append(subdir)
-        for dep in requires:
+        for dep in info["requires"]:
             partial_order.append((dep, subdir))
 
+    if wrappers != cache:
+        _save_dependency_cache(wrappers)
+
     frameworks = topological_sort(frameworks, partial_order)
     return frameworks
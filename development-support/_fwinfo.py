@@ -0,0 +1,883 @@
+"""
+Access to the raw framework metadata (``metadata/raw*/<arch>-<sdk>.fwinfo``)
+of the framework wrappers, and an SQLite index over those files.
+
+The raw metadata for a framework can also be stored as a snapshot store
+(``metadata/raw*.fwdelta``) with one base snapshot and structural deltas
+for the other snapshots.
+
+Used by:
+- fwinfo-index
+- fwinfo-store
+"""
+
+import bisect
+import collections
+import contextlib
+import difflib
+import functools
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+
+from _common_definitions import TOP_DIR
+
+# Index over all raw metadata files, can be recreated at any time.
+INDEX_PATH = os.path.join(TOP_DIR, ".fwinfo-index.sqlite")
+
+# Increment when the schema or the extracted information changes,
+# the index is recreated when the version doesn't match.
+_INDEX_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    wrapper TEXT NOT NULL,
+    framework TEXT NOT NULL,
+    arch TEXT NOT NULL,
+    sdk TEXT NOT NULL,
+    sdk_order INTEGER NOT NULL,
+    release TEXT
+);
+
+CREATE TABLE definitions (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    owner TEXT,
+    name TEXT NOT NULL,
+    typestr TEXT,
+    value TEXT NOT NULL
+);
+
+CREATE INDEX files_key ON files(framework, arch, sdk_order);
+CREATE INDEX definitions_name ON definitions(name, kind);
+CREATE INDEX definitions_typestr ON definitions(typestr);
+CREATE INDEX definitions_file ON definitions(file_id);
+
+CREATE VIEW entries AS
+    SELECT files.wrapper, files.framework, files.arch, files.sdk, files.sdk_order,
+           definitions.kind, definitions.owner, definitions.name,
+           definitions.typestr, definitions.value
+    FROM definitions JOIN files ON files.id = definitions.file_id;
+"""
+
+# Sections of "definitions" where the entries contain methods and
+# properties, those are indexed separately with the section entry
+# as their owner.
+_CONTAINERS = ("classes", "formal_protocols", "informal_protocols")
+
+Entry = collections.namedtuple(
+    "Entry", "wrapper framework arch sdk kind owner name typestr value"
+)
+
+
+# Suffix of snapshot stores, the store for "metadata/raw.Foundation"
+# is "metadata/raw.Foundation.fwdelta".
+STORE_SUFFIX = ".fwdelta"
+
+_STORE_VERSION = 1
+
+
+def raw_metadata_files(root=TOP_DIR):
+    """
+    Yield the paths of all raw metadata files in the framework wrappers
+    in *root*
+    """
+    yield from sorted(
+        glob.glob(
+            os.path.join(root, "pyobjc-framework-*", "metadata", "raw*", "*.fwinfo")
+        )
+    )
+
+
+def snapshot_stores(root=TOP_DIR):
+    """
+    Yield the paths of all snapshot stores in the framework wrappers
+    in *root*
+    """
+    yield from sorted(
+        glob.glob(
+            os.path.join(root, "pyobjc-framework-*", "metadata", "raw*" + STORE_SUFFIX)
+        )
+    )
+
+
+def raw_metadata_sources(root=TOP_DIR):
+    """
+    Yield (relpath, path, name, load) for all raw metadata snapshots in
+    *root*, both plain files and snapshots in stores. *path* is the file
+    containing the snapshot, *name* is "<arch>-<sdk>" and *load* is a
+    function that returns the metadata.
+
+    Snapshots in a store are skipped when the raw metadata directory
+    also contains them as a plain file.
+    """
+    sources = []
+    for path in raw_metadata_files(root):
+        name = os.path.splitext(os.path.basename(path))[0]
+        sources.append(
+            (
+                os.path.relpath(path, root),
+                path,
+                name,
+                functools.partial(load_fwinfo, path),
+            )
+        )
+
+    for path in snapshot_stores(root):
+        store = SnapshotStore(path)
+        directory = path[: -len(STORE_SUFFIX)]
+        for name in store.names():
+            if os.path.exists(os.path.join(directory, name + ".fwinfo")):
+                continue
+            sources.append(
+                (
+                    os.path.relpath(path, root) + "#" + name,
+                    path,
+                    name,
+                    functools.partial(store.view, name),
+                )
+            )
+
+    sources.sort()
+    return sources
+
+
+def load_fwinfo(path):
+    """
+    Load a metadata file, those are JSON files with a header of
+    comment lines ("//" or "#").
+    """
+    return parse_fwinfo(read_text(path))
+
+
+def read_text(path):
+    # Read without newline translation, snapshots must be reproduced
+    # exactly.
+    with open(path, "rb") as fp:
+        return fp.read().decode("utf-8")
+
+
+def _split_header(text):
+    start = 0
+    while text.startswith(("//", "#"), start):
+        start = text.index("\n", start) + 1
+    return text[:start], text[start:]
+
+
+def parse_fwinfo(text):
+    return json.loads(_split_header(text)[1])
+
+
+#
+# Snapshot stores
+#
+# A delta describes how to transform one JSON value into another, and is
+# None when the values are the same or a dictionary with one key:
+#
+# - {"=": value}: replace by value
+# - {"{": {"~": {key: delta}, "+": {key: value}, "-": [key, ...],
+#          "o": [key, ...]}}: update a dictionary, "o" is the key order
+#   of the result when that differs from the original order followed
+#   by the new keys.
+# - {"[": [[start, end, items], ...]}: replace slices of a list, items
+#   is either a list of new items or {"~": [delta, ...]} with deltas for
+#   the items in the slice.
+#
+
+
+def _item_key(value):
+    # Sensitive to key order and the difference between 1, 1.0 and true
+    return json.dumps(value)
+
+
+def make_delta(old, new):
+    """
+    Return the delta between two JSON values
+    """
+    if type(old) is not type(new):
+        return {"=": new}
+    if isinstance(old, dict):
+        return _dict_delta(old, new)
+    if isinstance(old, list):
+        return _list_delta(old, new)
+    if old == new:
+        return None
+    return {"=": new}
+
+
+def _dict_delta(old, new):
+    changed = {}
+    added = {}
+    for key, value in new.items():
+        if key in old:
+            delta = make_delta(old[key], value)
+            if delta is not None:
+                changed[key] = delta
+        else:
+            added[key] = value
+    removed = [key for key in old if key not in new]
+
+    result = {}
+    if changed:
+        result["~"] = changed
+    if added:
+        result["+"] = added
+    if removed:
+        result["-"] = removed
+
+    order = list(new)
+    if order != [key for key in old if key in new] + list(added):
+        result["o"] = order
+
+    if not result:
+        return None
+    return {"{": result}
+
+
+def _list_delta(old, new):
+    old_keys = [_item_key(value) for value in old]
+    new_keys = [_item_key(value) for value in new]
+    if old_keys == new_keys:
+        return None
+
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1:
+            ops.append(
+                [
+                    i1,
+                    i2,
+                    {
+                        "~": [
+                            make_delta(old[i], new[j])
+                            for i, j in zip(range(i1, i2), range(j1, j2))
+                        ]
+                    },
+                ]
+            )
+        else:
+            ops.append([i1, i2, new[j1:j2]])
+    return {"[": ops}
+
+
+def apply_delta(value, delta):
+    """
+    Return the result of applying *delta* to *value*. The result shares
+    unchanged parts with *value* and *delta*, neither is modified.
+    """
+    if delta is None:
+        return value
+    if "=" in delta:
+        return delta["="]
+
+    if "{" in delta:
+        delta = delta["{"]
+        changed = delta.get("~", {})
+        removed = set(delta.get("-", ()))
+        result = {}
+        for key, item in value.items():
+            if key in removed:
+                continue
+            if key in changed:
+                item = apply_delta(item, changed[key])
+            result[key] = item
+        result.update(delta.get("+", {}))
+        if "o" in delta:
+            result = {key: result[key] for key in delta["o"]}
+        return result
+
+    result = []
+    pos = 0
+    for start, end, items in delta["["]:
+        result.extend(value[pos:start])
+        if isinstance(items, dict):
+            result.extend(
+                apply_delta(item, item_delta)
+                for item, item_delta in zip(value[start:end], items["~"])
+            )
+        else:
+            result.extend(items)
+        pos = end
+    result.extend(value[pos:])
+    return result
+
+
+def _render(value, sort_keys):
+    # The layout used by objective-metadata-tool, that is the output of
+    # json.dumps(value, indent=1, sort_keys=sort_keys). This doesn't use
+    # json.dumps because the encoder with indentation is slow.
+    parts = []
+    _render_value(value, "\n", sort_keys, parts.append)
+    parts.append("\n")
+    return "".join(parts)
+
+
+def _render_value(value, indent, sort_keys, write):
+    if isinstance(value, str):
+        write(_encode_string(value))
+
+    elif isinstance(value, dict):
+        if not value:
+            write("{}")
+            return
+        inner = indent + " "
+        separator = "{" + inner
+        items = sorted(value.items()) if sort_keys else value.items()
+        for key, item in items:
+            write(separator)
+            write(_encode_string(key))
+            write(": ")
+            _render_value(item, inner, sort_keys, write)
+            separator = "," + inner
+        write(indent + "}")
+
+    elif isinstance(value, list):
+        if not value:
+            write("[]")
+            return
+        inner = indent + " "
+        separator = "[" + inner
+        for item in value:
+            write(separator)
+            _render_value(item, inner, sort_keys, write)
+            separator = "," + inner
+        write(indent + "]")
+
+    elif value is True:
+        write("true")
+
+    elif value is False:
+        write("false")
+
+    elif value is None:
+        write("null")
+
+    elif isinstance(value, int):
+        write(int.__repr__(value))
+
+    else:
+        write(json.dumps(value))
+
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+
+def _line_fixup(rendered, body):
+    # Line based changes for snapshots that were edited by hand after
+    # they were generated.
+    old = rendered.splitlines(True)
+    new = body.splitlines(True)
+    fixup = []
+    _diff_lines(old, 0, len(old), new, 0, len(new), fixup)
+    return fixup
+
+
+def _diff_lines(old, o1, o2, new, n1, n2, fixup):
+    # Patience diff: difflib.SequenceMatcher is too slow for files with
+    # many identical lines ("},").
+    while o1 < o2 and n1 < n2 and old[o1] == new[n1]:
+        o1 += 1
+        n1 += 1
+    while o1 < o2 and n1 < n2 and old[o2 - 1] == new[n2 - 1]:
+        o2 -= 1
+        n2 -= 1
+    if o1 == o2 and n1 == n2:
+        return
+
+    # Lines that occur once in both ranges are matched up, the longest
+    # increasing subsequence of those are the anchors for the diff.
+    old_counts = collections.Counter(old[o1:o2])
+    new_counts = collections.Counter(new[n1:n2])
+    new_index = {
+        line: idx
+        for idx, line in enumerate(new[n1:n2], n1)
+        if new_counts[line] == 1 and old_counts[line] == 1
+    }
+    pairs = [
+        (idx, new_index[line])
+        for idx, line in enumerate(old[o1:o2], o1)
+        if line in new_index
+    ]
+    anchors = _longest_increasing(pairs)
+    if not anchors:
+        fixup.append([o1, o2, new[n1:n2]])
+        return
+
+    for i, j in anchors:
+        _diff_lines(old, o1, i, new, n1, j, fixup)
+        o1, n1 = i + 1, j + 1
+    _diff_lines(old, o1, o2, new, n1, n2, fixup)
+
+
+def _longest_increasing(pairs):
+    # Longest subsequence of *pairs* where the second items are increasing
+    tails = []
+    tail_values = []
+    previous = []
+    for idx, (_, value) in enumerate(pairs):
+        pos = bisect.bisect_left(tail_values, value)
+        previous.append(tails[pos - 1] if pos else None)
+        if pos == len(tails):
+            tails.append(idx)
+            tail_values.append(value)
+        else:
+            tails[pos] = idx
+            tail_values[pos] = value
+
+    result = []
+    idx = tails[-1] if tails else None
+    while idx is not None:
+        result.append(pairs[idx])
+        idx = previous[idx]
+    result.reverse()
+    return result
+
+
+def _apply_fixup(rendered, fixup):
+    lines = rendered.splitlines(True)
+    for start, end, replacement in reversed(fixup):
+        lines[start:end] = replacement
+    return "".join(lines)
+
+
+def _snapshot_format(value, body):
+    # Returns (sort_keys, fixup) for reproducing *body* from *value*
+    rendered = {}
+    for sort_keys in (True, False):
+        rendered[sort_keys] = _render(value, sort_keys)
+        if rendered[sort_keys] == body:
+            return sort_keys, None
+
+    candidates = [
+        (sort_keys, _line_fixup(text, body)) for sort_keys, text in rendered.items()
+    ]
+    return min(candidates, key=lambda item: len(_item_key(item[1])))
+
+
+def pack_snapshots(directory):
+    """
+    Return a snapshot store (as a JSON value) for the raw metadata files
+    in *directory*. The snapshot for the newest SDK is the base snapshot.
+    """
+    texts = {}
+    for path in glob.glob(os.path.join(directory, "*.fwinfo")):
+        texts[os.path.splitext(os.path.basename(path))[0]] = read_text(path)
+    if not texts:
+        raise ValueError(f"No raw metadata files in {directory!r}")
+
+    def order(name):
+        arch, _, sdk = name.partition("-")
+        return (sdk_order(sdk), arch)
+
+    names = sorted(texts, key=order)
+    base_name = names[-1]
+
+    snapshots = {}
+    for name in reversed(names):
+        header, body = _split_header(texts[name])
+        value = json.loads(body)
+        sort_keys, fixup = _snapshot_format(value, body)
+
+        snapshot = {"header": header, "sort_keys": sort_keys}
+        if name == base_name:
+            snapshot["value"] = base_value = value
+        else:
+            snapshot["delta"] = make_delta(base_value, value)
+        if fixup:
+            snapshot["fixup"] = fixup
+        snapshots[name] = snapshot
+
+    store = {"version": _STORE_VERSION, "base": base_name, "snapshots": snapshots}
+
+    # Fall back to storing the text for snapshots that cannot be
+    # reproduced, that should never be needed.
+    reader = SnapshotStore.from_value(store)
+    for name, text in texts.items():
+        if reader.text(name) != text:
+            snapshots[name] = {"text": text}
+
+    return store
+
+
+def write_store(store, path):
+    """
+    Write a snapshot store to *path*
+    """
+    with open(path, "w", encoding="utf-8", newline="\n") as fp:
+        # Key order is significant for snapshots without sorted keys
+        json.dump(store, fp, indent=1)
+        fp.write("\n")
+
+
+class SnapshotStore:
+    """
+    Reader for a snapshot store. The store is loaded on first use and
+    snapshots are reconstructed when they are requested.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._store = None
+        self._views = {}
+
+    @classmethod
+    def from_value(cls, store):
+        result = cls(None)
+        result._store = store
+        return result
+
+    def _snapshots(self):
+        if self._store is None:
+            with open(self.path, encoding="utf-8") as fp:
+                store = json.load(fp)
+            if store.get("version") != _STORE_VERSION:
+                raise ValueError(
+                    f"{self.path}: unsupported store version {store.get('version')!r}"
+                )
+            self._store = store
+        return self._store["snapshots"]
+
+    def names(self):
+        """
+        Return the names ("<arch>-<sdk>") of the snapshots in the store
+        """
+        return sorted(self._snapshots())
+
+    def view(self, name):
+        """
+        Return the metadata for snapshot *name*. The result shares data
+        with other snapshots and must not be modified.
+        """
+        try:
+            return self._views[name]
+        except KeyError:
+            pass
+
+        snapshot = self._snapshots()[name]
+        if "text" in snapshot:
+            result = parse_fwinfo(snapshot["text"])
+        elif "value" in snapshot:
+            result = snapshot["value"]
+        else:
+            result = apply_delta(self.view(self._store["base"]), snapshot["delta"])
+        self._views[name] = result
+        return result
+
+    def load(self, name):
+        """
+        Return a copy of the metadata for snapshot *name*
+        """
+        return json.loads(json.dumps(self.view(name)))
+
+    def text(self, name):
+        """
+        Return the contents of the raw metadata file for snapshot *name*
+        """
+        snapshot = self._snapshots()[name]
+        if "text" in snapshot:
+            return snapshot["text"]
+
+        body = _render(self.view(name), snapshot["sort_keys"])
+        if "fixup" in snapshot:
+            body = _apply_fixup(body, snapshot["fixup"])
+        return snapshot["header"] + body
+
+    def materialize(self, directory, names=None):
+        """
+        Write the raw metadata files for *names* (default: all snapshots)
+        to *directory*
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in self.names() if names is None else names:
+            with open(
+                os.path.join(directory, name + ".fwinfo"),
+                "w",
+                encoding="utf-8",
+                newline="",
+            ) as fp:
+                fp.write(self.text(name))
+
+
+def sdk_order(sdk):
+    """
+    Return an integer that sorts SDK versions ("10.8" < "10.10")
+    """
+    parts = [int(p) for p in sdk.split(".")[:3]]
+    parts += [0] * (3 - len(parts))
+    return parts[0] * 10000 + parts[1] * 100 + parts[2]
+
+
+def _signature(info, implicit=""):
+    # Not all raw metadata has type encodings for every argument
+    parts = [info.get("retval", {}).get("typestr")]
+    parts.extend(arg.get("typestr") for arg in info.get("args", ()))
+    if None in parts:
+        return None
+    return parts[0] + implicit + "".join(parts[1:])
+
+
+def _encode(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def definition_rows(info):
+    """
+    Yield (kind, owner, name, typestr, value) for the definitions in
+    a metadata file, *value* is the definition as JSON.
+    """
+    for kind, section in sorted(info["definitions"].items()):
+        for name, value in section.items():
+            if kind in _CONTAINERS:
+                for method in value.get("methods", ()):
+                    yield (
+                        "methods",
+                        name,
+                        method["selector"],
+                        _signature(method, "@:"),
+                        _encode(method),
+                    )
+                for prop in value.get("properties", ()):
+                    yield (
+                        "properties",
+                        name,
+                        prop["name"],
+                        prop.get("typestr"),
+                        _encode(prop),
+                    )
+
+                value = {
+                    k: v for k, v in value.items() if k not in ("methods", "properties")
+                }
+                typestr = None
+
+            elif kind == "functions":
+                typestr = _signature(value)
+
+            elif isinstance(value, dict):
+                typestr = value.get("typestr")
+
+            else:
+                typestr = None
+
+            yield (kind, None, name, typestr, _encode(value))
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FwinfoIndex:
+    """
+    SQLite index over the raw metadata files.
+
+    The index is keyed by (framework, arch, sdk, kind, name), methods and
+    properties of classes and protocols have kind "methods" and "properties"
+    and the name of the class or protocol as their owner.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA foreign_keys = ON")
+
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != _INDEX_VERSION:
+            self._create()
+
+    def _create(self):
+        with self._db:
+            for (table_type, name) in self._db.execute(
+                "SELECT type, name FROM sqlite_master"
+                " WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'"
+            ).fetchall():
+                self._db.execute(f"DROP {table_type.upper()} IF EXISTS {name}")
+            self._db.executescript(_SCHEMA)
+            self._db.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, root=TOP_DIR, verbose=False):
+        """
+        Update the index for the raw metadata files and snapshot stores
+        in *root*. Files that are unchanged since the last update are
+        skipped.
+
+        Returns the number of updated, unchanged and removed files.
+        """
+        known = {
+            path: (file_id, size, mtime_ns, digest)
+            for file_id, path, size, mtime_ns, digest in self._db.execute(
+                "SELECT id, path, size, mtime_ns, digest FROM files"
+            )
+        }
+        updated = unchanged = 0
+        digests = {}
+
+        for relpath, path, name, load in raw_metadata_sources(root):
+            st = os.stat(path)
+            current = known.pop(relpath, None)
+            if current is not None and current[1:3] == (st.st_size, st.st_mtime_ns):
+                unchanged += 1
+                continue
+
+            # Snapshots in a store share the digest of the store
+            digest = digests.get(path)
+            if digest is None:
+                digest = digests[path] = _file_digest(path)
+
+            with self._db:
+                if current is not None and current[3] == digest:
+                    self._db.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                        (st.st_size, st.st_mtime_ns, current[0]),
+                    )
+                    unchanged += 1
+                    continue
+
+                if verbose:
+                    print(relpath)
+
+                if current is not None:
+                    self._db.execute("DELETE FROM files WHERE id = ?", (current[0],))
+                self._ingest(relpath, name, load(), st, digest)
+                updated += 1
+
+        with self._db:
+            for file_id, *_ in known.values():
+                self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+        return updated, unchanged, len(known)
+
+    def _ingest(self, relpath, name, info, st, digest):
+        arch, _, sdk = name.partition("-")
+        cursor = self._db.execute(
+            "INSERT INTO files (path, size, mtime_ns, digest, wrapper, framework,"
+            " arch, sdk, sdk_order, release) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                relpath,
+                st.st_size,
+                st.st_mtime_ns,
+                digest,
+                relpath.split(os.sep, 1)[0],
+                info["framework"],
+                arch,
+                sdk,
+                sdk_order(sdk),
+                info.get("release"),
+            ),
+        )
+        file_id = cursor.lastrowid
+        self._db.executemany(
+            "INSERT INTO definitions (file_id, kind, owner, name, typestr, value)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            ((file_id,) + row for row in definition_rows(info)),
+        )
+
+    def query(
+        self,
+        name=None,
+        kind=None,
+        framework=None,
+        arch=None,
+        sdk=None,
+        owner=None,
+        typestr=None,
+        wrapper=None,
+        glob=False,
+    ):
+        """
+        Return the entries matching all arguments that aren't None. The
+        *name*, *owner* and *typestr* are glob patterns when *glob* is true,
+        type encodings contain "?" and "[" and are compared exactly otherwise.
+        """
+        sql, args = self._where(
+            glob,
+            name=name,
+            kind=kind,
+            framework=framework,
+            arch=arch,
+            sdk=sdk,
+            owner=owner,
+            typestr=typestr,
+            wrapper=wrapper,
+        )
+        return [
+            Entry(*row)
+            for row in self._db.execute(
+                "SELECT wrapper, framework, arch, sdk, kind, owner, name, typestr,"
+                " value FROM entries" + sql + " ORDER BY framework, kind, owner,"
+                " name, arch, sdk_order",
+                args,
+            )
+        ]
+
+    def first_seen(self, name, kind=None, owner=None, glob=False):
+        """
+        Return (framework, kind, owner, name, arch, sdk) for the first SDK
+        that contains the definition, per framework and architecture.
+        *name* and *owner* are glob patterns when *glob* is true.
+        """
+        sql, args = self._where(glob, name=name, kind=kind, owner=owner)
+        # SQLite returns the values of the row with the minimal
+        # value for the bare columns in an aggregate query.
+        return [
+            row[:-1]
+            for row in self._db.execute(
+                "SELECT framework, kind, owner, name, arch, sdk, MIN(sdk_order)"
+                " FROM entries" + sql + " GROUP BY framework, kind, owner, name, arch"
+                " ORDER BY framework, kind, owner, name, MIN(sdk_order), arch",
+                args,
+            )
+        ]
+
+    def _where(self, glob, **criteria):
+        clauses = []
+        args = []
+        for column, value in criteria.items():
+            if value is None:
+                continue
+            if glob and column in ("name", "owner", "typestr"):
+                clauses.append(f"{column} GLOB ?")
+            else:
+                clauses.append(f"{column} = ?")
+            args.append(value)
+
+        if not clauses:
+            return "", args
+        return " WHERE " + " AND ".join(clauses), args
+
+
+@contextlib.contextmanager
+def open_index(path=INDEX_PATH, update=True, verbose=False):
+    """
+    Context manager that opens the index, updating it first when *update*
+    is true.
+    """
+    index = FwinfoIndex(path)
+    try:
+        if update:
+            index.update(verbose=verbose)
+        yield index
+    finally:
+        index.close()
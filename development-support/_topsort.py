@@ -7,6 +7,21 @@ Original topological sort code written by Ofer Faigon
 (www.bitformation.com) and used with permission
 """
 
+import heapq
+
+
+class CycleError(ValueError):
+    """
+    The partial order contains a loop, the *cycle* attribute contains
+    the items in one of the loops, in order.
+    """
+
+    def __init__(self, cycle):
+        super().__init__(
+            "dependency cycle: " + " -> ".join(map(str, cycle + cycle[:1]))
+        )
+        self.cycle = cycle
+
 
 def topological_sort(items, partial_order):
     """
@@ -14,66 +29,71 @@ def topological_sort(items, partial_order):
     items is a list of items to be sorted.
     partial_order is a list of pairs. If pair (a,b) is in it, it means
     that item a should appear before item b.
-    Returns a list of the items in one of the possible orders, or None
-    if partial_order contains a loop.
+    Returns a list of the items in one of the possible orders, when there
+    are multiple options the smallest item is used first. Raises
+    CycleError if partial_order contains a loop.
     """
 
-    def add_node(graph, node):
-        """Add a node to the graph if not already exists."""
-        if node not in graph:
-            graph[node] = [0]  # 0 = number of arcs coming into this node.
-
-    def add_arc(graph, fromnode, tonode):
-        """Add an arc to a graph. Can create multiple arcs.
-        The end nodes must already exist."""
-        graph[fromnode].append(tonode)
-        # Update the count of incoming arcs in tonode.
-        graph[tonode][0] += 1
-
     # step 1 - create a directed graph with an arc a->b for each input
     # pair (a,b).
-    # The graph is represented by a dictionary. The dictionary contains
-    # a pair item:list for each node in the graph. /item/ is the value
-    # of the node. /list/'s 1st item is the count of incoming arcs, and
-    # the rest are the destinations of the outgoing arcs. For example:
-    #           {'a':[0,'b','c'], 'b':[1], 'c':[1]}
-    # represents the graph:   c <-- a --> b
-    # The graph may contain loops and multiple arcs.
-    # Note that our representation does not contain reference loops to
-    # cause GC problems even when the represented graph contains loops,
-    # because we keep the node names rather than references to the nodes.
-    graph = {}
+    # The graph is represented by two dictionaries: *incoming* contains
+    # the count of incoming arcs for each node, and *outgoing* contains the
+    # destinations of the outgoing arcs. The graph may contain loops and
+    # multiple arcs.
+    incoming = {}
+    outgoing = {}
     for v in items:
-        add_node(graph, v)
+        incoming.setdefault(v, 0)
+        outgoing.setdefault(v, [])
     for a, b in partial_order:
-        add_arc(graph, a, b)
+        # The end nodes must be in *items*
+        outgoing[a].append(b)
+        incoming[b] += 1
 
     # Step 2 - find all roots (nodes with zero incoming arcs).
-    roots = [node for (node, nodeinfo) in graph.items() if nodeinfo[0] == 0]
+    roots = [node for (node, count) in incoming.items() if count == 0]
+    heapq.heapify(roots)
 
-    # step 3 - repeatedly emit a root and remove it from the graph. Removing
-    # a node may convert some of the node's direct children into roots.
-    # Whenever that happens, we append the new roots to the list of
-    # current roots.
+    # step 3 - repeatedly emit the smallest root and remove it from the
+    # graph. Removing a node may convert some of the node's direct children
+    # into roots, those are added to the heap of current roots.
     sorted_items = []
-    while len(roots) != 0:
-        # If len(roots) is always 1 when we get here, it means that
-        # the input describes a complete ordering and there is only
-        # one possible output.
-        # When len(roots) > 1, we can choose any root to send to the
-        # output; this freedom represents the multiple complete orderings
-        # that satisfy the input restrictions. We arbitrarily take one of
-        # the roots using pop(). Note that for the algorithm to be efficient,
-        # this operation must be done in O(1) time.
-        roots.sort(reverse=True)
-        root = roots.pop()
+    while roots:
+        root = heapq.heappop(roots)
         sorted_items.append(root)
-        for child in graph[root][1:]:
-            graph[child][0] = graph[child][0] - 1
-            if graph[child][0] == 0:
-                roots.append(child)
-        del graph[root]
-    if len(graph.items()) != 0:
+        for child in outgoing[root]:
+            incoming[child] -= 1
+            if incoming[child] == 0:
+                heapq.heappush(roots, child)
+        del incoming[root]
+
+    if incoming:
         # There is a loop in the input.
-        return None
+        raise CycleError(_find_cycle(incoming, outgoing))
     return sorted_items
+
+
+def _find_cycle(remaining, outgoing):
+    """
+    Return a cycle in the part of the graph that could not be sorted.
+
+    Every node in *remaining* has an incoming arc from another node in
+    *remaining*, walking those arcs backwards must end in a cycle.
+    """
+    predecessor = {}
+    for node in remaining:
+        for child in outgoing[node]:
+            if child in remaining:
+                predecessor.setdefault(child, node)
+
+    node = min(remaining)
+    path = []
+    seen = {}
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = predecessor[node]
+
+    cycle = path[seen[node] :]
+    cycle.reverse()
+    return cycle
@@ -11,10 +11,16 @@ Public API:
     getKey(obj, key) -> value
     getKeyPath (obj, keypath) -> value
 
+    compileKeyPath(keypath) -> accessor
+
 A keypath is a string containing a sequence of keys separated by dots. The
 path is followed by repeated calls to 'getKey'. This can be used to easily
 access nested attributes.
 
+'compileKeyPath' returns a callable that is equivalent to calling 'getKeyPath'
+with the given keypath, but is faster when evaluating the same keypath for
+a large number of Python objects.
+
 This API is mirroring the 'getattr' and 'setattr' APIs in Python, this makes
 it more natural to work with Key-Value coding from Python. It also doesn't
 require changes to existing Python classes to make use of Key-Value coding,
@@ -27,12 +33,20 @@ weaker coupling between the view and model layers.
 """
 
 import collections.abc
+import functools
+import sys
 import types
+import weakref
 
 import objc
 
-__all__ = ("getKey", "setKey", "getKeyPath", "setKeyPath")
+__all__ = ("getKey", "setKey", "getKeyPath", "setKeyPath", "compileKeyPath")
 _null = objc.lookUpClass("NSNull").null()
+_objc_types = (objc.objc_object, objc.objc_class)
+
+# Integers in this range can be converted to float without loss of precision
+_MAX_EXACT_INT = 2**53
+_int_types = {int, bool}
 
 
 def keyCaps(s):
@@ -65,15 +79,93 @@ def msum(iterable):
     return sum(partials, 0.0)
 
 
+def _float_sum(values):
+    """
+    Returns 'msum(float(x) if x is not _null else 0.0 for x in values)',
+    with a fast path for sequences of integers.
+    """
+    if _is_numeric_array(values):
+        values = values.tolist()
+
+    if type(values) is list and set(map(type, values)) <= _int_types:
+        # The sum of integers is exact when the values and the sum
+        # can be represented exactly as a float.
+        if values and min(values) >= -_MAX_EXACT_INT and max(values) <= _MAX_EXACT_INT:
+            total = sum(values)
+            if -_MAX_EXACT_INT <= total <= _MAX_EXACT_INT:
+                return float(total)
+
+    return msum(float(x) if x is not _null else 0.0 for x in values)
+
+
+def _extreme(function, values):
+    """
+    Returns 'function(x for x in values if x is not _null)' for
+    function 'min' or 'max'.
+    """
+    if _is_numeric_array(values) and values.dtype.kind in "iub" and len(values):
+        # Integer arrays don't contain NaN values
+        return values.max() if function is max else values.min()
+
+    if type(values) is list and type(_null) not in set(map(type, values)):
+        return function(values)
+
+    return function(x for x in values if x is not _null)
+
+
+def _is_numeric_array(values):
+    # NumPy is not imported here, values can only be an array
+    # when NumPy is already imported.
+    numpy = sys.modules.get("numpy")
+    return (
+        numpy is not None
+        and isinstance(values, numpy.ndarray)
+        and values.ndim == 1
+        and values.dtype.kind in "iubf"
+    )
+
+
+def _distinct(values):
+    """
+    Return a list with the distinct values in values.
+    """
+    try:
+        # Fast path for hashable values
+        return list(dict.fromkeys(values))
+    except TypeError:
+        pass
+
+    rval = []
+    s = set()
+    r = []
+    for item in values:
+        try:
+            if item in s or item in r:
+                continue
+
+            rval.append(item)
+            s.add(item)
+
+        except TypeError:
+            if item in rval:
+                continue
+
+            rval.append(item)
+            r.append(item)
+    return rval
+
+
 class _ArrayOperators:
+    # The keypath for the values is compiled, that way the
+    # strategy for looking up keys is cached for all elements.
+
     @staticmethod
     def avg(obj, segments):
-        path = ".".join(segments)
-        lst = getKeyPath(obj, path)
+        lst = _compiled_keypath(".".join(segments))(obj)
         count = len(lst)
         if count == 0:
             return 0.0
-        return msum(float(x) if x is not _null else 0.0 for x in lst) / count
+        return _float_sum(lst) / count
 
     @staticmethod
     def count(obj, segments):
@@ -81,85 +173,39 @@ class _ArrayOperators:
 
     @staticmethod
     def distinctUnionOfArrays(obj, segments):
-        path = ".".join(segments)
-        rval = []
-        s = set()
-        r = []
-        for lst in obj:
-            for item in (getKeyPath(item, path) for item in lst):
-                try:
-                    if item in s or item in r:
-                        continue
-                    rval.append(item)
-                    s.add(item)
-
-                except TypeError:
-                    if item in rval:
-                        continue
-
-                    rval.append(item)
-                    r.append(item)
-        return rval
+        accessor = _compiled_keypath(".".join(segments))
+        return _distinct(accessor.map([item for lst in obj for item in lst]))
 
     @staticmethod
     def distinctUnionOfSets(obj, segments):
-        path = ".".join(segments)
-        rval = set()
-        for lst in obj:
-            for item in (getKeyPath(item, path) for item in lst):
-                rval.add(item)
-        return rval
+        accessor = _compiled_keypath(".".join(segments))
+        return set(accessor.map([item for lst in obj for item in lst]))
 
     @staticmethod
     def distinctUnionOfObjects(obj, segments):
-        path = ".".join(segments)
-        rval = []
-        s = set()
-        r = []
-        for item in (getKeyPath(item, path) for item in obj):
-            try:
-                if item in s or item in r:
-                    continue
-
-                rval.append(item)
-                s.add(item)
-
-            except TypeError:
-                if item in rval:
-                    continue
-
-                rval.append(item)
-                r.append(item)
-        return rval
+        accessor = _compiled_keypath(".".join(segments))
+        return _distinct(accessor.map(obj))
 
     @staticmethod
     def max(obj, segments):  # noqa: A003
-        path = ".".join(segments)
-        return max(x for x in getKeyPath(obj, path) if x is not _null)
+        return _extreme(max, _compiled_keypath(".".join(segments))(obj))
 
     @staticmethod
     def min(obj, segments):  # noqa: A003
-        path = ".".join(segments)
-        return min(x for x in getKeyPath(obj, path) if x is not _null)
+        return _extreme(min, _compiled_keypath(".".join(segments))(obj))
 
     @staticmethod
     def sum(obj, segments):  # noqa: A003
-        path = ".".join(segments)
-        lst = getKeyPath(obj, path)
-        return msum(float(x) if x is not _null else 0.0 for x in lst)
+        return _float_sum(_compiled_keypath(".".join(segments))(obj))
 
     @staticmethod
     def unionOfArrays(obj, segments):
-        path = ".".join(segments)
-        rval = []
-        for lst in obj:
-            rval.extend(getKeyPath(item, path) for item in lst)
-        return rval
+        accessor = _compiled_keypath(".".join(segments))
+        return accessor.map([item for lst in obj for item in lst])
 
     @staticmethod
     def unionOfObjects(obj, segments):
-        path = ".".join(segments)
-        return [getKeyPath(item, path) for item in obj]
+        return _compiled_keypath(".".join(segments)).map(obj)
 
 
 def getKey(obj, key):
@@ -179,9 +225,22 @@ def getKey(obj, key):
     """
     if obj is None:
         return None
-    if isinstance(obj, (objc.objc_object, objc.objc_class)):
+    if isinstance(obj, _objc_types):
         return obj.valueForKey_(key)
+    if type(obj) is dict:
+        try:
+            return obj[key]
+        except (KeyError, TypeError):
+            return _generic_get_key(obj, key)
+
+    return _getter(type(obj), key)(obj)
+
 
+def _generic_get_key(obj, key):
+    """
+    Implementation of getKey for Python objects that doesn't
+    use the lookup strategy cache.
+    """
     # check for dict-like objects
     getitem = getattr(obj, "__getitem__", None)
     if getitem is not None:
@@ -223,18 +282,7 @@ def getKey(obj, key):
         except AttributeError:
             continue
 
-        if isinstance(m, types.MethodType) and m.__self__ is obj:
-            return m()
-
-        elif isinstance(m, types.BuiltinMethodType):
-            # Can't access the bound self of methods of builtin classes :-(
-            return m()
-
-        elif isinstance(m, objc.selector) and m.self is obj:
-            return m()
-
-        else:
-            return m
+        return _value_of(obj, m)
 
     try:
         return getattr(obj, "_" + key)
@@ -242,6 +290,33 @@ def getKey(obj, key):
         raise KeyError(f"Key {key} does not exist")
 
 
+def _value_of(obj, m):
+    """
+    Return the value for attribute 'm' of 'obj', calling
+    the attribute when it is a method of 'obj'.
+    """
+    if isinstance(m, types.MethodType) and m.__self__ is obj:
+        return m()
+
+    elif isinstance(m, types.BuiltinMethodType):
+        # Can't access the bound self of methods of builtin classes :-(
+        return m()
+
+    elif isinstance(m, objc.selector) and m.self is obj:
+        return m()
+
+    else:
+        return m
+
+
+def _call_accessor(obj, m):
+    return m()
+
+
+def _attribute_value(obj, m):
+    return m
+
+
 def setKey(obj, key, value):
     """
     Set the attribute referenced by 'key' to 'value'. The key is used
@@ -259,10 +334,21 @@ def setKey(obj, key, value):
     """
     if obj is None:
         return
-    if isinstance(obj, (objc.objc_object, objc.objc_class)):
+    if isinstance(obj, _objc_types):
         obj.setValue_forKey_(value, key)
         return
+    if type(obj) is dict:
+        obj[key] = value
+        return
+
+    _setter(type(obj), key)(obj, value)
 
+
+def _generic_set_key(obj, key, value):
+    """
+    Implementation of setKey for Python objects that doesn't
+    use the lookup strategy cache.
+    """
     if isinstance(obj, collections.abc.Mapping):
         obj[key] = value
         return
@@ -356,6 +442,344 @@ def setKeyPath(obj, keypath, value):
     return setKey(cur, elements[-1], value)
 
 
+#
+# Cache for the lookup strategy used by getKey and setKey for Python
+# objects, the cache maps a type to functions that implement getKey and
+# setKey for a specific key.
+#
+# The functions look up the attributes they try with a default value
+# instead of catching AttributeError, but otherwise behave the same
+# as _generic_get_key and _generic_set_key. The cached functions don't
+# depend on the contents of the class and therefore never have to be
+# invalidated when a class is changed.
+#
+# Mappings and other collection types always use the generic
+# implementation and don't add entries to the cache.
+#
+
+
+class _TypeEntry:
+    __slots__ = ("ref", "getters", "setters")
+
+    def __init__(self, ref, cached):
+        self.ref = ref
+        if cached:
+            self.getters = collections.OrderedDict()
+            self.setters = collections.OrderedDict()
+        else:
+            self.getters = self.setters = None
+
+
+# Maps id(type) -> _TypeEntry, entries are removed when the type
+# is deallocated.
+_type_cache = {}
+_cache_counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+# Maximum number of keys in the cache for a single type, the least
+# recently used key is removed when this is exceeded.
+_MAX_KEYS_PER_TYPE = 256
+
+_missing = object()
+
+# Collection types with a specialised getter, other sequences and
+# sets use the generic implementation.
+_collection_types = (list, tuple, set, frozenset)
+
+
+def _accessor_cache_info():
+    """
+    Return a dict with statistics for the lookup strategy cache
+    """
+    info = dict(_cache_counters)
+    info["types"] = len(_type_cache)
+    return info
+
+
+def _clear_accessor_cache():
+    _type_cache.clear()
+    for k in _cache_counters:
+        _cache_counters[k] = 0
+
+
+def _type_entry(tp):
+    try:
+        return _type_cache[id(tp)]
+    except KeyError:
+        pass
+
+    generic = issubclass(tp, collections.abc.Mapping) or (
+        issubclass(tp, (collections.abc.Sequence, collections.abc.Set))
+        and tp not in _collection_types
+        and not issubclass(tp, str)
+    )
+
+    tp_id = id(tp)
+    entry = _type_cache[tp_id] = _TypeEntry(
+        weakref.ref(tp, lambda ref: _type_cache.pop(tp_id, None)), not generic
+    )
+    return entry
+
+
+def _add_accessor(tp, key, kind, make):
+    # Slow path for _getter and _setter, returns None when the
+    # accessor cannot be cached.
+    cache = getattr(_type_entry(tp), kind)
+    if cache is None:
+        return None
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    _cache_counters["misses"] += 1
+    function = cache[key] = make(tp, key)
+    if len(cache) > _MAX_KEYS_PER_TYPE:
+        cache.popitem(last=False)
+        _cache_counters["evictions"] += 1
+    return function
+
+
+def _getter(tp, key):
+    """
+    Return a function that implements 'getKey(obj, key)'
+    for Python objects of type 'tp'.
+    """
+    try:
+        getters = _type_cache[id(tp)].getters
+        getter = getters[key]
+    except (KeyError, TypeError):
+        getter = _add_accessor(tp, key, "getters", _make_getter)
+        if getter is None:
+            return lambda obj: _generic_get_key(obj, key)
+        return getter
+
+    _cache_counters["hits"] += 1
+    getters.move_to_end(key)
+    return getter
+
+
+def _setter(tp, key):
+    """
+    Return a function that implements 'setKey(obj, key, value)'
+    for Python objects of type 'tp'.
+    """
+    try:
+        setters = _type_cache[id(tp)].setters
+        setter = setters[key]
+    except (KeyError, TypeError):
+        setter = _add_accessor(tp, key, "setters", _make_setter)
+        if setter is None:
+            return lambda obj, value: _generic_set_key(obj, key, value)
+        return setter
+
+    _cache_counters["hits"] += 1
+    setters.move_to_end(key)
+    return setter
+
+
+def _make_getter(tp, key):
+    if not isinstance(key, str):
+        return lambda obj: _generic_get_key(obj, key)
+
+    if tp in _collection_types:
+        # Item access with a string key always fails for these types,
+        # the result is the value of the key for all items. The lookup
+        # strategy is only resolved once per item type.
+        def getter(obj):
+            result = []
+            getters = {}
+            for item in obj:
+                try:
+                    if item is None or isinstance(item, _objc_types):
+                        value = getKey(item, key)
+
+                    else:
+                        try:
+                            item_getter = getters[type(item)]
+                        except KeyError:
+                            item_getter = getters[type(item)] = _getter(type(item), key)
+                        value = item_getter(item)
+
+                except KeyError:
+                    value = _null
+
+                result.append(value)
+            return result
+
+        return getter
+
+    caps = keyCaps(key)
+    candidates = (
+        ("get" + caps, _call_accessor),
+        ("get_" + key, _call_accessor),
+        (key, _value_of),
+        ("is" + caps, _value_of),
+        ("_" + key, _attribute_value),
+    )
+
+    def getter(obj):
+        getitem = getattr(obj, "__getitem__", None)
+        if getitem is not None:
+            try:
+                return getitem(key)
+            except (KeyError, IndexError, TypeError):
+                pass
+
+        for name, convert in candidates:
+            m = getattr(obj, name, _missing)
+            if m is not _missing:
+                return convert(obj, m)
+
+        raise KeyError(f"Key {key} does not exist")
+
+    return getter
+
+
+def _make_setter(tp, key):
+    if not isinstance(key, str):
+        return lambda obj, value: _generic_set_key(obj, key, value)
+
+    base = "set" + keyCaps(key)
+    accessors = (base + "_", base, "set_" + key)
+    private = "_" + key
+
+    def setter(obj, value):
+        for name in accessors:
+            m = getattr(obj, name, None)
+            if m is None:
+                continue
+            try:
+                m(value)
+                return
+            except TypeError:
+                pass
+
+        m = getattr(obj, key, _missing)
+        if m is not _missing:
+            if isinstance(m, types.MethodType) and m.__self__ is obj:
+                # This looks like a getter method, don't call setattr
+                pass
+
+            else:
+                try:
+                    setattr(obj, key, value)
+                    return
+                except AttributeError:
+                    raise KeyError(f"Key {key} does not exist")
+
+        if getattr(obj, private, _missing) is not _missing:
+            setattr(obj, private, value)
+            return
+
+        try:
+            setattr(obj, key, value)
+        except AttributeError:
+            raise KeyError(f"Key {key} does not exist")
+
+    return setter
+
+
+class _CompiledKeyPath:
+    """
+    Accessor for a keypath, see compileKeyPath.
+    """
+
+    __slots__ = ("keypath", "_keys", "_operator", "_operator_segments")
+
+    def __init__(self, keypath):
+        if not keypath:
+            raise KeyError
+
+        self.keypath = keypath
+        self._keys = []
+        self._operator = None
+        self._operator_segments = ()
+
+        elements = keypath.split(".")
+        for idx, e in enumerate(elements):
+            if e[:1] == "@":
+                try:
+                    self._operator = getattr(_ArrayOperators, e[1:])
+                except AttributeError:
+                    raise KeyError(f"Array operator {e} not implemented")
+                self._operator_segments = tuple(elements[idx + 1 :])
+                break
+
+            self._keys.append(e)
+
+    def __repr__(self):
+        return f"<compiled keypath {self.keypath!r}>"
+
+    def __call__(self, obj):
+        if obj is None:
+            return None
+
+        if isinstance(obj, _objc_types):
+            return obj.valueForKeyPath_(self.keypath)
+
+        cur = obj
+        for key in self._keys:
+            cur = getKey(cur, key)
+
+        if self._operator is not None:
+            return self._operator(cur, iter(self._operator_segments))
+
+        return cur
+
+    def map(self, items):  # noqa: A003
+        """
+        Returns '[self(item) for item in items]', the strategy for looking
+        up the first key is only resolved once per type of the items.
+        """
+        if not self._keys:
+            return [self(item) for item in items]
+
+        first = self._keys[0]
+        keys = self._keys[1:]
+        operator = self._operator
+
+        getters = {}
+        result = []
+        for item in items:
+            if item is None or isinstance(item, _objc_types):
+                result.append(self(item))
+                continue
+
+            try:
+                getter = getters[type(item)]
+            except KeyError:
+                getter = getters[type(item)] = _getter(type(item), first)
+
+            cur = getter(item)
+            for key in keys:
+                cur = getKey(cur, key)
+
+            if operator is not None:
+                cur = operator(cur, iter(self._operator_segments))
+
+            result.append(cur)
+
+        return result
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled_keypath(keypath):
+    return _CompiledKeyPath(keypath)
+
+
+def compileKeyPath(keypath):
+    """
+    Return a callable that returns the value for the keypath
+    for its argument, that is 'compileKeyPath(keypath)(obj)' is
+    equivalent to 'getKeyPath(obj, keypath)'.
+
+    The keypath is only parsed once, which makes this faster than
+    getKeyPath when it is used for a large number of objects.
+    """
+    return _CompiledKeyPath(keypath)
+
+
 class kvc:
     def __init__(self, obj):
         self.__pyobjc_object__ = obj
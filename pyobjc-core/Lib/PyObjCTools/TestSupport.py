@@ -6,7 +6,9 @@ testsuite.
 """
 
 import contextlib
+import functools as _functools
 import gc as _gc
+import hashlib as _hashlib
 import os as _os
 import re as _re
 import struct as _struct
@@ -73,6 +75,122 @@ def pyobjc_options(**kwds):
             setattr(objc.options, k, orig[k])
 
 
+# Cache of callable metadata that passed the checks in
+# TestCase._validateCallableMetadata, stored in the file named by
+# $PYOBJC_METADATA_CACHE (when set) to speed up later test runs.
+#
+# Increment _METADATA_CACHE_VERSION when changing the checks.
+_METADATA_CACHE_VERSION = 1
+_metadata_cache = None
+_metadata_cache_dirty = False
+
+
+def _load_metadata_cache(path):
+    try:
+        with open(path, "rb") as fp:
+            version, digests = _pickle.load(fp)
+    except (OSError, EOFError, ValueError, TypeError, _pickle.UnpicklingError):
+        return set()
+
+    if version != _METADATA_CACHE_VERSION or not isinstance(digests, set):
+        return set()
+    return digests
+
+
+def _save_metadata_cache(path, digests):
+    # Merge with the current contents of the file to avoid losing
+    # information from test processes running in parallel.
+    digests = digests | _load_metadata_cache(path)
+
+    tmp_path = f"{path}.{_os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as fp:
+            _pickle.dump((_METADATA_CACHE_VERSION, digests), fp)
+        _os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _get_metadata_cache():
+    global _metadata_cache
+    if _metadata_cache is None:
+        path = _os.environ.get("PYOBJC_METADATA_CACHE")
+        _metadata_cache = _load_metadata_cache(path) if path else set()
+    return _metadata_cache
+
+
+def _flush_metadata_cache():
+    global _metadata_cache_dirty
+    path = _os.environ.get("PYOBJC_METADATA_CACHE")
+    if _metadata_cache_dirty and path:
+        _save_metadata_cache(path, _metadata_cache)
+    _metadata_cache_dirty = False
+
+
+def _metadata_digest(callable_meta, skip_simple_charptr_check):
+    return _hashlib.sha1(
+        repr((skip_simple_charptr_check, callable_meta)).encode()
+    ).digest()
+
+
+def _callable_metadata_problems(callable_meta, skip_simple_charptr_check=False):
+    """
+    Return a list of problems in the metadata for a callable
+    """
+    problems = []
+    argcount = len(callable_meta["arguments"])
+
+    for idx, meta in [("retval", callable_meta["retval"])] + list(
+        enumerate(callable_meta["arguments"])
+    ):
+        if meta["type"].endswith(objc._C_PTR + objc._C_CHR):
+            if meta.get("c_array_delimited_by_null", False):
+                problems.append(
+                    f"{idx}: null-delimited 'char*', use _C_CHAR_AS_TEXT instead"
+                )
+            if not skip_simple_charptr_check:
+                problems.append(f"{idx}: 'char*'")
+
+        v = meta.get("c_array_size_in_arg", None)
+        if isinstance(v, int):
+            if not (0 <= v < argcount):
+                problems.append(f"{idx}: c_array_size_in_arg out of range {v}")
+        elif isinstance(v, tuple):
+            b, e = v
+            if not (0 <= b < argcount):
+                problems.append(f"{idx}: c_array_size_in_arg out of range {b}")
+            if not (0 <= e < argcount):
+                problems.append(f"{idx}: c_array_size_in_arg out of range {e}")
+
+        tp = meta["type"]
+        if any(tp.startswith(pfx) for pfx in (objc._C_IN, objc._C_OUT, objc._C_INOUT)):
+            rest = tp[1:]
+            if not rest.startswith(objc._C_PTR) and not rest.startswith(
+                objc._C_CHARPTR
+            ):
+                problems.append(f"{idx}: byref specifier on non-pointer: {tp}")
+
+            rest = rest[1:]
+
+            if rest.startswith(objc._C_STRUCT_B):
+                name, fields = objc.splitStructSignature(rest)
+                if not fields:
+                    problems.append(
+                        f"{idx}: byref to empty struct (handle/CFType?): {tp}"
+                    )
+
+    return problems
+
+
+@_functools.lru_cache(maxsize=1)
+def _cocoa_names():
+    import Cocoa
+
+    # Don't exclude 'NSObject' because a number
+    # of frameworks define categories on this class.
+    return frozenset(dir(Cocoa)) - {"NSObject"}
+
+
 def sdkForPython(_cache=[]):  # noqa: B006, M511
     """
     Return the SDK version used to compile Python itself,
@@ -1025,59 +1143,22 @@ class TestCase(_unittest.TestCase):
     def _validateCallableMetadata(
         self, value, class_name=None, skip_simple_charptr_check=False
     ):
-        with self.subTest(repr(value)):
-            callable_meta = value.__metadata__()
-            argcount = len(callable_meta["arguments"])
-
-            for idx, meta in [("retval", callable_meta["retval"])] + list(
-                enumerate(callable_meta["arguments"])
-            ):
-                if meta["type"].endswith(objc._C_PTR + objc._C_CHR):
-                    if meta.get("c_array_delimited_by_null", False):
-                        self.fail(
-                            f"{value}: {idx}: null-delimited 'char*', use _C_CHAR_AS_TEXT instead {class_name or ''}"
-                        )
-                    if not skip_simple_charptr_check:
-                        self.fail(f"{value}: {idx}: 'char*' {class_name or ''}")
-
-                v = meta.get("c_array_size_in_arg", None)
-                if isinstance(v, int):
-                    if not (0 <= v < argcount):
-                        self.fail(
-                            f"{value}: {idx}: c_array_size_in_arg out of range {v} {class_name or ''}"
-                        )
-                elif isinstance(v, tuple):
-                    b, e = v
-                    if not (0 <= b < argcount):
-                        self.fail(
-                            f"{value}: {idx}: c_array_size_in_arg out of range {b} {class_name or ''}"
-                        )
-                    if not (0 <= e < argcount):
-                        self.fail(
-                            f"{value}: {idx}: c_array_size_in_arg out of range {e} {class_name or ''}"
-                        )
+        global _metadata_cache_dirty
 
-                tp = meta["type"]
-                if any(
-                    tp.startswith(pfx)
-                    for pfx in (objc._C_IN, objc._C_OUT, objc._C_INOUT)
-                ):
-                    rest = tp[1:]
-                    if not rest.startswith(objc._C_PTR) and not rest.startswith(
-                        objc._C_CHARPTR
-                    ):
-                        self.fail(
-                            f"{value}: {idx}: byref specifier on non-pointer: {tp} {class_name or ''}"
-                        )
+        callable_meta = value.__metadata__()
+        cache = _get_metadata_cache()
+        digest = _metadata_digest(callable_meta, skip_simple_charptr_check)
+        if digest in cache:
+            return
 
-                    rest = rest[1:]
+        problems = _callable_metadata_problems(callable_meta, skip_simple_charptr_check)
+        if not problems:
+            cache.add(digest)
+            _metadata_cache_dirty = True
+            return
 
-                    if rest.startswith(objc._C_STRUCT_B):
-                        name, fields = objc.splitStructSignature(rest)
-                        if not fields:
-                            self.fail(
-                                f"{value}: {idx}: byref to empty struct (handle/CFType?): {tp} {class_name or ''}"
-                            )
+        with self.subTest(repr(value)):
+            self.fail(f"{value}: {problems[0]} {class_name or ''}")
 
     def assertCallableMetadataIsSane(
         self, module, *, exclude_cocoa=True, exclude_attrs=()
@@ -1087,21 +1168,16 @@ class TestCase(_unittest.TestCase):
         #
         # This test is *very* expensive, made slightly
         # better by excluding CoreFoundation/Foundation/AppKit
-        # by default
+        # by default. Metadata that passed the checks before is
+        # not checked again (see _get_metadata_cache).
         #
         # XXX: exclude_cocoa may exclude too much depending on
         #      import order.
 
         if exclude_cocoa:
-            import Cocoa
-
-            exclude_names = set(dir(Cocoa))
-
-            # Don't exclude 'NSObject' because a number
-            # of frameworks define categories on this class.
-            exclude_names -= {"NSObject"}
+            exclude_names = _cocoa_names()
         else:
-            exclude_names = set()
+            exclude_names = frozenset()
 
         exclude_attrs = set(exclude_attrs)
         exclude_attrs.add(("NSColor", "scn_C3DColorIgnoringColorSpace_success_"))
@@ -1117,7 +1193,14 @@ class TestCase(_unittest.TestCase):
             if nm in exclude_attrs:
                 continue
 
-            value = getattr(module, nm)
+            try:
+                value = getattr(module, nm)
+            except AttributeError:
+                # dir() of a lazy module is calculated from the metadata
+                # and can include names that aren't available on this
+                # version of macOS.
+                continue
+
             if isinstance(value, objc.objc_class):
                 if value.__name__ == "Object":
                     # Root class, does not conform to the NSObject
@@ -1151,6 +1234,8 @@ class TestCase(_unittest.TestCase):
             else:
                 continue
 
+        _flush_metadata_cache()
+
     def __init__(self, methodName="runTest"):
         super().__init__(methodName)
 
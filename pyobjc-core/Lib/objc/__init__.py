@@ -17,15 +17,19 @@ del _update
 
 
 from ._convenience import *  # noqa: F401, F403, E402
-from ._convenience_nsobject import *  # noqa: F401, F403, E402
-from ._convenience_nsdecimal import *  # noqa: F401, F403, E402
-from ._convenience_nsdata import *  # noqa: F401, F403, E402
-from ._convenience_nsdictionary import *  # noqa: F401, F403, E402
-from ._convenience_nsset import *  # noqa: F401, F403, E402
-from ._convenience_nsarray import *  # noqa: F401, F403, E402
-from ._convenience_nsstring import *  # noqa: F401, F403, E402
-from ._convenience_mapping import *  # noqa: F401, F403, E402
-from ._convenience_sequence import *  # noqa: F401, F403, E402
+from ._convenience import _updatingMetadata  # noqa: F401, F403, E402
+
+with batchConveniences():  # noqa: F405
+    from ._convenience_nsobject import *  # noqa: F401, F403, E402
+    from ._convenience_nsdecimal import *  # noqa: F401, F403, E402
+    from ._convenience_nsdata import *  # noqa: F401, F403, E402
+    from ._convenience_nsdictionary import *  # noqa: F401, F403, E402
+    from ._convenience_nsset import *  # noqa: F401, F403, E402
+    from ._convenience_nsarray import *  # noqa: F401, F403, E402
+    from ._convenience_nsstring import *  # noqa: F401, F403, E402
+    from ._convenience_mapping import *  # noqa: F401, F403, E402
+    from ._convenience_sequence import *  # noqa: F401, F403, E402
+
 from ._bridgesupport import *  # noqa: F401, F403, E402
 from ._dyld import *  # noqa: F401, F403, E402
 from ._protocols import *  # noqa: F401, F403, E402
@@ -41,6 +45,7 @@ from ._compat import *  # noqa: F401, F403, E402
 from ._compat import _setClassExtender  # noqa: F401, F403, E402
 from . import _callable_docstr  # noqa: F401, F403, E402
 from . import _pycoder  # noqa: F401, F403, E402
+from . import _metadatafile  # noqa: F401, F403, E402
 
 
 # Helper function for new-style metadata modules
@@ -39,6 +39,8 @@ for method in (
 BRIDGESUPPORT_DIRECTORIES = ["/System/Library/BridgeSupport"]
 
 _SENTINEL = object()
+_CHUNK_SIZE = 64 * 1024
+_TYPESTR_CACHE_SIZE = 4096
 _DEFAULT_SUGGESTION = "don't use this method"
 _BOOLEAN_ATTRIBUTES = [
     "already_retained",
@@ -64,12 +66,98 @@ def _as_bytes(value):
     return value.encode("ascii")
 
 
+@functools.lru_cache(maxsize=_TYPESTR_CACHE_SIZE)
+def _typestr2typestr(typestr):
+    """
+    Convert a type encoding from a BridgeSupport file to the encoding
+    used by PyObjC. The result is cached because the same encodings
+    are used many times in framework metadata, use
+    ``_typestr2typestr.cache_info()`` for cache statistics.
+    """
+    # As of macOS 10.13 metadata files may contain
+    # typestring that end with property specific data;
+    # first remove that junk.
+    if b"," in typestr:
+        typestr = typestr.split(b",", 1)[0]
+
+    result = []
+    for item in objc.splitSignature(typestr):
+        if item == objc._C_BOOL:
+            result.append(objc._C_NSBOOL)
+
+        elif item == objc._C_NSBOOL:
+            result.append(objc._C_BOOL)
+
+        elif item.startswith(objc._C_STRUCT_B) or item.startswith(objc._C_UNION_B):
+            # unions and structs have the same structure
+            start, stop = item[:1], item[-1:]
+
+            name, fields = objc.splitStructSignature(
+                objc._C_STRUCT_B + _as_bytes(item[1:-1]) + objc._C_STRUCT_E
+            )
+            result.append(start)
+            if name is not None:
+                result.append(_as_bytes(name))
+                result.append(b"=")
+            for nm, tp in fields:
+                if nm is not None:
+                    result.append(b'"')
+                    result.append(_as_bytes(nm))
+                    result.append(b'"')
+
+                result.append(_typestr2typestr(_as_bytes(tp)))
+            result.append(stop)
+
+        elif item.startswith(objc._C_ARY_B):
+            m = re.match(rb"^.(\d*)(.*).$", item)
+            result.append(objc._C_ARY_B)
+            result.append(m.group(1))
+            result.append(_typestr2typestr(m.group(2)))
+            result.append(objc._C_ARY_E)
+
+        else:
+            result.append(item)
+
+    return b"".join(result)
+
+
+def _looks_like_xml(value):
+    return value.lstrip()[:1] in ("<", b"<", "")
+
+
+def _iter_chunks(xmldata, chunk_size=_CHUNK_SIZE):
+    """
+    Yield the contents of *xmldata* in chunks of at most *chunk_size*
+    characters. *xmldata* can be a bytes or str object with the XML data,
+    a file-like object, or the path of a file.
+    """
+    if hasattr(xmldata, "read"):
+        while True:
+            chunk = xmldata.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    elif isinstance(xmldata, os.PathLike) or (
+        isinstance(xmldata, str) and not _looks_like_xml(xmldata)
+    ):
+        with open(xmldata, "rb") as fp:
+            yield from _iter_chunks(fp, chunk_size)
+
+    else:
+        for offset in range(0, len(xmldata), chunk_size):
+            yield xmldata[offset : offset + chunk_size]
+
+
 class _BridgeSupportParser:
     """
     Parser for the bridge support file format.
 
     Instances of this class will not update the bridge state,
     this makes it easier to test the class.
+
+    *xmldata* is either the XML data (bytes or str), a file-like
+    object or the path of a BridgeSupport file.
     """
 
     TAG_MAP = {}
@@ -90,66 +178,55 @@ class _BridgeSupportParser:
         self.process_data(xmldata)
 
     def process_data(self, xmldata):
-        root = ET.fromstring(xmldata.strip())
-
-        if root.tag != "signatures":
+        # The data is parsed incrementally and top-level elements are
+        # processed and discarded as soon as they are complete, that avoids
+        # building a tree for the entire file.
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root = None
+        depth = 0
+        invalid_root = False
+
+        def process_events():
+            nonlocal root, depth, invalid_root
+
+            for event, node in parser.read_events():
+                if event == "start":
+                    if depth == 0:
+                        root = node
+                        invalid_root = node.tag != "signatures"
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth != 1 or invalid_root:
+                    continue
+
+                method = getattr(self, f"do_{node.tag}", None)
+                if method is not None:
+                    method(node)
+
+                root.remove(node)
+
+        leading = True
+        for chunk in _iter_chunks(xmldata):
+            if leading:
+                # Leading whitespace is not valid before an XML declaration
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                leading = False
+
+            parser.feed(chunk)
+            process_events()
+
+        parser.close()
+        process_events()
+
+        if invalid_root:
             raise objc.error("invalid root node in bridgesupport file")
 
-        for node in root:
-            method = getattr(self, f"do_{node.tag}", None)
-            if method is None:
-                continue
-
-            method(node)
-
     def typestr2typestr(self, typestr):
-        typestr = _as_bytes(typestr)
-
-        # As of macOS 10.13 metadata files may contain
-        # typestring that end with property specific data;
-        # first remove that junk.
-        if b"," in typestr:
-            typestr = typestr.split(b",", 1)[0]
-
-        result = []
-        for item in objc.splitSignature(typestr):
-            if item == objc._C_BOOL:
-                result.append(objc._C_NSBOOL)
-
-            elif item == objc._C_NSBOOL:
-                result.append(objc._C_BOOL)
-
-            elif item.startswith(objc._C_STRUCT_B) or item.startswith(objc._C_UNION_B):
-                # unions and structs have the same structure
-                start, stop = item[:1], item[-1:]
-
-                name, fields = objc.splitStructSignature(
-                    objc._C_STRUCT_B + _as_bytes(item[1:-1]) + objc._C_STRUCT_E
-                )
-                result.append(start)
-                if name is not None:
-                    result.append(_as_bytes(name))
-                    result.append(b"=")
-                for nm, tp in fields:
-                    if nm is not None:
-                        result.append(b'"')
-                        result.append(_as_bytes(nm))
-                        result.append(b'"')
-
-                    result.append(self.typestr2typestr(tp))
-                result.append(stop)
-
-            elif item.startswith(objc._C_ARY_B):
-                m = re.match(rb"^.(\d*)(.*).$", item)
-                result.append(objc._C_ARY_B)
-                result.append(m.group(1))
-                result.append(self.typestr2typestr(m.group(2)))
-                result.append(objc._C_ARY_E)
-
-            else:
-                result.append(item)
-
-        return b"".join(result)
+        return _typestr2typestr(_as_bytes(typestr))
 
     if sys.maxsize > 2**32:
 
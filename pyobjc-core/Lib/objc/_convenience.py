@@ -2,21 +2,49 @@
 This module implements a callback function that is used by the C code to
 add Python special methods to Objective-C classes with a suitable interface.
 """
+import contextlib
+
 from objc._objc import (
     _block_call,
+    _registerMetaDataForClass,
     _rescanClass,
+    _updatingMetadata as _objc_updatingMetadata,
     currentBundle,
     lookUpClass,
     options,
+    registerMetaDataForSelector as _objc_registerMetaDataForSelector,
     selector,
 )
 import PyObjCTools.KeyValueCoding as kvc
 
-__all__ = ("addConvenienceForClass", "registerABCForClass")
+__all__ = (
+    "addConvenienceForClass",
+    "batchConveniences",
+    "registerABCForClass",
+    "registerMetaDataForSelector",
+)
 
 CLASS_METHODS = {}
 CLASS_ABC = {}
 
+# Mapping from class name to a list of tables with selector
+# metadata for that class that isn't registered yet. A table
+# is a mapping from class name to a sequence of (selector, metadata)
+# tuples.
+CLASS_METADATA = {}
+
+# Names of classes for which the class extender has run, the
+# metadata for these classes is registered without delay.
+_extended_classes = set()
+
+# Selector registrations collected while metadata is updated,
+# None when no update is in progress.
+_collected_metadata = None
+
+# Names of classes that need to be rescanned at the end of
+# a batchConveniences() block, None outside of such a block.
+_pending_rescans = None
+
 
 options._getKey = kvc.getKey
 options._setKey = kvc.setKey
@@ -40,7 +68,14 @@ def add_convenience_methods(cls, type_dict):
     class name to a list of Python method names and implementation.
 
     Matching entries from both mappings are added to the 'type_dict'.
+
+    This also registers selector metadata for the class that was
+    registered lazily.
     """
+    _extended_classes.add(cls.__name__)
+    if CLASS_METADATA:
+        _flush_metadata(cls.__name__)
+
     for nm, value in CLASS_METHODS.get(cls.__name__, ()):
         type_dict[nm] = value
 
@@ -77,8 +112,7 @@ def registerABCForClass(classname, *abc_class):
     except KeyError:
         CLASS_ABC[classname] = tuple(abc_class)
 
-    options._mapping_count += 1
-    _rescanClass(classname)
+    _rescan(classname)
 
 
 def addConvenienceForClass(classname, methods):
@@ -90,10 +124,135 @@ def addConvenienceForClass(classname, methods):
     except KeyError:
         CLASS_METHODS[classname] = tuple(methods)
 
+    _rescan(classname)
+
+
+def _rescan(classname):
+    if _pending_rescans is not None:
+        _pending_rescans[classname] = None
+        return
+
     options._mapping_count += 1
     _rescanClass(classname)
 
 
+@contextlib.contextmanager
+def batchConveniences():
+    """
+    Context manager that delays updating classes for calls to
+    :func:`addConvenienceForClass` and :func:`registerABCForClass`
+    until the end of the with statement, classes are updated once
+    instead of for every call.
+
+    Existing classes may not have the new methods until the end
+    of the with statement.
+    """
+    global _pending_rescans
+
+    if _pending_rescans is not None:
+        # Nested batch, the outermost one updates the classes
+        yield
+        return
+
+    _pending_rescans = {}
+    try:
+        yield
+
+    finally:
+        classnames = _pending_rescans
+        _pending_rescans = None
+        if classnames:
+            options._mapping_count += 1
+            for classname in classnames:
+                _rescanClass(classname)
+
+
+def _flush_metadata(classname):
+    """
+    Register the pending selector metadata for *classname*
+
+    This doesn't invalidate cached method information, the caller
+    must do that when the class was already used (see
+    registerMetaDataTable).
+    """
+    tables = CLASS_METADATA.pop(classname, None)
+    if not tables:
+        return
+
+    encoded = classname.encode()
+    for table in tables:
+        _registerMetaDataForClass(encoded, table[classname])
+
+
+def registerMetaDataTable(table):
+    """
+    Register selector metadata for a number of classes. The metadata
+    for a class is registered when that class is first used from Python,
+    instead of registering everything at once. Metadata for classes that
+    are already used is registered immediately.
+
+    *table* is a mapping from class name to a sequence of (selector, metadata)
+    tuples. Later registrations for a class and selector replace earlier ones.
+    """
+    for classname in table:
+        try:
+            CLASS_METADATA[classname].append(table)
+        except KeyError:
+            CLASS_METADATA[classname] = [table]
+
+        if classname in _extended_classes:
+            _flush_metadata(classname)
+
+    # Invalidate cached method information after registering the
+    # metadata, information that is calculated before registering
+    # would otherwise not be updated.
+    options._mapping_count += 1
+
+
+def registerMetaDataForSelector(class_, selector, metadata):
+    """
+    Register a metadata structure for the given selector.
+
+    Registrations between calls to ``_updatingMetadata(True)`` and
+    ``_updatingMetadata(False)`` (as used by framework metadata)
+    are collected and registered lazily, per class.
+    """
+    if isinstance(class_, bytes) and isinstance(selector, bytes):
+        if _collected_metadata is not None:
+            classname = class_.decode()
+            try:
+                _collected_metadata[classname].append((selector, metadata))
+            except KeyError:
+                _collected_metadata[classname] = [(selector, metadata)]
+            return
+
+        if CLASS_METADATA:
+            # Ensure that this registration replaces pending
+            # registrations for the class.
+            _flush_metadata(class_.decode())
+
+    _objc_registerMetaDataForSelector(class_, selector, metadata)
+
+
+def _updatingMetadata(flag):
+    """
+    PRIVATE FUNCTION
+    """
+    global _collected_metadata
+
+    if flag:
+        _objc_updatingMetadata(True)
+        if _collected_metadata is None:
+            _collected_metadata = {}
+
+    else:
+        table = _collected_metadata
+        _collected_metadata = None
+        if table:
+            registerMetaDataTable(table)
+        _objc_updatingMetadata(False)
+
+
 #
 # Helper functions for converting data item to/from a representation
 # that is usable inside Cocoa data structures.
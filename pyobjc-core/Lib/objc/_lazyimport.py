@@ -19,6 +19,23 @@ ModuleType = types.ModuleType
 
 _name_re = re.compile("^[A-Za-z_][A-Za-z_0-9]*$")
 
+# Generation of the caches of names that cannot be resolved
+# in lazy modules, see _invalidate_caches.
+_cache_generation = 0
+
+
+def _invalidate_caches():
+    """
+    Invalidate the caches of names that cannot be resolved in
+    lazy modules. This is needed when a name can be resolved
+    by a lazy module after an earlier lookup failed, and is done
+    automatically when a new lazy module is created.
+
+    Objective-C classes that are loaded later are always found.
+    """
+    global _cache_generation
+    _cache_generation += 1
+
 
 def _check_deprecated(name, deprecation_version):
     if (
@@ -33,6 +50,21 @@ def _check_deprecated(name, deprecation_version):
         )
 
 
+def _build_index(value):
+    """
+    Returns a mapping from name to value for a metadata string
+    of the form "$name1$name2@value2$...". The value is None for
+    entries without a value. The first definition of a name wins,
+    which matches the behaviour of a regular expression scan.
+    """
+    index = {}
+    for entry in value.split("$"):
+        name, sep, rest = entry.partition("@")
+        if name and name not in index:
+            index[name] = rest if sep else None
+    return index
+
+
 def _loadBundle(frameworkName, frameworkIdentifier, frameworkPath):
     if frameworkIdentifier is None:
         bundle = loadBundle(
@@ -90,9 +122,17 @@ class ObjCLazyModule(ModuleType):
         "_ObjCLazyModule__funcmap",
         "_ObjCLazyModule__parents",
         "_ObjCLazyModule__varmap",
+        "_ObjCLazyModule__varindex",
+        "_ObjCLazyModule__enumindex",
         "_ObjCLazyModule__inlinelist",
         "_ObjCLazyModule__aliases",
         "_ObjCLazyModule__informal_protocols",
+        "_ObjCLazyModule__missing",
+        "_ObjCLazyModule__missing_key",
+        "_ObjCLazyModule__all_list",
+        "_ObjCLazyModule__all_set",
+        "_ObjCLazyModule__dir_set",
+        "_ObjCLazyModule__dir_key",
     )
 
     def __init__(
@@ -107,6 +147,10 @@ class ObjCLazyModule(ModuleType):
     ):
         super().__init__(name)
 
+        # A new module can provide names that weren't available
+        # in a module that uses it as a parent.
+        _invalidate_caches()
+
         if frameworkIdentifier is not None or frameworkPath is not None:
             self.__bundle = self.__dict__["__bundle__"] = _loadBundle(
                 name, frameworkIdentifier, frameworkPath
@@ -132,10 +176,18 @@ class ObjCLazyModule(ModuleType):
             self.__dict__.update(initialdict)
         self.__dict__.update(metadict.get("misc", {}))
         self.__parents = parents
+        self.__missing = set()
+        self.__missing_key = None
+        self.__all_list = None
+        self.__all_set = None
+        self.__dir_set = None
+        self.__dir_key = None
         self.__varmap = metadict.get("constants")
+        self.__varindex = None
         self.__varmap_deprecated = metadict.get("deprecated_constants", {})
         self.__varmap_dct = metadict.get("constants_dict", {})
         self.__enummap = metadict.get("enums")
+        self.__enumindex = None
         self.__enum_deprecated = metadict.get("deprecated_enums", {})
         self.__funcmap = metadict.get("functions")
         self.__aliases = metadict.get("aliases")
@@ -152,15 +204,36 @@ class ObjCLazyModule(ModuleType):
         self.__load_cftypes(metadict.get("cftypes"))
 
     def __dir__(self):
-        return self.__all__
+        # Use the names from the metadata instead of __all__, that
+        # way dir() doesn't have to load everything.
+        all_names = self.__dict__.get("__all__")
+        if all_names is not None and all_names is self.__all_list:
+            return list(all_names)
+
+        if self.__dir_set is None or self.__dir_key != _cache_generation:
+            self.__dir_set = self.__calc_dir()
+            self.__dir_key = _cache_generation
+        return list(self.__dir_set)
 
     def __getattr__(self, name):
         if name == "__all__":
             # Load everything immediately
             value = self.__calc_all()
-            self.__dict__[name] = value
+            self.__all_list = self.__dict__[name] = value
+            self.__all_set = set(value)
             return value
 
+        if name in self.__missing:
+            if self.__missing_key == (_cache_generation, len(self.__parents)):
+                # The name is not present in the metadata for this module
+                # and its parents, only check if a class was loaded.
+                try:
+                    value = lookUpClass(name)
+                except nosuchclass_error:
+                    raise AttributeError(name) from None
+
+                return self.__cache_value(name, value)
+
         # First try parent module, as if we had done
         # 'from parents import *'
         for p in self.__parents:
@@ -170,10 +243,7 @@ class ObjCLazyModule(ModuleType):
                 pass
 
             else:
-                self.__dict__[name] = value
-                if "__all__" in self.__dict__:
-                    del self.__dict__["__all__"]
-                return value
+                return self.__cache_value(name, value)
 
         if not _name_re.match(name):
             # Name is not a valid identifier and cannot
@@ -187,10 +257,7 @@ class ObjCLazyModule(ModuleType):
         except AttributeError:
             pass
         else:
-            self.__dict__[name] = value
-            if "__all__" in self.__dict__:
-                del self.__dict__["__all__"]
-            return value
+            return self.__cache_value(name, value)
 
         # Then check if the name is class
         try:
@@ -199,13 +266,72 @@ class ObjCLazyModule(ModuleType):
             pass
 
         else:
-            self.__dict__[name] = value
-            if "__all__" in self.__dict__:
+            return self.__cache_value(name, value)
+
+        # Finally give up and raise AttributeError, and remember that
+        # the name cannot be resolved. The parents are included in the
+        # key because umbrella modules add parents after creation.
+        key = (_cache_generation, len(self.__parents))
+        if self.__missing_key != key:
+            self.__missing.clear()
+            self.__missing_key = key
+        self.__missing.add(name)
+
+        # The metadata can contain names that aren't available on
+        # this system, those are dropped from dir() when they are
+        # found to be missing.
+        if self.__dir_set is not None:
+            self.__dir_set.discard(name)
+        raise AttributeError(name)
+
+    def __cache_value(self, name, value):
+        self.__dict__[name] = value
+
+        # Update __all__ instead of recalculating it, unless
+        # it was replaced.
+        all_names = self.__dict__.get("__all__")
+        if all_names is not None:
+            if all_names is not self.__all_list:
                 del self.__dict__["__all__"]
-            return value
 
-        # Finally give up and raise AttributeError
-        raise AttributeError(name)
+            elif not name.startswith("_") and name not in self.__all_set:
+                self.__all_set.add(name)
+                all_names.append(name)
+
+        if self.__dir_set is not None and not name.startswith("_"):
+            self.__dir_set.add(name)
+
+        return value
+
+    def __calc_dir(self):
+        all_names = set(self.__dict__)
+
+        if self.__varmap_dct:
+            all_names.update(self.__varmap_dct)
+
+        if self.__varmap:
+            all_names.update(self.__get_varindex())
+
+        if self.__enummap:
+            all_names.update(
+                nm for nm, val in self.__get_enumindex().items() if val is not None
+            )
+
+        for names in (self.__funcmap, self.__expressions, self.__aliases):
+            if names:
+                all_names.update(names)
+
+        for p in self.__parents:
+            all_names.update(dir(p))
+
+        all_names.update(
+            cls.__name__ for cls in getClassList() if "." not in cls.__name__
+        )
+
+        if self.__missing_key == (_cache_generation, len(self.__parents)):
+            all_names.difference_update(self.__missing)
+
+        return {v for v in all_names if not v.startswith("_")}
 
     def __calc_all(self):
 
@@ -242,18 +368,14 @@ class ObjCLazyModule(ModuleType):
         if self.__varmap:
             varmap = []
             specials = []
-            for nm, tp in re.findall(
-                r"\$([A-Z0-9a-z_]*)(@[^$]*)?(?=\$)", self.__varmap
-            ):
-                if not nm:
-                    continue  # XXX: needed for libdispatch, likely bug
-                if tp and tp.startswith("@="):
-                    specials.append((nm, tp[2:]))
+            for nm, tp in self.__get_varindex().items():
+                if tp and tp.startswith("="):
+                    specials.append((nm, tp[1:]))
                 else:
-                    varmap.append((nm, b"@" if not tp else tp[1:].encode("ascii")))
+                    varmap.append((nm, b"@" if tp is None else tp.encode("ascii")))
 
             dct = {}
-            if varmap:  # XXX: See XXX above
+            if varmap:
                 objc.loadBundleVariables(self.__bundle, dct, varmap)
 
             for nm in dct:
@@ -270,15 +392,15 @@ class ObjCLazyModule(ModuleType):
                     pass
 
             self.__varmap = ""
+            self.__varindex = None
 
         if self.__enummap:
-            for nm, val in re.findall(
-                r"\$([A-Z0-9a-z_]*)@([^$]*)(?=\$)", self.__enummap
-            ):
-                if nm not in self.__dict__:
+            for nm, val in self.__get_enumindex().items():
+                if val is not None and nm not in self.__dict__:
                     self.__dict__[nm] = self.__prs_enum(val)
 
             self.__enummap = ""
+            self.__enumindex = None
 
         if self.__funcmap:
             func_list = []
@@ -349,6 +471,18 @@ class ObjCLazyModule(ModuleType):
 
         return val
 
+    def __get_varindex(self):
+        # The index is created on first use, most modules are
+        # only used for a small subset of their constants.
+        if self.__varindex is None:
+            self.__varindex = _build_index(self.__varmap)
+        return self.__varindex
+
+    def __get_enumindex(self):
+        if self.__enumindex is None:
+            self.__enumindex = _build_index(self.__enummap)
+        return self.__enumindex
+
     def __get_constant(self, name):
         if self.__varmap_dct:
             if name in self.__varmap_dct:
@@ -369,15 +503,12 @@ class ObjCLazyModule(ModuleType):
                 return result
 
         if self.__varmap:
-            m = re.search(rf"\${name}(@[^$]*)?\$", self.__varmap)
-            if m is not None:
-                tp = m.group(1)
-                if not tp:
+            index = self.__get_varindex()
+            if name in index:
+                tp = index[name]
+                if tp is None:
                     tp = "@"
-                else:
-                    tp = tp[1:]
 
-                d = {}
                 if tp.startswith("=="):
                     magic = 2
                     tp = tp[2:]
@@ -395,9 +526,9 @@ class ObjCLazyModule(ModuleType):
                 return result
 
         if self.__enummap:
-            m = re.search(rf"\${name}@([^$]*)\$", self.__enummap)
-            if m is not None:
-                result = self.__prs_enum(m.group(1))
+            val = self.__get_enumindex().get(name)
+            if val is not None:
+                result = self.__prs_enum(val)
                 if name in self.__enum_deprecated:
                     _check_deprecated(name, self.__enum_deprecated[name])
                 return result
@@ -0,0 +1,573 @@
+"""
+Support for precompiled metadata files.
+
+A precompiled metadata file ("_metadata.bin") contains the same information
+as the "_metadata.py" module created by the metadata compiler, but stored
+in a format that can be memory-mapped and decoded on demand instead of
+evaluating the entire module at import time.
+
+The file contains:
+
+- Plain data sections ("constants", "enums", "cftypes"), stored as a single
+  marshalled value.
+
+- Mapping sections ("functions", "aliases", "expressions", ...), stored as a
+  table that is sorted by key. Entries are looked up using a binary search
+  and are only decoded when they are used.
+
+- Selector metadata that would otherwise be registered using
+  :func:`objc.registerMetaDataForSelector`, stored as a mapping section
+  with the class name as the key. The metadata for a class is decoded and
+  registered when the class is first used.
+
+- The code object for the remaining statements of the "_metadata.py"
+  module (such as the definitions of struct types and informal protocols).
+  This code object is specific for the Python version used to create
+  the file, the file is ignored when it was created by another version.
+
+The "_metadata.py" module is still used when there is no usable
+precompiled metadata file.
+"""
+
+__all__ = ()
+
+import ast
+import collections.abc
+import functools
+import hashlib
+import importlib
+import importlib.util
+import marshal
+import mmap
+import os
+import site
+import struct
+import sysconfig
+
+from objc._convenience import registerMetaDataTable
+
+_MAGIC = b"PyObjCMD"
+_VERSION = 2
+
+# magic, version, Python magic, size, modification time (in nanoseconds)
+# and SHA-256 digest of the source file, TOC offset, TOC size
+_HEADER = struct.Struct("<8sI4sQQ32sQQ")
+
+# key offset, key size, value offset, value size
+_RECORD = struct.Struct("<IIII")
+
+_VALUE_SECTIONS = frozenset({"constants", "enums", "cftypes"})
+_MAPPING_SECTIONS = frozenset(
+    {
+        "functions",
+        "aliases",
+        "expressions",
+        "constants_dict",
+        "deprecated_constants",
+        "deprecated_enums",
+        "deprecated_aliases",
+    }
+)
+_SELECTOR_SECTION = "selectors"
+
+
+class _LazySection(collections.abc.MutableMapping):
+    """
+    Mapping with string keys that is backed by a sorted table in
+    a memory-mapped metadata file. Values are decoded on first access,
+    updates are stored in an in-memory overlay.
+    """
+
+    __slots__ = ("_mm", "_offset", "_count", "_overlay", "_extra", "_removed")
+
+    def __init__(self, mm, offset, count):
+        self._mm = mm
+        self._offset = offset
+        self._count = count
+
+        # Decoded or updated values
+        self._overlay = {}
+
+        # Keys in the overlay that aren't in the table
+        self._extra = set()
+
+        # Keys in the table that were deleted
+        self._removed = set()
+
+    def _find(self, key):
+        if not isinstance(key, str):
+            return None
+
+        try:
+            encoded = key.encode("utf-8")
+        except UnicodeEncodeError:
+            return None
+
+        mm = self._mm
+        lo = 0
+        hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, key_size, value_offset, value_size = _RECORD.unpack_from(
+                mm, self._offset + mid * _RECORD.size
+            )
+            current = mm[key_offset : key_offset + key_size]
+            if current < encoded:
+                lo = mid + 1
+            elif current > encoded:
+                hi = mid
+            else:
+                return value_offset, value_size
+        return None
+
+    def __contains__(self, key):
+        if key in self._overlay:
+            return True
+        if key in self._removed:
+            return False
+        return self._find(key) is not None
+
+    def __getitem__(self, key):
+        try:
+            return self._overlay[key]
+        except KeyError:
+            pass
+
+        if key in self._removed:
+            raise KeyError(key)
+
+        location = self._find(key)
+        if location is None:
+            raise KeyError(key)
+
+        value_offset, value_size = location
+        value = marshal.loads(self._mm[value_offset : value_offset + value_size])
+        self._overlay[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._removed:
+            self._removed.discard(key)
+        elif key not in self._overlay and self._find(key) is None:
+            self._extra.add(key)
+        self._overlay[key] = value
+
+    def __delitem__(self, key):
+        if key in self._extra:
+            self._extra.discard(key)
+            del self._overlay[key]
+            return
+
+        if key in self._removed or self._find(key) is None:
+            raise KeyError(key)
+
+        self._overlay.pop(key, None)
+        self._removed.add(key)
+
+    def __iter__(self):
+        mm = self._mm
+        for idx in range(self._count):
+            key_offset, key_size, _, _ = _RECORD.unpack_from(
+                mm, self._offset + idx * _RECORD.size
+            )
+            key = mm[key_offset : key_offset + key_size].decode("utf-8")
+            if key not in self._removed:
+                yield key
+
+        yield from list(self._extra)
+
+    def __len__(self):
+        return self._count - len(self._removed) + len(self._extra)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} with {len(self)} entries>"
+
+
+def _is_literal(node):
+    try:
+        ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return False
+    return True
+
+
+def _string_value(node):
+    # ast.Str is used instead of ast.Constant before Python 3.8
+    if _is_literal(node):
+        value = ast.literal_eval(node)
+        if isinstance(value, str):
+            return value
+    return None
+
+
+def _is_registration_function(node):
+    # objc.registerMetaDataForSelector
+    return (
+        isinstance(node, ast.Attribute)
+        and node.attr == "registerMetaDataForSelector"
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "objc"
+    )
+
+
+def _loaded_names(statements):
+    names = set()
+    for stmt in statements:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                names.add(node.id)
+    return names
+
+
+def _is_selector_registration(stmt):
+    return (
+        isinstance(stmt, ast.Expr)
+        and isinstance(stmt.value, ast.Call)
+        and isinstance(stmt.value.func, ast.Name)
+        and stmt.value.func.id == "r"
+        and len(stmt.value.args) == 3
+        and not stmt.value.keywords
+    )
+
+
+def _section_name(stmt):
+    if (
+        isinstance(stmt, ast.Assign)
+        and len(stmt.targets) == 1
+        and isinstance(stmt.targets[0], ast.Name)
+    ):
+        return stmt.targets[0].id
+    return None
+
+
+def compileMetadataSource(source, filename="<metadata>"):
+    """
+    Split the source code of a "_metadata" module into data sections
+    and a code object for the remaining statements.
+
+    Returns a tuple (sections, code).
+    """
+    tree = ast.parse(source, filename)
+
+    assignments = {}
+    for stmt in tree.body:
+        name = _section_name(stmt)
+        if name is not None:
+            assignments[name] = assignments.get(name, 0) + 1
+
+    # Only extract sections that are assigned once and are
+    # not used by other code in the module.
+    candidates = {
+        name
+        for name, count in assignments.items()
+        if count == 1 and name in (_VALUE_SECTIONS | _MAPPING_SECTIONS)
+    }
+    candidates -= _loaded_names(
+        stmt for stmt in tree.body if _section_name(stmt) not in candidates
+    )
+
+    # Selector registrations can only be extracted when 'r' is
+    # the regular registration function, and all registrations
+    # that aren't literals can be identified.
+    extract_selectors = False
+    for stmt in tree.body:
+        if _section_name(stmt) == "r" and _is_registration_function(stmt.value):
+            extract_selectors = assignments["r"] == 1
+
+    dynamic_registrations = set()
+    for stmt in tree.body:
+        if not extract_selectors:
+            break
+        if not isinstance(stmt, ast.Try):
+            continue
+        for call in stmt.body:
+            if not _is_selector_registration(call):
+                continue
+            class_name, selector, metadata = call.value.args
+            if not (_is_literal(class_name) and _is_literal(selector)):
+                extract_selectors = False
+                break
+            if not _is_literal(metadata):
+                dynamic_registrations.add(
+                    (ast.literal_eval(class_name), ast.literal_eval(selector))
+                )
+
+    sections = {}
+    selectors = {}
+    residual = []
+    for stmt in tree.body:
+        name = _section_name(stmt)
+        if name in candidates:
+            if name in _VALUE_SECTIONS:
+                if _is_literal(stmt.value):
+                    sections[name] = ast.literal_eval(stmt.value)
+                    continue
+
+            elif isinstance(stmt.value, ast.Dict) and None not in stmt.value.keys:
+                values = {}
+                remaining_keys = []
+                remaining_values = []
+                for key, value in zip(stmt.value.keys, stmt.value.values):
+                    key_value = _string_value(key)
+                    if key_value is not None and _is_literal(value):
+                        values[key_value] = ast.literal_eval(value)
+                    else:
+                        remaining_keys.append(key)
+                        remaining_values.append(value)
+
+                sections[name] = values
+                if remaining_keys:
+                    stmt.value.keys = remaining_keys
+                    stmt.value.values = remaining_values
+                    residual.append(stmt)
+                continue
+
+        elif extract_selectors and isinstance(stmt, ast.Try):
+            body = []
+            for call in stmt.body:
+                if _is_selector_registration(call):
+                    class_name, selector, metadata = (
+                        ast.literal_eval(arg) if _is_literal(arg) else None
+                        for arg in call.value.args
+                    )
+                    if (
+                        isinstance(class_name, bytes)
+                        and metadata is not None
+                        and (class_name, selector) not in dynamic_registrations
+                    ):
+                        selectors.setdefault(class_name.decode(), []).append(
+                            (selector, metadata)
+                        )
+                        continue
+                body.append(call)
+
+            if not body:
+                body.append(ast.Pass())
+            stmt.body = body
+
+        residual.append(stmt)
+
+    if selectors:
+        sections[_SELECTOR_SECTION] = selectors
+
+    module = ast.Module(body=residual, type_ignores=[])
+    ast.fix_missing_locations(module)
+    return sections, compile(module, filename, "exec")
+
+
+def writeMetadataFile(
+    path, sections, code=None, source_size=0, source_mtime=0, source_hash=b""
+):
+    """
+    Write a precompiled metadata file with the given sections
+    and optional code object. The *source_* arguments describe
+    the "_metadata" module and are used to detect that the file
+    is out of date.
+    """
+    buf = bytearray(_HEADER.size)
+    toc = {}
+
+    for name, value in sections.items():
+        if name in _VALUE_SECTIONS:
+            data = marshal.dumps(value)
+            toc[name] = ("value", len(buf), len(data))
+            buf += data
+            continue
+
+        items = sorted(
+            (key.encode("utf-8"), marshal.dumps(value)) for key, value in value.items()
+        )
+
+        records_offset = len(buf)
+        buf += bytes(_RECORD.size * len(items))
+        for idx, (key, data) in enumerate(items):
+            key_offset = len(buf)
+            buf += key
+            value_offset = len(buf)
+            buf += data
+            _RECORD.pack_into(
+                buf,
+                records_offset + idx * _RECORD.size,
+                key_offset,
+                len(key),
+                value_offset,
+                len(data),
+            )
+        toc[name] = ("mapping", records_offset, len(items))
+
+    if code is not None:
+        data = marshal.dumps(code)
+        toc["code"] = ("code", len(buf), len(data))
+        buf += data
+
+    toc_data = marshal.dumps(toc)
+    toc_offset = len(buf)
+    buf += toc_data
+    _HEADER.pack_into(
+        buf,
+        0,
+        _MAGIC,
+        _VERSION,
+        importlib.util.MAGIC_NUMBER,
+        source_size,
+        source_mtime,
+        source_hash,
+        toc_offset,
+        len(toc_data),
+    )
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fp:
+        fp.write(buf)
+    os.replace(tmp_path, path)
+
+
+def compileMetadataFile(source_path, path=None):
+    """
+    Create the precompiled metadata file for the "_metadata" module
+    at *source_path*. The default for *path* is the source path with
+    a ".bin" suffix.
+
+    Returns the path of the precompiled metadata file.
+    """
+    if path is None:
+        path = os.path.splitext(source_path)[0] + ".bin"
+
+    with open(source_path, "rb") as fp:
+        source = fp.read()
+        source_mtime = os.fstat(fp.fileno()).st_mtime_ns
+
+    sections, code = compileMetadataSource(source, source_path)
+    writeMetadataFile(
+        path,
+        sections,
+        code,
+        len(source),
+        source_mtime,
+        hashlib.sha256(source).digest(),
+    )
+    return path
+
+
+@functools.lru_cache(maxsize=1)
+def _install_paths():
+    paths = {sysconfig.get_path("purelib"), sysconfig.get_path("platlib")}
+    if site.ENABLE_USER_SITE and site.USER_SITE:
+        paths.add(site.USER_SITE)
+    return tuple(
+        os.path.join(os.path.realpath(path), "") for path in paths if path is not None
+    )
+
+
+def _is_installed(path):
+    """
+    Returns True if *path* is inside a site-packages directory
+    """
+    return os.path.realpath(path).startswith(_install_paths())
+
+
+def _is_up_to_date(source_path, source_size, source_mtime, source_hash):
+    try:
+        st = os.stat(source_path)
+    except OSError:
+        # Only the precompiled file is installed
+        return True
+
+    if st.st_size != source_size:
+        return False
+
+    if st.st_mtime_ns == source_mtime:
+        return True
+
+    # The modification time changes when the file is copied (for
+    # example when installing a wheel). Installed files are not
+    # edited, for other files check the contents as well.
+    if _is_installed(source_path):
+        return True
+
+    try:
+        with open(source_path, "rb") as fp:
+            source = fp.read()
+    except OSError:
+        return False
+    return hashlib.sha256(source).digest() == source_hash
+
+
+def loadMetadataFile(path, source_path=None, module_name="_metadata"):
+    """
+    Load a precompiled metadata file and return the metadata dictionary,
+    or None when the file cannot be used (missing, invalid, created for
+    another Python version or out of date relative to *source_path*).
+    """
+    try:
+        fp = open(path, "rb")
+    except OSError:
+        return None
+
+    with fp:
+        try:
+            mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+    if len(mm) < _HEADER.size:
+        return None
+
+    (
+        magic,
+        version,
+        py_magic,
+        source_size,
+        source_mtime,
+        source_hash,
+        toc_offset,
+        toc_size,
+    ) = _HEADER.unpack_from(mm, 0)
+    if magic != _MAGIC or version != _VERSION:
+        return None
+
+    if source_path is not None and not _is_up_to_date(
+        source_path, source_size, source_mtime, source_hash
+    ):
+        return None
+
+    toc = marshal.loads(mm[toc_offset : toc_offset + toc_size])
+    if "code" in toc and py_magic != importlib.util.MAGIC_NUMBER:
+        return None
+
+    result = {"__name__": module_name, "__file__": source_path}
+    if "code" in toc:
+        _, offset, size = toc["code"]
+        exec(marshal.loads(mm[offset : offset + size]), result)  # noqa: S102
+
+    for name, (kind, offset, size) in toc.items():
+        if kind == "value":
+            result[name] = marshal.loads(mm[offset : offset + size])
+
+        elif kind == "mapping":
+            section = _LazySection(mm, offset, size)
+            if name in result:
+                # Entries that could not be stored as data
+                section.update(result[name])
+            result[name] = section
+
+    if _SELECTOR_SECTION in result:
+        registerMetaDataTable(result.pop(_SELECTOR_SECTION))
+
+    return result
+
+
+def metadataForModule(name):
+    """
+    Returns the metadata dictionary for the "_metadata" module with
+    the given (fully qualified) name. This uses the precompiled metadata
+    file next to the module when that is usable, and imports the module
+    otherwise.
+    """
+    spec = importlib.util.find_spec(name)
+    if spec is not None and spec.has_location and spec.origin.endswith(".py"):
+        result = loadMetadataFile(spec.origin[:-3] + ".bin", spec.origin, name)
+        if result is not None:
+            return result
+
+    return importlib.import_module(name).__dict__
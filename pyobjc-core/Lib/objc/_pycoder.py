@@ -9,8 +9,11 @@ load_* functions below.
 """
 __all__ = ()
 
+import array
 import copy
 import copyreg
+import itertools
+import struct
 import sys
 import collections.abc
 from pickle import PicklingError, UnpicklingError
@@ -55,6 +58,40 @@ def whichmodule(obj, name):
     return "__main__"
 
 
+# Cache for save_global, maps (id(obj), name) to the name of a
+# module containing 'obj' as 'name'. Entries are verified before they
+# are used (the module attribute must still be 'obj'), which also
+# makes them safe when an id is reused for another object.
+_global_cache = {}
+_GLOBAL_CACHE_SIZE = 1024
+
+
+def _cached_global(obj, name):
+    module_name = _global_cache.get((id(obj), name))
+    if module_name is None:
+        return None
+
+    module = sys.modules.get(module_name)
+    if module is not None and getattr(obj, "__module__", None) in (
+        None,
+        module_name,
+    ):
+        try:
+            if _getattribute(module, name) is obj:
+                return module_name
+        except AttributeError:
+            pass
+
+    _global_cache.pop((id(obj), name), None)
+    return None
+
+
+def _remember_global(obj, name, module_name):
+    if len(_global_cache) >= _GLOBAL_CACHE_SIZE:
+        _global_cache.pop(next(iter(_global_cache), None), None)
+    _global_cache[(id(obj), name)] = module_name
+
+
 def intern(value):
     if isinstance(value, objc.pyobjc_unicode):
         return sys.intern(str(value))
@@ -94,6 +131,7 @@ kOP_LIST = 11
 kOP_DICT = 12
 kOP_GLOBAL_EXT = 13
 kOP_FLOAT_STR = 14
+kOP_REDUCE_PACKED = 15
 
 kKIND = NSString.stringWithString_("kind")
 kFUNC = NSString.stringWithString_("func")
@@ -106,6 +144,176 @@ kVALUE = NSString.stringWithString_("value")
 kNAME = NSString.stringWithString_("name")
 kMODULE = NSString.stringWithString_("module")
 kCODE = NSString.stringWithString_("code")
+kPACKED_LIST = NSString.stringWithString_("packedlist")
+kPACKED_DICT = NSString.stringWithString_("packeddict")
+kPACKED_STATE = NSString.stringWithString_("packedstate")
+kPACKED_OBJECTS = NSString.stringWithString_("packedobjects")
+
+
+# Bulk encoding of primitive values (kOP_REDUCE_PACKED)
+#
+# With 'objc.options.nscoding_bulk_encoding' enabled the list items,
+# dict items and instance state of objects that are archived through
+# their __reduce__ method are stored in a compact byte string instead
+# of as a Cocoa collection with an archived object per value.
+#
+# The byte string starts with a version byte, followed by runs of
+# values of the same kind. Every run starts with a tag byte and
+# the number of values in the run (little-endian int64), followed
+# by the payload for the run:
+#
+# - _PACK_INT: an array of little-endian int64 values
+# - _PACK_FLOAT: an array of little-endian doubles
+# - _PACK_STR: an array of int64 lengths (in code points), the
+#   total byte length (int64) and the UTF-8 encoded text of all values.
+# - _PACK_BYTES: an array of int64 lengths, the total byte length (int64)
+#   and the concatenated values.
+# - _PACK_OBJECT: no payload, the values are the next items of the
+#   list of objects archived with the key 'packedobjects'
+#
+# Dictionaries are stored as all keys followed by all values.
+
+_PACK_VERSION = 1
+_PACK_INT = 1
+_PACK_FLOAT = 2
+_PACK_STR = 3
+_PACK_BYTES = 4
+_PACK_OBJECT = 5
+
+_PACK_TAGS = {int: _PACK_INT, float: _PACK_FLOAT, str: _PACK_STR, bytes: _PACK_BYTES}
+_RUN_HEADER = struct.Struct("<Bq")
+_LENGTH = struct.Struct("<q")
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def _pack_tag(value):
+    tag = _PACK_TAGS.get(type(value), _PACK_OBJECT)
+    if tag == _PACK_INT and not (_INT64_MIN <= value <= _INT64_MAX):
+        return _PACK_OBJECT
+    return tag
+
+
+def _pack_array(typecode, values):
+    result = array.array(typecode, values)
+    if sys.byteorder != "little":  # pragma: no cover
+        result.byteswap()
+    return result.tobytes()
+
+
+def _unpack_array(typecode, data):
+    result = array.array(typecode)
+    result.frombytes(data)
+    if sys.byteorder != "little":  # pragma: no cover
+        result.byteswap()
+    return result.tolist()
+
+
+def _pack_values(values, objects):
+    """
+    Return the packed representation of *values*, or None when
+    *values* does not contain primitive values.
+
+    Values that cannot be packed are appended to *objects*.
+    """
+    runs = []
+    has_primitives = False
+    for tag, run in itertools.groupby(values, key=_pack_tag):
+        run = list(run)
+        if tag == _PACK_INT:
+            payload = [_pack_array("q", run)]
+
+        elif tag == _PACK_FLOAT:
+            payload = [_pack_array("d", run)]
+
+        elif tag == _PACK_STR:
+            data = "".join(run).encode("utf-8", "surrogatepass")
+            payload = [
+                _pack_array("q", [len(v) for v in run]),
+                _LENGTH.pack(len(data)),
+                data,
+            ]
+
+        elif tag == _PACK_BYTES:
+            data = b"".join(run)
+            payload = [
+                _pack_array("q", [len(v) for v in run]),
+                _LENGTH.pack(len(data)),
+                data,
+            ]
+
+        if tag == _PACK_OBJECT:
+            payload = ()
+        else:
+            has_primitives = True
+        runs.append((tag, run, payload))
+
+    if not has_primitives:
+        return None
+
+    chunks = [bytes([_PACK_VERSION])]
+    for tag, run, payload in runs:
+        chunks.append(_RUN_HEADER.pack(tag, len(run)))
+        chunks.extend(payload)
+        if tag == _PACK_OBJECT:
+            objects.extend(run)
+    return b"".join(chunks)
+
+
+def _split(sequence, lengths):
+    result = []
+    start = 0
+    for end in itertools.accumulate(lengths):
+        result.append(sequence[start:end])
+        start = end
+    return result
+
+
+def _unpack_values(data, objects):
+    """
+    Return the list of values in the packed representation *data*,
+    *objects* is an iterator for the values that weren't packed.
+    """
+    view = memoryview(data)
+    if not view or view[0] != _PACK_VERSION:
+        raise UnpicklingError("Unsupported packed value encoding")
+
+    result = []
+    offset = 1
+    end = len(view)
+    while offset < end:
+        tag, count = _RUN_HEADER.unpack_from(view, offset)
+        offset += _RUN_HEADER.size
+
+        if tag in (_PACK_INT, _PACK_FLOAT):
+            size = 8 * count
+            result.extend(
+                _unpack_array(
+                    "q" if tag == _PACK_INT else "d", view[offset : offset + size]
+                )
+            )
+            offset += size
+
+        elif tag in (_PACK_STR, _PACK_BYTES):
+            size = 8 * count
+            lengths = _unpack_array("q", view[offset : offset + size])
+            offset += size
+            (size,) = _LENGTH.unpack_from(view, offset)
+            offset += _LENGTH.size
+            if tag == _PACK_STR:
+                block = str(view[offset : offset + size], "utf-8", "surrogatepass")
+            else:
+                block = view[offset : offset + size].tobytes()
+            offset += size
+            result.extend(_split(block, lengths))
+
+        elif tag == _PACK_OBJECT:
+            result.extend(itertools.islice(objects, count))
+
+        else:
+            raise UnpicklingError(f"Unsupported packed value kind: {tag}")
+
+    return result
 
 
 class _EmptyClass:
@@ -130,18 +338,21 @@ def save_reduce(
         raise PicklingError("func from reduce should be callable")
 
     if coder.allowsKeyedCoding():
+        if listitems is not None:
+            listitems = list(listitems)
+        if dictitems is not None:
+            dictitems = dict(dictitems)
+
+        if objc.options.nscoding_bulk_encoding and save_reduce_packed(
+            coder, func, args, state, listitems, dictitems
+        ):
+            return
+
         coder.encodeInt_forKey_(kOP_REDUCE, kKIND)
         coder.encodeObject_forKey_(func, kFUNC)
         coder.encodeObject_forKey_(args, kARGS)
-        if listitems is None:
-            coder.encodeObject_forKey_(None, kLIST)
-        else:
-            coder.encodeObject_forKey_(list(listitems), kLIST)
-
-        if dictitems is None:
-            coder.encodeObject_forKey_(None, kDICT)
-        else:
-            coder.encodeObject_forKey_(dict(dictitems), kDICT)
+        coder.encodeObject_forKey_(listitems, kLIST)
+        coder.encodeObject_forKey_(dictitems, kDICT)
         coder.encodeObject_forKey_(state, kSTATE)
 
     else:
@@ -160,6 +371,52 @@ def save_reduce(
         coder.encodeObject_(state)
 
 
+def save_reduce_packed(coder, func, args, state, listitems, dictitems):
+    # Variant of save_reduce for keyed coders that stores runs of
+    # primitive values in the object state as a single byte string,
+    # returns False when there is nothing to pack.
+    objects = []
+    packed_list = packed_dict = packed_state = None
+
+    if listitems:
+        packed_list = _pack_values(listitems, objects)
+
+    if dictitems:
+        packed_dict = _pack_values(
+            itertools.chain(dictitems.keys(), dictitems.values()), objects
+        )
+
+    if type(state) is dict and state:
+        packed_state = _pack_values(
+            itertools.chain(state.keys(), state.values()), objects
+        )
+
+    if packed_list is None and packed_dict is None and packed_state is None:
+        return False
+
+    coder.encodeInt_forKey_(kOP_REDUCE_PACKED, kKIND)
+    coder.encodeObject_forKey_(func, kFUNC)
+    coder.encodeObject_forKey_(args, kARGS)
+    coder.encodeObject_forKey_(objects, kPACKED_OBJECTS)
+
+    if packed_list is None:
+        coder.encodeObject_forKey_(listitems, kLIST)
+    else:
+        coder.encodeObject_forKey_(packed_list, kPACKED_LIST)
+
+    if packed_dict is None:
+        coder.encodeObject_forKey_(dictitems, kDICT)
+    else:
+        coder.encodeObject_forKey_(packed_dict, kPACKED_DICT)
+
+    if packed_state is None:
+        coder.encodeObject_forKey_(state, kSTATE)
+    else:
+        coder.encodeObject_forKey_(packed_state, kPACKED_STATE)
+
+    return True
+
+
 def save_int(coder, obj):
     if coder.allowsKeyedCoding():
         coder.encodeInt_forKey_(kOP_LONG, kKIND)
@@ -197,21 +454,25 @@ def save_global(coder, obj, name=None):
         # doesn't have a qualname in Python 3.10...
         name = obj.__name__
 
-    module_name = whichmodule(obj, name)
-    try:
-        module = import_module(module_name)
-        obj2 = _getattribute(module, name)
+    module_name = _cached_global(obj, name)
+    if module_name is None:
+        module_name = whichmodule(obj, name)
+        try:
+            module = import_module(module_name)
+            obj2 = _getattribute(module, name)
 
-    except (ImportError, KeyError, AttributeError):
-        raise PicklingError(
-            f"Can't pickle {obj!r}: it's not found as {module_name}.{name}"
-        )
-    else:
-        if obj2 is not obj:
+        except (ImportError, KeyError, AttributeError):
             raise PicklingError(
-                "Can't pickle %r: it's not the same object as %s.%s"
-                % (obj, module_name, name)
+                f"Can't pickle {obj!r}: it's not found as {module_name}.{name}"
             )
+        else:
+            if obj2 is not obj:
+                raise PicklingError(
+                    "Can't pickle %r: it's not the same object as %s.%s"
+                    % (obj, module_name, name)
+                )
+
+        _remember_global(obj, name, module_name)
 
     code = copyreg._extension_registry.get((module_name, name))
 
@@ -477,6 +738,45 @@ def load_reduce(coder, setValue):
         if isinstance(state, NSArray):
             state = tuple(state)
 
+    return _finish_reduce(value, listitems, dictitems, state)
+
+
+decode_dispatch[kOP_REDUCE] = load_reduce
+
+
+def _load_packed_items(coder, packed_key, key, objects, is_mapping):
+    if not coder.containsValueForKey_(packed_key):
+        return coder.decodeObjectForKey_(key)
+
+    values = _unpack_values(bytes(coder.decodeObjectForKey_(packed_key)), objects)
+    if not is_mapping:
+        return values
+
+    count = len(values) // 2
+    return dict(zip(values[:count], values[count:]))
+
+
+def load_reduce_packed(coder, setValue):
+    # Only keyed coders are used for kOP_REDUCE_PACKED
+    func = coder.decodeObjectForKey_(kFUNC)
+    args = coder.decodeObjectForKey_(kARGS)
+    value = func(*args)
+
+    # See load_reduce
+    setValue(value)
+
+    objects = iter(coder.decodeObjectForKey_(kPACKED_OBJECTS) or ())
+    listitems = _load_packed_items(coder, kPACKED_LIST, kLIST, objects, False)
+    dictitems = _load_packed_items(coder, kPACKED_DICT, kDICT, objects, True)
+    state = _load_packed_items(coder, kPACKED_STATE, kSTATE, objects, True)
+
+    return _finish_reduce(value, listitems, dictitems, state)
+
+
+decode_dispatch[kOP_REDUCE_PACKED] = load_reduce_packed
+
+
+def _finish_reduce(value, listitems, dictitems, state):
     setstate = getattr(value, "__setstate__", None)
     if setstate:
         setstate(state)
@@ -518,9 +818,6 @@ def load_reduce(coder, setValue):
     return value
 
 
-decode_dispatch[kOP_REDUCE] = load_reduce
-
-
 def pyobjectEncode(self, coder):
     t = type(self)
 
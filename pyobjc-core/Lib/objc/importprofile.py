@@ -0,0 +1,446 @@
+"""
+Profiler for the import of framework wrappers.
+
+This module records how much time is spent in the various phases of
+importing framework wrappers (evaluating metadata, registering convenience
+methods, loading the framework bundle, ...) and which attributes of the
+lazily loaded framework modules are resolved.
+
+Usage::
+
+    python -m objc.importprofile [-c CODE] [--json FILE] MODULE ...
+
+Or from Python::
+
+    with objc.importprofile.ImportProfile() as profile:
+        import AppKit
+
+    profile.print_report()
+"""
+
+__all__ = ("ImportProfile",)
+
+import argparse
+import importlib
+import json
+import sys
+import time
+
+import objc
+import objc._lazyimport as lazyimport
+import objc._metadatafile as metadatafile
+
+# Phases in the order they are reported. The time for "import"
+# and "init" excludes the time spent in the other phases and in
+# nested imports.
+PHASES = ("import", "metadata", "conveniences", "loadBundle", "cftypes", "init")
+
+# Functions in the objc module whose time is accounted as "conveniences"
+_CONVENIENCE_FUNCTIONS = (
+    "addConvenienceForClass",
+    "addConvenienceForBasicMapping",
+    "addConvenienceForBasicSequence",
+    "registerABCForClass",
+)
+
+
+class ModuleProfile:
+    """
+    Profile information for a single module
+    """
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.is_lazy = False
+        self.attributes = []
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "start": self.start,
+            "lazy": self.is_lazy,
+            "phases": dict(self.phases),
+            "attributes": [
+                {"name": name, "start": start, "duration": duration, "found": found}
+                for name, start, duration, found in self.attributes
+            ],
+        }
+
+
+class _TimedLoader:
+    """
+    Proxy for a module loader that records the time needed to
+    execute the module.
+    """
+
+    def __init__(self, loader, profile):
+        self._loader = loader
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        name = module.__name__
+        parent, _, basename = name.rpartition(".")
+        if parent and basename == "_metadata":
+            # Most wrappers import their metadata as a submodule instead
+            # of using metadataForModule, account that as the metadata
+            # phase of the wrapper.
+            stack = self._profile._stack
+            if stack and stack[-1].name == parent and stack[-1].phase == "metadata":
+                self._loader.exec_module(module)
+                return
+            name, phase = parent, "metadata"
+        else:
+            phase = "import"
+
+        with self._profile._phase(name, phase, exclusive=True):
+            self._loader.exec_module(module)
+
+
+class _ImportFinder:
+    """
+    Meta path finder that wraps the loader of modules found
+    by the other finders in a _TimedLoader.
+    """
+
+    def __init__(self, profile):
+        self._profile = profile
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profile)
+        return spec
+
+
+class ImportProfile:
+    """
+    Collect timing information for importing framework wrappers.
+
+    Profiling is active between calls to :meth:`enable` and :meth:`disable`,
+    or in a with statement. Framework wrappers that were already imported
+    before profiling is enabled are not included in the import statistics,
+    but resolving attributes of those modules is.
+    """
+
+    def __init__(self):
+        self.modules = {}
+        self.total = 0.0
+        self._origin = None
+        self._stack = []
+        self._saved = None
+        self._finder = None
+
+    def enable(self):
+        if self._saved is not None:
+            raise RuntimeError("Import profiling is already enabled")
+
+        self._origin = time.perf_counter()
+        self._saved = []
+
+        def patch(owner, name, wrapper):
+            orig = getattr(owner, name)
+            self._saved.append((owner, name, orig))
+            setattr(owner, name, wrapper(orig))
+
+        patch(lazyimport, "_loadBundle", self._wrap_loadBundle)
+        patch(lazyimport.ObjCLazyModule, "__init__", self._wrap_init)
+        patch(lazyimport.ObjCLazyModule, "__getattr__", self._wrap_getattr)
+        patch(
+            lazyimport.ObjCLazyModule,
+            "_ObjCLazyModule__load_cftypes",
+            self._wrap_cftypes,
+        )
+        patch(metadatafile, "metadataForModule", self._wrap_metadata)
+        for name in _CONVENIENCE_FUNCTIONS:
+            patch(objc, name, self._wrap_convenience)
+
+        self._finder = _ImportFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def disable(self):
+        if self._saved is None:
+            return
+
+        self.total = time.perf_counter() - self._origin
+
+        sys.meta_path.remove(self._finder)
+        self._finder = None
+
+        for owner, name, orig in reversed(self._saved):
+            setattr(owner, name, orig)
+        self._saved = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def _module(self, name):
+        try:
+            return self.modules[name]
+        except KeyError:
+            result = self.modules[name] = ModuleProfile(
+                name, time.perf_counter() - self._origin
+            )
+            return result
+
+    def _phase(self, name, phase, exclusive=False):
+        return _PhaseTimer(self, name, phase, exclusive)
+
+    def _current_module(self):
+        if self._stack:
+            return self._stack[-1].name
+        return "__main__"
+
+    #
+    # Wrappers for the instrumented functions
+    #
+
+    def _wrap_loadBundle(self, orig):
+        def _loadBundle(frameworkName, frameworkIdentifier, frameworkPath):
+            with self._phase(frameworkName, "loadBundle"):
+                return orig(frameworkName, frameworkIdentifier, frameworkPath)
+
+        return _loadBundle
+
+    def _wrap_init(self, orig):
+        def __init__(module, name, *args, **kwds):
+            self._module(name).is_lazy = True
+            with self._phase(name, "init", exclusive=True):
+                orig(module, name, *args, **kwds)
+
+        return __init__
+
+    def _wrap_cftypes(self, orig):
+        def __load_cftypes(module, cftypes):
+            with self._phase(module.__name__, "cftypes"):
+                orig(module, cftypes)
+
+        return __load_cftypes
+
+    def _wrap_getattr(self, orig):
+        def __getattr__(module, name):
+            if name.startswith("__") and name != "__all__":
+                return orig(module, name)
+
+            start = time.perf_counter()
+            found = False
+            try:
+                result = orig(module, name)
+                found = True
+                return result
+            finally:
+                end = time.perf_counter()
+                self._module(module.__name__).attributes.append(
+                    (name, start - self._origin, end - start, found)
+                )
+
+        return __getattr__
+
+    def _wrap_metadata(self, orig):
+        def metadataForModule(name):
+            modname, _, _ = name.rpartition(".")
+            with self._phase(modname or name, "metadata"):
+                return orig(name)
+
+        return metadataForModule
+
+    def _wrap_convenience(self, orig):
+        def wrapper(*args, **kwds):
+            if self._stack and self._stack[-1].phase == "conveniences":
+                return orig(*args, **kwds)
+
+            with self._phase(self._current_module(), "conveniences"):
+                return orig(*args, **kwds)
+
+        wrapper.__name__ = orig.__name__
+        wrapper.__doc__ = orig.__doc__
+        return wrapper
+
+    #
+    # Reporting
+    #
+
+    def as_dict(self):
+        """
+        Return the profile information as a dictionary that can
+        be serialized to JSON.
+        """
+        return {
+            "python": ".".join(str(x) for x in sys.version_info[:3]),
+            "objc": objc.__version__,
+            "total": self.total,
+            "modules": [
+                mod.as_dict()
+                for mod in sorted(self.modules.values(), key=lambda m: m.start)
+            ],
+        }
+
+    def write_json(self, fp):
+        """
+        Write the profile information as JSON to a file-like object
+        """
+        json.dump(self.as_dict(), fp, indent=2)
+
+    def print_report(self, file=None, top=20):
+        """
+        Print a human-readable report with the time spent per module and
+        the *top* slowest attribute resolutions.
+        """
+        if file is None:
+            file = sys.stdout
+
+        modules = [
+            mod
+            for mod in self.modules.values()
+            if mod.is_lazy or mod.phases["metadata"] or mod.attributes
+        ]
+        modules.sort(key=lambda m: sum(m.phases.values()), reverse=True)
+
+        header = ["module"] + list(PHASES) + ["attrs", "attr time"]
+        rows = []
+        for mod in modules:
+            rows.append(
+                [mod.name]
+                + [_ms(mod.phases[phase]) for phase in PHASES]
+                + [
+                    str(len(mod.attributes)),
+                    _ms(sum(attr[2] for attr in mod.attributes)),
+                ]
+            )
+        _print_table(header, rows, file)
+
+        attributes = [
+            (mod.name,) + attr
+            for mod in self.modules.values()
+            for attr in mod.attributes
+        ]
+        if attributes and top:
+            attributes.sort(key=lambda a: a[3], reverse=True)
+            print(file=file)
+            _print_table(
+                ["module", "attribute", "at", "time", "found"],
+                [
+                    [modname, name, _ms(start), _ms(duration), "yes" if found else "no"]
+                    for modname, name, start, duration, found in attributes[:top]
+                ],
+                file,
+            )
+
+        print(file=file)
+        print(f"Total time: {_ms(self.total)} ms (times in ms)", file=file)
+
+
+class _PhaseTimer:
+    __slots__ = ("profile", "name", "phase", "exclusive", "start", "nested")
+
+    def __init__(self, profile, name, phase, exclusive):
+        self.profile = profile
+        self.name = name
+        self.phase = phase
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        self.profile._module(self.name)
+        self.profile._stack.append(self)
+        self.nested = 0.0
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profile._stack
+        stack.pop()
+
+        self.profile.modules[self.name].phases[self.phase] += elapsed - self.nested
+
+        # Time spent in a phase is not counted for an enclosing
+        # phase that only records its exclusive time.
+        if stack and stack[-1].exclusive:
+            stack[-1].nested += elapsed
+
+
+def _ms(value):
+    return f"{value * 1000:.1f}"
+
+
+def _print_table(header, rows, file):
+    widths = [len(col) for col in header]
+    for row in rows:
+        widths = [max(w, len(col)) for w, col in zip(widths, row)]
+
+    def fmt(row):
+        return "  ".join(
+            col.ljust(w) if idx == 0 else col.rjust(w)
+            for idx, (col, w) in enumerate(zip(row, widths))
+        )
+
+    print(fmt(header), file=file)
+    print("  ".join("-" * w for w in widths), file=file)
+    for row in rows:
+        print(fmt(row), file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m objc.importprofile",
+        description="Profile the import of framework wrappers",
+    )
+    parser.add_argument(
+        "-c",
+        dest="code",
+        metavar="CODE",
+        help="Python code to run after importing the modules",
+    )
+    parser.add_argument(
+        "--json", metavar="FILE", help="Write the report as JSON to FILE"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        metavar="N",
+        help="Number of attribute resolutions to show (default: %(default)s)",
+    )
+    parser.add_argument("modules", nargs="+", metavar="MODULE")
+    args = parser.parse_args(argv)
+
+    with ImportProfile() as profile:
+        namespace = {"__name__": "__main__"}
+        for name in args.modules:
+            importlib.import_module(name)
+            toplevel = name.partition(".")[0]
+            namespace[toplevel] = sys.modules[toplevel]
+
+        if args.code is not None:
+            exec(compile(args.code, "<string>", "exec"), namespace)
+
+    profile.print_report(top=args.top)
+
+    if args.json is not None:
+        with open(args.json, "w") as fp:
+            profile.write_json(fp)
+
+
+if __name__ == "__main__":
+    main()
@@ -943,6 +943,65 @@ static PyObject* _Nullable registerMetaData(PyObject* self __attribute__((__unus
     }
 }
 
+PyDoc_STRVAR(
+    _registerMetaDataForClass_doc,
+    "_registerMetaDataForClass(class_, entries)\n" CLINIC_SEP "\n"
+    "PRIVATE FUNCTION\n"
+    "\n"
+    "Registers a sequence of (selector, metadata) tuples for *class_*\n"
+    "without invalidating cached method information. Only use this for\n"
+    "classes that aren't used from Python yet, or invalidate cached\n"
+    "method information afterwards.");
+static PyObject* _Nullable _registerMetaDataForClass(PyObject* self
+                                                     __attribute__((__unused__)),
+                                                     PyObject* _Nullable args,
+                                                     PyObject* _Nullable kwds)
+{
+    static char* keywords[] = {"class_", "entries", NULL};
+
+    PyObject* class_name;
+    PyObject* entries;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "SO", keywords, &class_name,
+                                     &entries)) {
+        return NULL;
+    }
+    PyObjC_Assert(PyBytes_Check(class_name), NULL);
+
+    entries = PySequence_Fast(entries, "entries must be a sequence");
+    if (entries == NULL) {
+        return NULL;
+    }
+
+    /* PyObjC_AddToRegistry only updates PyObjC_MappingCount when
+     * metadata is not being updated.
+     */
+    BOOL      updating = PyObjC_UpdatingMetaData;
+    PyObject* result   = Py_None;
+
+    PyObjC_UpdatingMetaData = YES;
+    for (Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(entries); i++) {
+        PyObject* selector;
+        PyObject* metadata;
+
+        if (!PyArg_ParseTuple(PySequence_Fast_GET_ITEM(entries, i), "SO", &selector,
+                              &metadata)) {
+            result = NULL;
+            break;
+        }
+
+        if (PyObjC_registerMetaData(class_name, selector, metadata) < 0) {
+            result = NULL;
+            break;
+        }
+    }
+    PyObjC_UpdatingMetaData = updating;
+    Py_DECREF(entries);
+
+    Py_XINCREF(result);
+    return result;
+}
+
 PyDoc_STRVAR(registerStructAlias_doc,
              "registerStructAlias(typestr, structType)\n" CLINIC_SEP "\n"
              "Registers 'typestr' as a type that should be mapped onto 'structType'\n"
@@ -1831,6 +1890,10 @@ static PyMethodDef mod_methods[] = {
      .ml_meth  = (PyCFunction)registerMetaData,
      .ml_flags = METH_VARARGS | METH_KEYWORDS,
      .ml_doc   = registerMetaData_doc},
+    {.ml_name  = "_registerMetaDataForClass",
+     .ml_meth  = (PyCFunction)_registerMetaDataForClass,
+     .ml_flags = METH_VARARGS | METH_KEYWORDS,
+     .ml_doc   = _registerMetaDataForClass_doc},
     {.ml_name  = "_copyMetadataRegistry",
      .ml_meth  = (PyCFunction)copyMetadataRegistry,
      .ml_flags = METH_NOARGS,
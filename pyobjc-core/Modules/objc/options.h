@@ -8,6 +8,7 @@ extern BOOL PyObjC_UseKVO;
 extern BOOL PyObjCPointer_RaiseException;
 extern BOOL PyObjC_StructsIndexable;
 extern BOOL PyObjC_StructsWritable;
+extern BOOL PyObjC_NSCodingBulkEncoding;
 
 extern int        PyObjC_DeprecationVersion;
 extern Py_ssize_t PyObjC_MappingCount;
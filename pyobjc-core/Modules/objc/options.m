@@ -135,6 +135,7 @@ BOOL_PROP(use_kvo, PyObjC_UseKVO, YES)
 BOOL_PROP(unknown_pointer_raises, PyObjCPointer_RaiseException, NO)
 BOOL_PROP(structs_indexable, PyObjC_StructsIndexable, YES)
 BOOL_PROP(structs_writable, PyObjC_StructsWritable, YES)
+BOOL_PROP(nscoding_bulk_encoding, PyObjC_NSCodingBulkEncoding, NO)
 
 INT_PROP(_nscoding_version, PyObjC_NSCoding_Version, 0)
 INT_PROP(deprecation_warnings, PyObjC_DeprecationVersion, 0)
@@ -175,6 +176,8 @@ static PyGetSetDef object_getset[] = {
            "If True the bridge raises an exception instead of creating an ObjCPointer"),
     GETSET(structs_indexable, "If True wrappers for C structs can be used as a sequence"),
     GETSET(structs_writable, "If True wrappers for C structs can be modified"),
+    GETSET(nscoding_bulk_encoding,
+           "If True keyed archives store primitive values in Python objects in bulk"),
 
     /* Private properties */
     GETSET(_nscoding_version, "Private version number for NSCoding support"),
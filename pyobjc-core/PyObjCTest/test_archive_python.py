@@ -6,6 +6,7 @@ Testcases for NSArchive-ing python objects.
 import pickle
 import sys
 import test.pickletester
+import types
 import collections
 
 import objc
@@ -263,6 +264,75 @@ class TestKeyedArchiveSimple(TestCase):
         with self.assertRaises(pickle.PicklingError):
             buf = self.archiverClass.archivedDataWithRootObject_(Foo)
 
+    def test_global_cache(self):
+        mod = types.ModuleType("pycoder_global_cache_test")
+
+        def function():
+            pass
+
+        def other_function():
+            pass
+
+        function.__module__ = None
+        function.__qualname__ = "function"
+        mod.function = function
+
+        calls = []
+        orig_whichmodule = pycoder.whichmodule
+
+        def whichmodule(obj, name):
+            calls.append(name)
+            return orig_whichmodule(obj, name)
+
+        sys.modules[mod.__name__] = mod
+        pycoder.whichmodule = whichmodule
+        try:
+            for _ in range(3):
+                for value in (function, a_function):
+                    buf = self.archiverClass.archivedDataWithRootObject_(value)
+                    v = self.unarchiverClass.unarchiveObjectWithData_(buf)
+                    self.assertIs(v, value)
+
+            self.assertEqual(calls, ["function", "a_function"])
+            self.assertEqual(
+                pycoder._global_cache[(id(function), "function")], mod.__name__
+            )
+
+            # Cache entries are verified before use
+            mod.function = other_function
+            with self.assertRaises(pickle.PicklingError):
+                self.archiverClass.archivedDataWithRootObject_(function)
+            self.assertNotIn((id(function), "function"), pycoder._global_cache)
+
+            mod.function = function
+            buf = self.archiverClass.archivedDataWithRootObject_(function)
+            self.assertIs(self.unarchiverClass.unarchiveObjectWithData_(buf), function)
+            self.assertEqual(calls, ["function", "a_function", "function", "function"])
+
+        finally:
+            pycoder.whichmodule = orig_whichmodule
+            del sys.modules[mod.__name__]
+            pycoder._global_cache.pop((id(function), "function"), None)
+
+    def test_global_cache_size(self):
+        orig_size = pycoder._GLOBAL_CACHE_SIZE
+        orig_cache = dict(pycoder._global_cache)
+        try:
+            pycoder._GLOBAL_CACHE_SIZE = 2
+            pycoder._global_cache.clear()
+
+            for value in (a_function, a_classic_class, a_newstyle_class):
+                buf = self.archiverClass.archivedDataWithRootObject_(value)
+                self.assertIs(self.unarchiverClass.unarchiveObjectWithData_(buf), value)
+
+            self.assertEqual(len(pycoder._global_cache), 2)
+            self.assertNotIn((id(a_function), "a_function"), pycoder._global_cache)
+
+        finally:
+            pycoder._GLOBAL_CACHE_SIZE = orig_size
+            pycoder._global_cache.clear()
+            pycoder._global_cache.update(orig_cache)
+
     def test_unknown_type(self):
         try:
             orig = pycoder.decode_dispatch[pycoder.kOP_GLOBAL]
@@ -1540,6 +1610,134 @@ class TestArchivePlainPython(TestKeyedArchivePlainPython):
 # Second set of tests: test if archiving a graph that
 # contains both python and objective-C objects works correctly.
 #
+class TestKeyedArchivePlainPythonBulk(TestKeyedArchivePlainPython):
+    # Run the pickle tests with bulk encoding of primitive values
+    def setUp(self):
+        super().setUp()
+        self._bulk_encoding = objc.options.nscoding_bulk_encoding
+        objc.options.nscoding_bulk_encoding = True
+
+    def tearDown(self):
+        objc.options.nscoding_bulk_encoding = self._bulk_encoding
+        super().tearDown()
+
+
+class TestBulkEncoding(TestCase):
+    def archive(self, value, bulk):
+        with pyobjc_options(nscoding_bulk_encoding=bulk):
+            return NSKeyedArchiver.archivedDataWithRootObject_(value)
+
+    def unarchive(self, buf):
+        return NSKeyedUnarchiver.unarchiveObjectWithData_(buf)
+
+    def assert_same_values(self, first, second):
+        self.assertEqual(first, second)
+        self.assertEqual(
+            [type(v) for v in first],
+            [type(v) for v in second],
+        )
+
+    def test_pack_values(self):
+        values = [
+            1,
+            -(2**63),
+            2**63 - 1,
+            2**64,
+            1.5,
+            -0.0,
+            float("inf"),
+            "hello",
+            "",
+            "h\xe9llo \U0001f600",
+            "\ud800",
+            b"bytes",
+            b"",
+            True,
+            None,
+            [1, 2],
+            42,
+        ]
+
+        objects = []
+        packed = pycoder._pack_values(values, objects)
+        self.assertIsInstance(packed, bytes)
+        self.assertEqual(objects, [2**64, True, None, [1, 2]])
+
+        result = pycoder._unpack_values(packed, iter(objects))
+        self.assert_same_values(result, values)
+        self.assertEqual(str(result[5]), "-0.0")
+
+        objects = []
+        self.assertIs(pycoder._pack_values([None, True, [1]], objects), None)
+        self.assertEqual(objects, [])
+
+        packed = pycoder._pack_values([], objects)
+        self.assertIs(packed, None)
+
+    def test_unpack_invalid(self):
+        with self.assertRaisesRegex(
+            pickle.UnpicklingError, "Unsupported packed value encoding"
+        ):
+            pycoder._unpack_values(b"", iter(()))
+
+        with self.assertRaisesRegex(
+            pickle.UnpicklingError, "Unsupported packed value encoding"
+        ):
+            pycoder._unpack_values(b"\x02", iter(()))
+
+        with self.assertRaisesRegex(
+            pickle.UnpicklingError, "Unsupported packed value kind: 42"
+        ):
+            pycoder._unpack_values(b"\x01" + pycoder._RUN_HEADER.pack(42, 1), iter(()))
+
+    def test_round_trip(self):
+        lst = list_subclass([1, 2.5, "three", b"four", None, 5, [6], "seven"])
+        dct = dict_subclass({"a": 1, 2: "b", 3.5: None, "d": [1, 2]})
+        obj = a_newstyle_class()
+        obj.a = 1
+        obj.b = "two"
+        obj.c = lst
+        obj.d = obj
+
+        for value in (lst, dct, obj):
+            with self.subTest(value):
+                buf = self.archive(value, True)
+                self.assertNotEqual(buf, self.archive(value, False))
+
+                result = self.unarchive(buf)
+                self.assertIs(type(result), type(value))
+                if value is obj:
+                    self.assertIs(result.d, result)
+                    self.assertEqual(result.a, 1)
+                    self.assertEqual(result.b, "two")
+                    self.assert_same_values(result.c, lst)
+                    self.assertIs(type(result.c), list_subclass)
+                elif value is lst:
+                    self.assert_same_values(result, value)
+                else:
+                    self.assertEqual(result, value)
+
+    def test_large_containers(self):
+        value = list_subclass(range(10000))
+        value.extend(str(i) for i in range(10000))
+        value.extend(i / 3 for i in range(10000))
+
+        packed = self.archive(value, True)
+        unpacked = self.archive(value, False)
+        self.assertLess(len(packed), len(unpacked))
+
+        for buf in (packed, unpacked):
+            result = self.unarchive(buf)
+            self.assert_same_values(result, value)
+
+    def test_not_keyed(self):
+        value = list_subclass([1, 2, 3])
+        with pyobjc_options(nscoding_bulk_encoding=True):
+            buf = NSArchiver.archivedDataWithRootObject_(value)
+        result = NSUnarchiver.unarchiveObjectWithData_(buf)
+        self.assertEqual(result, value)
+
+
 class TestKeyedArchiveMixedGraphs(TestCase):
     isKeyed = True
 
@@ -2,10 +2,13 @@ try:
     import ctypes
 except ImportError:
     ctypes = None
+import io
 import os
+import pathlib
 import re
 import subprocess
 import sys
+import tempfile
 import warnings
 import xml.etree.ElementTree as ET
 
@@ -522,6 +525,72 @@ class TestBridgeSupportParser(TestCase):
                 "Cocoa",
             )
 
+    def test_input_types(self):
+        def parse(xmldata):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                prs = bridgesupport._BridgeSupportParser(xmldata, "TestXML")
+            return (
+                prs.values,
+                prs.constants,
+                prs.functions,
+                prs.meta,
+                prs.structs,
+                prs.opaque,
+            )
+
+        expected = parse(TEST_XML)
+
+        data = b'\n  <?xml version="1.0" encoding="UTF-8"?>\n' + TEST_XML
+        self.assertEqual(parse(data), expected)
+        self.assertEqual(parse(data.decode()), expected)
+        self.assertEqual(parse(io.BytesIO(data)), expected)
+
+        fd, path = tempfile.mkstemp(suffix=".bridgesupport")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+
+            self.assertEqual(parse(path), expected)
+            self.assertEqual(parse(pathlib.Path(path)), expected)
+
+        finally:
+            os.unlink(path)
+
+    def test_typestr_cache(self):
+        bridgesupport._typestr2typestr.cache_clear()
+
+        prs = bridgesupport._BridgeSupportParser(b"<signatures/>", "Cocoa")
+        typestr = b"{CGRect={CGPoint=dd}{CGSize=dd}}"
+
+        value = prs.typestr2typestr(typestr)
+        info = bridgesupport._typestr2typestr.cache_info()
+        self.assertGreater(info.misses, 0)
+
+        # The cache is shared between parsers
+        prs = bridgesupport._BridgeSupportParser(b"<signatures/>", "Cocoa")
+        self.assertIs(prs.typestr2typestr(typestr.decode()), value)
+        self.assertEqual(
+            bridgesupport._typestr2typestr.cache_info().hits, info.hits + 1
+        )
+        self.assertEqual(
+            bridgesupport._typestr2typestr.cache_info().misses, info.misses
+        )
+
+    def test_chunks(self):
+        self.assertEqual(
+            b"".join(bridgesupport._iter_chunks(TEST_XML, 16)),
+            TEST_XML,
+        )
+        self.assertTrue(
+            all(len(chunk) <= 16 for chunk in bridgesupport._iter_chunks(TEST_XML, 16))
+        )
+        self.assertEqual(
+            "".join(bridgesupport._iter_chunks(io.StringIO("<signatures/>"), 4)),
+            "<signatures/>",
+        )
+        self.assertEqual(list(bridgesupport._iter_chunks(b"")), [])
+
     # I'd like to use a test method with subTests here, but that doesn't
     # support marking some subtests as expected failures
     BROKEN_FRAMEWORKS = (
@@ -471,6 +471,155 @@ class TestConvenienceHelpers(TestCase):
             if "MyObject" in convenience.CLASS_METHODS:
                 del convenience.CLASS_METHODS["MyObject"]
 
+    def test_batch(self):
+        class OC_ConvenienceBatchTest(objc.lookUpClass("NSObject")):
+            pass
+
+        name = OC_ConvenienceBatchTest.__name__
+        rescans = []
+        orig_rescan = convenience._rescanClass
+
+        def rescan(classname):
+            rescans.append(classname)
+            orig_rescan(classname)
+
+        convenience._rescanClass = rescan
+        try:
+            count = objc.options._mapping_count
+
+            with objc.batchConveniences():
+                objc.addConvenienceForClass(name, (("batchValue", lambda self: 1),))
+
+                with objc.batchConveniences():
+                    objc.addConvenienceForClass(
+                        name, (("batchValue2", lambda self: 2),)
+                    )
+                    objc.registerABCForClass(name, collections.abc.Sized)
+
+                self.assertEqual(rescans, [])
+                self.assertEqual(objc.options._mapping_count, count)
+
+            self.assertEqual(rescans, [name])
+            self.assertEqual(objc.options._mapping_count, count + 1)
+
+            value = OC_ConvenienceBatchTest.alloc().init()
+            self.assertEqual(value.batchValue(), 1)
+            self.assertEqual(value.batchValue2(), 2)
+            self.assertTrue(issubclass(OC_ConvenienceBatchTest, collections.abc.Sized))
+
+            # Classes are updated when the block raises an exception
+            with self.assertRaises(ZeroDivisionError):
+                with objc.batchConveniences():
+                    objc.addConvenienceForClass(
+                        name, (("batchValue3", lambda self: 3),)
+                    )
+                    1 / 0
+
+            self.assertEqual(rescans, [name, name])
+            self.assertEqual(value.batchValue3(), 3)
+            self.assertIs(convenience._pending_rescans, None)
+
+            # Outside of a batch every call updates the class
+            objc.addConvenienceForClass(name, (("batchValue4", lambda self: 4),))
+            self.assertEqual(rescans, [name, name, name])
+
+        finally:
+            convenience._rescanClass = orig_rescan
+            convenience.CLASS_METHODS.pop(name, None)
+            convenience.CLASS_ABC.pop(name, None)
+
+    def test_lazy_metadata(self):
+        sel = b"lazyMetadataValue:"
+
+        convenience.registerMetaDataTable(
+            {"OC_LazyMetadataBase": [(sel, {"retval": {"type": objc._C_INT}})]}
+        )
+        self.assertIn("OC_LazyMetadataBase", convenience.CLASS_METADATA)
+        self.assertNotIn(sel, objc._copyMetadataRegistry())
+
+        class OC_LazyMetadataBase(objc.lookUpClass("NSObject")):
+            pass
+
+        class OC_LazyMetadataTest(OC_LazyMetadataBase):
+            def lazyMetadataValue_(self, arg):
+                return 1
+
+        self.assertNotIn("OC_LazyMetadataBase", convenience.CLASS_METADATA)
+        self.assertIn(sel, objc._copyMetadataRegistry())
+        self.assertResultHasType(OC_LazyMetadataTest.lazyMetadataValue_, objc._C_INT)
+
+    def test_lazy_metadata_used_class(self):
+        sel = b"lazyMetadataUsed:"
+
+        class OC_LazyMetadataUsed(objc.lookUpClass("NSObject")):
+            def lazyMetadataUsed_(self, arg):
+                return 1
+
+        # Look up the selector before registering the metadata,
+        # this caches method information for the selector.
+        method = OC_LazyMetadataUsed.lazyMetadataUsed_
+        self.assertResultHasType(method, objc._C_ID)
+
+        convenience.registerMetaDataTable(
+            {"NSObject": [(sel, {"retval": {"type": objc._C_INT}})]}
+        )
+
+        # NSObject is already used, the metadata is registered
+        # right away and cached method information is updated.
+        self.assertNotIn("NSObject", convenience.CLASS_METADATA)
+        self.assertIn(sel, objc._copyMetadataRegistry())
+        self.assertResultHasType(method, objc._C_INT)
+        self.assertResultHasType(OC_LazyMetadataUsed.lazyMetadataUsed_, objc._C_INT)
+
+    def test_lazy_metadata_collected(self):
+        sel = b"lazyMetadataCollected:"
+
+        objc._updatingMetadata(True)
+        try:
+            objc.registerMetaDataForSelector(
+                b"OC_LazyMetadataCollected", sel, {"retval": {"type": objc._C_INT}}
+            )
+            self.assertNotIn("OC_LazyMetadataCollected", convenience.CLASS_METADATA)
+        finally:
+            objc._updatingMetadata(False)
+
+        self.assertIn("OC_LazyMetadataCollected", convenience.CLASS_METADATA)
+        self.assertNotIn(sel, objc._copyMetadataRegistry())
+
+        # An explicit registration is not replaced by pending metadata
+        objc.registerMetaDataForSelector(
+            b"OC_LazyMetadataCollected", sel, {"retval": {"type": objc._C_FLT}}
+        )
+        self.assertNotIn("OC_LazyMetadataCollected", convenience.CLASS_METADATA)
+
+        metadata = objc._copyMetadataRegistry()
+        self.assertEqual(len(metadata[sel]), 1)
+        self.assertEqual(metadata[sel][0][0], b"OC_LazyMetadataCollected")
+        self.assertEqual(metadata[sel][0][1]["retval"]["type"], objc._C_FLT)
+
+    def test_lazy_metadata_no_invalidation(self):
+        sel = b"lazyMetadataCount:"
+
+        convenience.registerMetaDataTable(
+            {"OC_LazyMetadataCount": [(sel, {"retval": {"type": objc._C_INT}})]}
+        )
+
+        # Registering pending metadata doesn't invalidate
+        # cached information for other classes.
+        count = objc.options._mapping_count
+        convenience._flush_metadata("OC_LazyMetadataCount")
+        self.assertEqual(objc.options._mapping_count, count)
+        self.assertIn(sel, objc._copyMetadataRegistry())
+
+        with self.assertRaises(TypeError):
+            objc._registerMetaDataForClass(b"OC_LazyMetadataCount", 42)
+
+        with self.assertRaises(TypeError):
+            objc._registerMetaDataForClass(b"OC_LazyMetadataCount", [(sel,)])
+
+        with self.assertRaises(TypeError):
+            objc._registerMetaDataForClass(b"OC_LazyMetadataCount", [(sel, 42)])
+
 
 class TestBasicConveniences(TestCase):
     def testBundleForClass(self):
@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+
+import objc
+import objc._lazyimport as lazyimport
+import objc.importprofile as importprofile
+from PyObjCTools.TestSupport import TestCase
+
+PACKAGE_INIT = textwrap.dedent(
+    """\
+    import sys
+    import objc
+
+    from . import _metadata
+
+    objc.registerABCForClass("ImportProfileTestClass")
+
+    sys.modules[__name__] = objc.ObjCLazyModule(
+        __name__, None, None, _metadata.misc, None, {}, ()
+    )
+    """
+)
+
+PACKAGE_METADATA = textwrap.dedent(
+    """\
+    misc = {"enums": "$ProfileEnum@42$"}
+    """
+)
+
+
+class TestImportProfile(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        pkgdir = os.path.join(self.tmpdir, "ImportProfileTestPkg")
+        os.mkdir(pkgdir)
+        with open(os.path.join(pkgdir, "__init__.py"), "w") as fp:
+            fp.write(PACKAGE_INIT)
+        with open(os.path.join(pkgdir, "_metadata.py"), "w") as fp:
+            fp.write(PACKAGE_METADATA)
+        sys.path.insert(0, self.tmpdir)
+
+    def tearDown(self):
+        sys.path.remove(self.tmpdir)
+        sys.modules.pop("ImportProfileTestPkg", None)
+        sys.modules.pop("ImportProfileTestPkg._metadata", None)
+        shutil.rmtree(self.tmpdir)
+
+    def test_lazy_module(self):
+        orig_getattr = lazyimport.ObjCLazyModule.__dict__["__getattr__"]
+
+        with importprofile.ImportProfile() as profile:
+            self.assertIsNot(
+                lazyimport.ObjCLazyModule.__dict__["__getattr__"], orig_getattr
+            )
+            with self.assertRaisesRegex(RuntimeError, "already enabled"):
+                profile.enable()
+
+            mod = objc.ObjCLazyModule(
+                "ImportProfileTest",
+                None,
+                None,
+                {"enums": "$ProfileA@1$ProfileB@2$"},
+                None,
+                {},
+                (),
+            )
+            self.assertEqual(mod.ProfileA, 1)
+            with self.assertRaises(AttributeError):
+                mod.ProfileMissing
+
+        self.assertIs(lazyimport.ObjCLazyModule.__dict__["__getattr__"], orig_getattr)
+        self.assertGreater(profile.total, 0)
+
+        info = profile.modules["ImportProfileTest"]
+        self.assertTrue(info.is_lazy)
+        self.assertGreaterEqual(info.phases["init"], 0)
+        self.assertEqual(
+            [(name, found) for name, _, _, found in info.attributes],
+            [("ProfileA", True), ("ProfileMissing", False)],
+        )
+
+        # Resolving after profiling is not recorded
+        self.assertEqual(mod.ProfileB, 2)
+        self.assertEqual(len(info.attributes), 2)
+
+    def test_import(self):
+        with importprofile.ImportProfile() as profile:
+            import ImportProfileTestPkg
+
+            self.assertEqual(ImportProfileTestPkg.ProfileEnum, 42)
+
+        info = profile.modules["ImportProfileTestPkg"]
+        self.assertTrue(info.is_lazy)
+        self.assertGreater(info.phases["import"], 0)
+        self.assertGreater(info.phases["conveniences"], 0)
+        self.assertGreater(info.phases["metadata"], 0)
+        self.assertEqual(len(info.attributes), 1)
+
+        # The metadata submodule is accounted to its parent
+        self.assertNotIn("ImportProfileTestPkg._metadata", profile.modules)
+
+        data = json.loads(json.dumps(profile.as_dict()))
+        self.assertEqual(data["objc"], objc.__version__)
+        self.assertIn("ImportProfileTestPkg", [m["name"] for m in data["modules"]])
+
+        stream = io.StringIO()
+        profile.print_report(stream)
+        report = stream.getvalue()
+        self.assertIn("ImportProfileTestPkg", report)
+        self.assertIn("ProfileEnum", report)
+        self.assertIn("Total time", report)
+
+    def test_main(self):
+        path = os.path.join(self.tmpdir, "report.json")
+
+        orig_stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            importprofile.main(
+                [
+                    "--json",
+                    path,
+                    "-c",
+                    "ImportProfileTestPkg.ProfileEnum",
+                    "ImportProfileTestPkg",
+                ]
+            )
+            report = sys.stdout.getvalue()
+        finally:
+            sys.stdout = orig_stdout
+
+        self.assertIn("ImportProfileTestPkg", report)
+
+        with open(path) as fp:
+            data = json.load(fp)
+
+        (info,) = [m for m in data["modules"] if m["name"] == "ImportProfileTestPkg"]
+        self.assertTrue(info["lazy"])
+        self.assertEqual([a["name"] for a in info["attributes"]], ["ProfileEnum"])
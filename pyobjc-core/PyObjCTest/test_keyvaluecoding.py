@@ -1,10 +1,18 @@
 # Tests for PyObjCTools.KeyValueCoding
+import collections
+import gc
 import os
+import re
 
 from PyObjCTools import KeyValueCoding
-from PyObjCTools.TestSupport import TestCase
+from PyObjCTools.TestSupport import TestCase, skipUnless
 import objc
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class TestHelpers(TestCase):
     def test_msum(self):
@@ -167,6 +175,64 @@ class TestArrayOperators(TestCase):
             arrayOperators.distinctUnionOfObjects(values, ("a", "b")), [1, 2, 3]
         )
 
+    def test_float_sum(self):
+        float_sum = KeyValueCoding._float_sum
+        msum = KeyValueCoding.msum
+
+        for values in (
+            [],
+            [1, 2, 3],
+            [True, 2, False],
+            [2**53, 1, -1],
+            [2**53, 2**53, -(2**53)],
+            [2**60 + 1, -(2**60), 3],
+            [1, 2.5, null],
+            [1e100, 1, -1e100],
+            (1, 2, 3),
+        ):
+            with self.subTest(values):
+                self.assertEqual(
+                    float_sum(values),
+                    msum(float(x) if x is not null else 0.0 for x in values),
+                )
+                self.assertIsInstance(float_sum(values), float)
+
+    def test_extreme(self):
+        extreme = KeyValueCoding._extreme
+
+        self.assertEqual(extreme(max, [1, 5, 2]), 5)
+        self.assertEqual(extreme(min, [3, 1.5, 2]), 1.5)
+        self.assertEqual(extreme(max, [1, null, 2]), 2)
+        self.assertEqual(extreme(min, (4, null, 2)), 2)
+        with self.assertRaises(ValueError):
+            extreme(max, [null])
+
+    def test_distinct(self):
+        distinct = KeyValueCoding._distinct
+
+        self.assertEqual(distinct([3, 1, 3, 2, 1]), [3, 1, 2])
+        result = distinct([1, 1.0, True, 2])
+        self.assertEqual(result, [1, 2])
+        self.assertIs(type(result[0]), int)
+
+        self.assertEqual(distinct([[1], 2, [1], 2, [3]]), [[1], 2, [3]])
+
+    @skipUnless(numpy is not None, "requires NumPy")
+    def test_numpy_values(self):
+        records = numpy.array(
+            [(3, 0.5), (1, 2.5), (4, 1.0)], dtype=[("a", "i8"), ("b", "f8")]
+        )
+
+        self.assertEqual(KeyValueCoding.getKeyPath(records, "@sum.a"), 8.0)
+        self.assertEqual(KeyValueCoding.getKeyPath(records, "@sum.b"), 4.0)
+        self.assertEqual(KeyValueCoding.getKeyPath(records, "@avg.b"), 4.0 / 3)
+
+        result = KeyValueCoding.getKeyPath(records, "@max.a")
+        self.assertEqual(result, 4)
+        self.assertIsInstance(result, numpy.integer)
+        self.assertEqual(KeyValueCoding.getKeyPath(records, "@min.a"), 1)
+        self.assertEqual(KeyValueCoding.getKeyPath(records, "@min.b"), 0.5)
+
     def test_unionOfArrays(self):
         arrayOperators = KeyValueCoding._ArrayOperators
 
@@ -655,6 +721,270 @@ class TestPythonObject(TestCase):
         self.assertEqual(KeyValueCoding.getKeyPath(root, "a.k"), [1, 2])
 
 
+class TestCompiledKeyPath(TestCase):
+    def assert_same_result(self, obj, keypath):
+        compiled = KeyValueCoding.compileKeyPath(keypath)
+
+        try:
+            expected = KeyValueCoding.getKeyPath(obj, keypath)
+        except KeyError as exc:
+            with self.assertRaisesRegex(KeyError, re.escape(str(exc))):
+                compiled(obj)
+
+            # Second call uses the cached strategy
+            with self.assertRaisesRegex(KeyError, re.escape(str(exc))):
+                compiled(obj)
+
+        else:
+            self.assertEqual(compiled(obj), expected)
+            self.assertEqual(compiled(obj), expected)
+
+    def test_invalid(self):
+        with self.assertRaises(KeyError):
+            KeyValueCoding.compileKeyPath("")
+
+        with self.assertRaisesRegex(
+            KeyError, "Array operator @nofunction not implemented"
+        ):
+            KeyValueCoding.compileKeyPath("a.@nofunction.b")
+
+    def test_repr(self):
+        compiled = KeyValueCoding.compileKeyPath("a.b")
+        self.assertEqual(compiled.keypath, "a.b")
+        self.assertEqual(repr(compiled), "<compiled keypath 'a.b'>")
+
+    def test_python_objects(self):
+        class Record:
+            __slots__ = ("slot1", "__dict__")
+
+            def __init__(self, **kwds):
+                for k, v in kwds.items():
+                    setattr(self, k, v)
+
+            @property
+            def prop1(self):
+                return "a property"
+
+            def getAttr1(self):
+                return "Attr1"
+
+            def get_attr2(self):
+                return "attr2"
+
+            def isAttr3(self):
+                return "attr3?"
+
+        r = Record(slot1=42, attr4=os.getpid, _attr5=5)
+        r.child = Record(attr6=[Record(a=1), Record(a=2, b="b"), {"a": 3}])
+        r.mapping = {"a": {"b": 1}, "c": [{"d": 1}, {"e": 2}]}
+
+        for keypath in (
+            "slot1",
+            "prop1",
+            "attr1",
+            "attr2",
+            "attr3",
+            "attr4",
+            "attr5",
+            "child.slot1",
+            "child.attr6.a",
+            "child.attr6.b",
+            "child.attr6.@count",
+            "child.attr6.@sum.a",
+            "mapping.a.b",
+            "mapping.c.d",
+            "mapping.nosuchkey",
+            "nosuchattr",
+        ):
+            with self.subTest(keypath):
+                self.assert_same_result(r, keypath)
+
+        self.assert_same_result(None, "a.b")
+        self.assert_same_result(1.5, "hex")
+        self.assert_same_result([r, r.child, None], "slot1")
+
+    def test_changing_types(self):
+        compiled = KeyValueCoding.compileKeyPath("value")
+
+        types = [type(f"Record{i}", (), {"value": i}) for i in range(40)]
+        for _ in range(2):
+            for tp in types:
+                self.assertEqual(compiled(tp()), tp.value)
+
+        self.assertEqual(compiled({"value": "dict"}), "dict")
+
+        o = types[0]()
+        o.value = "instance"
+        self.assertEqual(compiled(o), "instance")
+
+    def test_cocoa_objects(self):
+        r = objc.lookUpClass("NSObject").alloc().init()
+        compiled = KeyValueCoding.compileKeyPath("description.length")
+        self.assertEqual(compiled(r), len(r.description()))
+        self.assertEqual(compiled({"description": r}), len(r.description()))
+
+        arr = objc.lookUpClass("NSMutableArray").alloc().init()
+        arr.addObject_({"k": 1})
+        arr.addObject_({"k": 2})
+        self.assertEqual(KeyValueCoding.compileKeyPath("a.k")({"a": arr}), [1, 2])
+        self.assertEqual(KeyValueCoding.compileKeyPath("@sum.k")(arr), 3)
+
+
+class TestAccessorCache(TestCase):
+    def setUp(self):
+        KeyValueCoding._clear_accessor_cache()
+
+    def test_counters(self):
+        class Record:
+            def __init__(self, value):
+                self.value = value
+
+        records = [Record(i) for i in range(10)]
+        self.assertEqual(
+            [KeyValueCoding.getKey(r, "value") for r in records], list(range(10))
+        )
+
+        info = KeyValueCoding._accessor_cache_info()
+        self.assertEqual(info["misses"], 1)
+        self.assertEqual(info["hits"], 9)
+        self.assertEqual(info["evictions"], 0)
+        self.assertEqual(info["types"], 1)
+
+        for r in records:
+            KeyValueCoding.setKey(r, "value", -1)
+        self.assertEqual([r.value for r in records], [-1] * 10)
+
+        info = KeyValueCoding._accessor_cache_info()
+        self.assertEqual(info["misses"], 2)
+        self.assertEqual(info["hits"], 18)
+
+        KeyValueCoding._clear_accessor_cache()
+        self.assertEqual(
+            KeyValueCoding._accessor_cache_info(),
+            {"hits": 0, "misses": 0, "evictions": 0, "types": 0},
+        )
+
+    def test_mappings_not_cached(self):
+        class Mapping(collections.UserDict):
+            pass
+
+        for value in ({}, Mapping()):
+            for i in range(10):
+                KeyValueCoding.setKey(value, f"key{i}", i)
+                self.assertEqual(KeyValueCoding.getKey(value, f"key{i}"), i)
+
+        self.assertEqual(KeyValueCoding._accessor_cache_info()["misses"], 0)
+        self.assertIsNone(KeyValueCoding._type_entry(Mapping).getters)
+
+    def test_size_limit(self):
+        class Record:
+            pass
+
+        r = Record()
+        r.value = 1
+        count = KeyValueCoding._MAX_KEYS_PER_TYPE + 10
+        for i in range(count):
+            with self.assertRaises(KeyError):
+                KeyValueCoding.getKey(r, f"key{i}")
+
+            # Keep "value" in the cache
+            self.assertEqual(KeyValueCoding.getKey(r, "value"), 1)
+
+        getters = KeyValueCoding._type_entry(Record).getters
+        self.assertEqual(len(getters), KeyValueCoding._MAX_KEYS_PER_TYPE)
+        self.assertIn("value", getters)
+        self.assertNotIn("key0", getters)
+
+        info = KeyValueCoding._accessor_cache_info()
+        self.assertEqual(info["evictions"], 11)
+        self.assertEqual(info["misses"], count + 1)
+
+    def test_class_changes(self):
+        class Base:
+            pass
+
+        class Record(Base):
+            other = 1
+
+        r = Record()
+        r._value = 1
+        self.assertEqual(KeyValueCoding.getKey(r, "value"), 1)
+
+        Record.getValue = lambda self: "getter"
+        self.assertEqual(KeyValueCoding.getKey(r, "value"), "getter")
+
+        del Record.getValue
+        self.assertEqual(KeyValueCoding.getKey(r, "value"), 1)
+
+        Base.get_value = lambda self: "base getter"
+        self.assertEqual(KeyValueCoding.getKey(r, "value"), "base getter")
+
+        # Replace an attribute, the class __dict__ keeps the same size
+        del Base.get_value
+        del Record.other
+        Record.isValue = lambda self: "is getter"
+        self.assertEqual(KeyValueCoding.getKey(r, "value"), "is getter")
+
+        KeyValueCoding.setKey(r, "value", 2)
+        self.assertEqual(r._value, 2)
+
+        Base.set_value = lambda self, value: setattr(self, "_other", value)
+        KeyValueCoding.setKey(r, "value", 3)
+        self.assertEqual(r._value, 2)
+        self.assertEqual(r._other, 3)
+
+        class Base2:
+            pass
+
+        Record.__bases__ = (Base2,)
+        Base2.getValue = lambda self: "base getter"
+        self.assertEqual(KeyValueCoding.getKey(r, "value"), "base getter")
+
+        # Lookup hooks added after the first lookup are used
+        Record.__getattr__ = lambda self, name: lambda: name
+        self.assertEqual(KeyValueCoding.getKey(r, "other"), "getOther")
+
+        Record.__getitem__ = lambda self, key: f"__getitem__ {key}"
+        self.assertEqual(KeyValueCoding.getKey(r, "other"), "__getitem__ other")
+
+        info = KeyValueCoding._accessor_cache_info()
+        self.assertEqual(info["misses"], 3)
+
+    def test_instance_attributes(self):
+        class Record:
+            def setValue(self, value):
+                self._value = value
+
+        r1 = Record()
+        r2 = Record()
+        r2.getValue = lambda: "instance getter"
+        r2.value = "attribute"
+        r1.value = "attribute"
+
+        self.assertEqual(KeyValueCoding.getKey(r1, "value"), "attribute")
+        self.assertEqual(KeyValueCoding.getKey(r2, "value"), "instance getter")
+
+        r2.setOther = lambda value: setattr(r2, "_other", value)
+        KeyValueCoding.setKey(r1, "other", 1)
+        KeyValueCoding.setKey(r2, "other", 2)
+        self.assertEqual(r1.other, 1)
+        self.assertEqual(r2._other, 2)
+        self.assertNotIn("other", r2.__dict__)
+
+    def test_weak_keys(self):
+        class Record:
+            pass
+
+        r = Record()
+        r.value = 1
+        self.assertEqual(KeyValueCoding.getKey(r, "value"), 1)
+        self.assertEqual(KeyValueCoding._accessor_cache_info()["types"], 1)
+
+        del r, Record
+        gc.collect()
+        self.assertEqual(KeyValueCoding._accessor_cache_info()["types"], 0)
+
+
 class TestKVCHelper(TestCase):
     def setUp(self):
         self._orig = {
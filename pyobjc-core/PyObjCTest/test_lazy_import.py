@@ -36,6 +36,40 @@ class TestLazyImport(TestCase):
         v = o["CFSTR"]
         self.assertEqual(v(b"hello"), "hello")
 
+    def test_build_index(self):
+        self.assertEqual(lazyimport._build_index(""), {})
+        self.assertEqual(lazyimport._build_index("$$"), {})
+        self.assertEqual(
+            lazyimport._build_index("$a$b@@$c@=^{foo=}$d@$@42$a@x$"),
+            {"a": None, "b": "@", "c": "=^{foo=}", "d": ""},
+        )
+        self.assertEqual(
+            lazyimport._build_index("$e1@16$e2@4.5$e3@'1234'$e1@3$"),
+            {"e1": "16", "e2": "4.5", "e3": "'1234'"},
+        )
+
+    def test_lazy_index(self):
+        metadict = {
+            "enums": "$NSAWTEventType@16$NSAboveBottom@4$NSAboveTop@1$NSNoValue$",
+        }
+
+        mod = objc.ObjCLazyModule("MyFramework", None, None, metadict, None, {}, ())
+        self.assertIs(mod._ObjCLazyModule__enumindex, None)
+
+        self.assertEqual(mod.NSAboveBottom, 4)
+        self.assertIsInstance(mod._ObjCLazyModule__enumindex, dict)
+        self.assertIn("NSAboveTop", mod._ObjCLazyModule__enumindex)
+
+        with self.assertRaisesRegex(AttributeError, "NSNoValue"):
+            mod.NSNoValue
+
+        with self.assertRaisesRegex(AttributeError, "NSAbove"):
+            mod.NSAbove
+
+        self.assertNotIn("NSNoValue", mod.__all__)
+        self.assertIs(mod._ObjCLazyModule__enumindex, None)
+        self.assertEqual(mod.NSAboveTop, 1)
+
     def test_load_bundle(self):
         NSBundle = objc.lookUpClass("NSBundle")
 
@@ -138,7 +172,7 @@ class TestLazyImport(TestCase):
         if dunder_all:
             # Force precalculation of all attributes by accessing the __all__
             # attribute
-            self.assertEqual(set(dir(mod)), set(mod.__all__))
+            self.assertEqual(set(mod.__all__), set(dir(mod)))
 
         self.assertEqual(mod.__doc__, initial_dict["__doc__"])
         self.assertEqual(mod.doc_string, initial_dict["__doc__"])
@@ -171,7 +205,7 @@ class TestLazyImport(TestCase):
 
         mod.NSAccessibilityActionDescription = 99
         mod.NSWindowWillCloseNotification = 100
-        self.assertEqual(set(dir(mod)), set(mod.__all__))
+        self.assertEqual(set(mod.__all__), set(dir(mod)))
         self.assertIn("NSRectClipList", mod.__dict__)
         self.assertIn("NSRectClipList", mod.__all__)
         self.assertIn("NSAccessibilityActionDescription", mod.__all__)
@@ -235,6 +269,108 @@ class TestLazyImport(TestCase):
         self.assertIn("version", mod.__all__)
         self.assertNotIn("__doc__", mod.__all__)
 
+    def test_dir_without_loading(self):
+        metadict = {
+            "constants": "$NSLazyDirConstant$",
+            "enums": "$NSLazyDirEnum@1$NSLazyDirNoValue$",
+            "functions": {"NSLazyDirFunction": (b"v", "", {})},
+            "aliases": {"NSLazyDirAlias": "NSLazyDirEnum"},
+            "expressions": {
+                "NSLazyDirExpr": "NSLazyDirEnum + 1",
+                "NSLazyDirBadExpr": "NSLazyDirUnknown + 1",
+            },
+        }
+        mod = objc.ObjCLazyModule("LazyDir", None, None, metadict, None, {}, (sys,))
+
+        names = dir(mod)
+        for nm in (
+            "NSLazyDirConstant",
+            "NSLazyDirEnum",
+            "NSLazyDirFunction",
+            "NSLazyDirAlias",
+            "NSLazyDirExpr",
+            "NSLazyDirBadExpr",
+            "NSObject",
+            "path",
+        ):
+            self.assertIn(nm, names)
+            self.assertNotIn(nm, mod.__dict__)
+        self.assertNotIn("NSLazyDirNoValue", names)
+        self.assertNotIn("__doc__", names)
+        self.assertNotIn("__all__", mod.__dict__)
+
+        self.assertEqual(mod.NSLazyDirExpr, 2)
+        self.assertIn("NSLazyDirExpr", dir(mod))
+
+        # Names that cannot be resolved are dropped from dir()
+        with self.assertRaises(AttributeError):
+            mod.NSLazyDirBadExpr
+        self.assertNotIn("NSLazyDirBadExpr", dir(mod))
+
+        # __all__ is updated when new names are resolved instead
+        # of being recalculated.
+        all_names = mod.__all__
+        self.assertIn("NSLazyDirAlias", all_names)
+        self.assertNotIn("OC_LazyDirClass", all_names)
+
+        class OC_LazyDirClass(objc.lookUpClass("NSObject")):
+            pass
+
+        self.assertIs(mod.OC_LazyDirClass, OC_LazyDirClass)
+        self.assertIs(mod.__all__, all_names)
+        self.assertIn("OC_LazyDirClass", mod.__all__)
+        self.assertEqual(set(dir(mod)), set(mod.__all__))
+
+    def test_missing_cache(self):
+        lookups = []
+
+        class Parent:
+            def __getattr__(self, name):
+                lookups.append(name)
+                raise AttributeError(name)
+
+        class OtherParent:
+            MCMissing = 42
+
+        parents = [Parent()]
+        mod = objc.ObjCLazyModule(
+            "MissingCache",
+            None,
+            None,
+            {"enums": "$MCValue@1$"},
+            None,
+            None,
+            parents,
+        )
+
+        for _ in range(3):
+            self.assertFalse(hasattr(mod, "MCMissing"))
+        self.assertEqual(lookups, ["MCMissing"])
+
+        # Classes are found even when the name was cached as missing
+        self.assertFalse(hasattr(mod, "OC_MissingCacheClass"))
+
+        class OC_MissingCacheClass(objc.lookUpClass("NSObject")):
+            pass
+
+        self.assertIs(mod.OC_MissingCacheClass, OC_MissingCacheClass)
+
+        # Adding a parent invalidates the cache
+        parents.append(OtherParent())
+        self.assertEqual(mod.MCMissing, 42)
+
+        self.assertFalse(hasattr(mod, "MCMissing2"))
+        lookups.clear()
+        lazyimport._invalidate_caches()
+        self.assertFalse(hasattr(mod, "MCMissing2"))
+        self.assertEqual(lookups, ["MCMissing2"])
+
+        # Creating a lazy module invalidates the cache as well
+        lookups.clear()
+        objc.ObjCLazyModule("MissingCache2", None, None, None, None, None, ())
+        self.assertFalse(hasattr(mod, "MCMissing2"))
+        self.assertEqual(lookups, ["MCMissing2"])
+
     def test_all_clearing(self):
         metadict = {"enums": "$NSAWTEventType@16$NSAboveBottom@4$NSAboveTop@1$"}
 
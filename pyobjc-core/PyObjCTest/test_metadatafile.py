@@ -0,0 +1,307 @@
+import os
+import shutil
+import sys
+import sysconfig
+import tempfile
+import textwrap
+
+import objc
+import objc._metadatafile as metadatafile
+from PyObjCTools.TestSupport import TestCase
+
+METADATA_SOURCE = textwrap.dedent(
+    """\
+    # This file is generated by objective.metadata
+    import objc, sys
+
+    if sys.maxsize > 2**32:
+
+        def sel32or64(a, b):
+            return b
+
+    else:
+
+        def sel32or64(a, b):
+            return a
+
+
+    misc = {}
+    misc.update({"NSRange": objc.createStructType(
+        "MetadataFileTest.NSRange", b"{_NSRange=QQ}", ["location", "length"])})
+    constants = '''$NSWorkspaceMoveOperation$NSWorkspaceCopyOperation@@$'''
+    enums = '''$NSAWTEventType@16$NSAboveBottom@4$NSAboveTop@1$'''
+    misc.update({"NSAWTEventType": 99})
+    constants_dict = {"NSWorkspaceLinkOperation": "@"}
+    deprecated_constants = {"NSWorkspaceLinkOperation": 1004}
+    functions = {
+        "NSSwapShort": (b"SS",),
+        "NSDecimalIsNotANumber": (
+            b"Z^{_NSDecimal=b8b4b1b1b18[8S]}",
+            "",
+            {"arguments": {0: {"type_modifier": "n"}}},
+        ),
+        "NSBeginAlertSheet": (
+            b"v@@@@@@::^v@",
+            "",
+            {"arguments": {6: {"sel_of_type": sel32or64(b"v@:@i^v", b"v@:@q^v")}}},
+        ),
+    }
+    aliases = {"NSAlias": "NSAboveTop", "NSSizeAlias": sel32or64("a", "b")}
+    cftypes = [("CFAllocatorRef", b"^{__CFAllocator=}", "CFAllocatorGetTypeID", None)]
+    r = objc.registerMetaDataForSelector
+    objc._updatingMetadata(True)
+    try:
+        r(b"NSObject", b"mfTestA:", {"arguments": {2: {"type_modifier": b"o"}}})
+        r(b"NSObject", b"mfTestB:", {"retval": {"type": sel32or64(b"i", b"q")}})
+        r(b"NSObject", b"mfTestB:", {"arguments": {2: {"type": b"@"}}})
+        r(b"NSArray", b"mfTestC:", {"arguments": {2: {"type": b"Z"}}})
+        r(b"NSArray", b"mfTestB:", {"arguments": {2: {"type": b"@"}}})
+    finally:
+        objc._updatingMetadata(False)
+    protocols = {
+        "MFTestMethods": objc.informal_protocol(
+            "MFTestMethods",
+            [objc.selector(None, b"mfTestVersion", b"q@:", isRequired=False)],
+        )
+    }
+    expressions = {"mysum": "NSAWTEventType + NSAboveBottom + 3"}
+
+    # END OF FILE
+    """
+)
+
+
+class TestMetadataFile(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source_path = os.path.join(self.tmpdir, "_metadata.py")
+        with open(self.source_path, "w") as fp:
+            fp.write(METADATA_SOURCE)
+
+        self.registrations = []
+        self.orig_register = objc.registerMetaDataForSelector
+        objc.registerMetaDataForSelector = (
+            lambda class_name, selector, metadata: self.registrations.append(
+                (class_name, selector, metadata)
+            )
+        )
+
+        def register_table(table):
+            for class_name in table:
+                for selector, metadata in table[class_name]:
+                    self.registrations.append((class_name.encode(), selector, metadata))
+
+        self.orig_register_table = metadatafile.registerMetaDataTable
+        metadatafile.registerMetaDataTable = register_table
+
+    def tearDown(self):
+        objc.registerMetaDataForSelector = self.orig_register
+        metadatafile.registerMetaDataTable = self.orig_register_table
+        shutil.rmtree(self.tmpdir)
+
+    def load_source(self):
+        self.registrations = []
+        namespace = {"__name__": "_metadata"}
+        exec(compile(METADATA_SOURCE, self.source_path, "exec"), namespace)
+        return namespace, self.registrations
+
+    def load_compiled(self):
+        self.registrations = []
+        path = metadatafile.compileMetadataFile(self.source_path)
+        self.assertEqual(path, os.path.join(self.tmpdir, "_metadata.bin"))
+        metadict = metadatafile.loadMetadataFile(path, self.source_path)
+        self.assertIsNot(metadict, None)
+        return metadict, self.registrations
+
+    def test_round_trip(self):
+        source, source_registrations = self.load_source()
+        compiled, compiled_registrations = self.load_compiled()
+
+        self.assertEqual(
+            sorted(source_registrations, key=repr),
+            sorted(compiled_registrations, key=repr),
+        )
+
+        for key in (
+            "constants",
+            "enums",
+            "constants_dict",
+            "deprecated_constants",
+            "functions",
+            "aliases",
+            "cftypes",
+            "expressions",
+        ):
+            with self.subTest(key):
+                if key in ("constants", "enums", "cftypes"):
+                    self.assertEqual(source[key], compiled[key])
+                else:
+                    self.assertEqual(source[key], dict(compiled[key].items()))
+
+        self.assertEqual(source["misc"].keys(), compiled["misc"].keys())
+        self.assertEqual(source["misc"]["NSAWTEventType"], 99)
+        self.assertEqual(source["protocols"].keys(), compiled["protocols"].keys())
+
+    def test_sections(self):
+        sections, code = metadatafile.compileMetadataSource(METADATA_SOURCE)
+        self.assertEqual(
+            set(sections),
+            {
+                "constants",
+                "enums",
+                "constants_dict",
+                "deprecated_constants",
+                "functions",
+                "aliases",
+                "cftypes",
+                "expressions",
+                "selectors",
+            },
+        )
+        self.assertNotIn("NSBeginAlertSheet", sections["functions"])
+        self.assertIn("NSSwapShort", sections["functions"])
+        self.assertNotIn("NSSizeAlias", sections["aliases"])
+
+        # One of the registrations of 'mfTestB:' on NSObject isn't a literal,
+        # the other registration for the same class and selector must stay
+        # in the code as well to keep the order of registrations.
+        self.assertEqual(
+            sections["selectors"],
+            {
+                "NSObject": [
+                    (b"mfTestA:", {"arguments": {2: {"type_modifier": b"o"}}})
+                ],
+                "NSArray": [
+                    (b"mfTestC:", {"arguments": {2: {"type": b"Z"}}}),
+                    (b"mfTestB:", {"arguments": {2: {"type": b"@"}}}),
+                ],
+            },
+        )
+        self.assertIn("registerMetaDataForSelector", code.co_names)
+
+    def test_lazy_section(self):
+        compiled, _ = self.load_compiled()
+        functions = compiled["functions"]
+        self.assertIsInstance(functions, metadatafile._LazySection)
+        self.assertEqual(len(functions), 3)
+        self.assertIn("NSSwapShort", functions)
+        self.assertIn("NSBeginAlertSheet", functions)
+        self.assertNotIn("NSNoSuchFunction", functions)
+        self.assertNotIn(42, functions)
+        self.assertEqual(functions["NSSwapShort"], (b"SS",))
+        with self.assertRaisesRegex(KeyError, "NSNoSuchFunction"):
+            functions["NSNoSuchFunction"]
+
+        self.assertEqual(functions.pop("NSSwapShort"), (b"SS",))
+        self.assertNotIn("NSSwapShort", functions)
+        self.assertEqual(len(functions), 2)
+        with self.assertRaisesRegex(KeyError, "NSSwapShort"):
+            del functions["NSSwapShort"]
+
+        functions["NSSwapShort"] = 1
+        functions["NSExtra"] = 2
+        self.assertEqual(len(functions), 4)
+        self.assertEqual(
+            set(functions),
+            {"NSSwapShort", "NSExtra", "NSBeginAlertSheet", "NSDecimalIsNotANumber"},
+        )
+        del functions["NSExtra"]
+        self.assertNotIn("NSExtra", functions)
+        self.assertEqual(len(functions), 3)
+        self.assertIn("3 entries", repr(functions))
+
+    def test_lazy_module(self):
+        compiled, _ = self.load_compiled()
+        mod = objc.ObjCLazyModule(
+            "MetadataFileTest", None, None, compiled, None, {}, ()
+        )
+
+        self.assertEqual(mod.NSAboveBottom, 4)
+        self.assertEqual(mod.NSAlias, 1)
+        self.assertEqual(mod.NSAWTEventType, 99)
+        self.assertEqual(mod.mysum, 99 + 4 + 3)
+        self.assertIn("NSRange", mod.__dict__)
+        with self.assertRaisesRegex(AttributeError, "NSNoSuchName"):
+            mod.NSNoSuchName
+
+    def test_invalid_files(self):
+        path = os.path.join(self.tmpdir, "_metadata.bin")
+        self.assertIs(metadatafile.loadMetadataFile(path), None)
+
+        with open(path, "wb"):
+            pass
+        self.assertIs(metadatafile.loadMetadataFile(path), None)
+
+        with open(path, "wb") as fp:
+            fp.write(b"not a metadata file" * 10)
+        self.assertIs(metadatafile.loadMetadataFile(path), None)
+
+        metadatafile.compileMetadataFile(self.source_path)
+        self.assertIsNot(metadatafile.loadMetadataFile(path), None)
+        self.assertIsNot(metadatafile.loadMetadataFile(path, self.source_path), None)
+
+        # Source was changed after compiling the metadata file:
+        with open(self.source_path, "a") as fp:
+            fp.write("# Changed\n")
+        self.assertIs(metadatafile.loadMetadataFile(path, self.source_path), None)
+
+        # Source was copied without changes
+        metadatafile.compileMetadataFile(self.source_path)
+        st = os.stat(self.source_path)
+        os.utime(self.source_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNot(metadatafile.loadMetadataFile(path, self.source_path), None)
+
+        # Source was changed without changing its size
+        with open(self.source_path, "r+") as fp:
+            fp.seek(st.st_size - 2)
+            fp.write("X")
+        os.utime(self.source_path, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+        self.assertEqual(os.stat(self.source_path).st_size, st.st_size)
+        self.assertIs(metadatafile.loadMetadataFile(path, self.source_path), None)
+
+        # The contents of installed files are not checked
+        self.assertFalse(metadatafile._is_installed(self.source_path))
+        self.assertTrue(
+            metadatafile._is_installed(
+                os.path.join(sysconfig.get_path("purelib"), "_metadata.py")
+            )
+        )
+        orig_is_installed = metadatafile._is_installed
+        metadatafile._is_installed = lambda path: True
+        try:
+            self.assertIsNot(
+                metadatafile.loadMetadataFile(path, self.source_path), None
+            )
+        finally:
+            metadatafile._is_installed = orig_is_installed
+
+        # Created for a different Python version
+        with open(path, "r+b") as fp:
+            fp.seek(12)
+            fp.write(b"\0\0\0\0")
+        self.assertIs(metadatafile.loadMetadataFile(path), None)
+
+    def test_metadata_for_module(self):
+        pkgdir = os.path.join(self.tmpdir, "MetadataFileTestPkg")
+        os.mkdir(pkgdir)
+        with open(os.path.join(pkgdir, "__init__.py"), "w"):
+            pass
+        shutil.copy(self.source_path, os.path.join(pkgdir, "_metadata.py"))
+
+        sys.path.insert(0, self.tmpdir)
+        try:
+            metadict = metadatafile.metadataForModule("MetadataFileTestPkg._metadata")
+            self.assertIn("MetadataFileTestPkg._metadata", sys.modules)
+            self.assertIsInstance(metadict["functions"], dict)
+            del sys.modules["MetadataFileTestPkg._metadata"]
+
+            metadatafile.compileMetadataFile(os.path.join(pkgdir, "_metadata.py"))
+            metadict = metadatafile.metadataForModule("MetadataFileTestPkg._metadata")
+            self.assertNotIn("MetadataFileTestPkg._metadata", sys.modules)
+            self.assertIsInstance(metadict["functions"], metadatafile._LazySection)
+            self.assertEqual(metadict["__name__"], "MetadataFileTestPkg._metadata")
+
+        finally:
+            del sys.path[0]
+            for nm in ("MetadataFileTestPkg", "MetadataFileTestPkg._metadata"):
+                sys.modules.pop(nm, None)
@@ -93,6 +93,24 @@ class TestOptions(TestCase):
         finally:
             objc.options.structs_writable = orig
 
+    def test_nscoding_bulk_encoding(self):
+        orig = objc.options.nscoding_bulk_encoding
+        self.assertFalse(objc.options.nscoding_bulk_encoding)
+        try:
+            objc.options.nscoding_bulk_encoding = 1
+            self.assertIs(objc.options.nscoding_bulk_encoding, True)
+
+            objc.options.nscoding_bulk_encoding = ""
+            self.assertIs(objc.options.nscoding_bulk_encoding, False)
+
+            with self.assertRaisesRegex(
+                AttributeError, "Cannot delete option 'nscoding_bulk_encoding'"
+            ):
+                del objc.options.nscoding_bulk_encoding
+
+        finally:
+            objc.options.nscoding_bulk_encoding = orig
+
     def test_nscodiing_version(self):
         orig = objc.options._nscoding_version
         try:
@@ -1,4 +1,7 @@
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 
 try:
@@ -2111,5 +2114,110 @@ class TestTestSupport(TestCase):
             TestSupport._poolclass = orig_class
             TestSupport._unittest.TestCase.run = orig_run
 
+    def test_callable_metadata_problems(self):
+        problems = TestSupport._callable_metadata_problems
+
+        def meta(*types, **extra):
+            return {
+                "retval": {"type": objc._C_VOID},
+                "arguments": [dict({"type": tp}, **extra) for tp in types],
+            }
+
+        self.assertEqual(problems(meta(objc._C_ID, objc._C_INT)), [])
+        self.assertEqual(problems(meta(objc._C_PTR + objc._C_CHR)), ["0: 'char*'"])
+        self.assertEqual(problems(meta(objc._C_PTR + objc._C_CHR), True), [])
+        self.assertEqual(
+            problems(
+                meta(objc._C_PTR + objc._C_CHR, c_array_delimited_by_null=True), True
+            ),
+            ["0: null-delimited 'char*', use _C_CHAR_AS_TEXT instead"],
+        )
+        self.assertEqual(
+            problems(meta(objc._C_PTR + objc._C_INT, c_array_size_in_arg=2)),
+            ["0: c_array_size_in_arg out of range 2"],
+        )
+        self.assertEqual(
+            problems(meta(objc._C_PTR + objc._C_INT, c_array_size_in_arg=(0, 3))),
+            ["0: c_array_size_in_arg out of range 3"],
+        )
+        self.assertEqual(
+            problems(meta(objc._C_IN + objc._C_INT)),
+            [f"0: byref specifier on non-pointer: {objc._C_IN + objc._C_INT}"],
+        )
+
+    def test_metadata_cache(self):
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, "metadata-cache")
+
+        orig_cache = TestSupport._metadata_cache
+        orig_env = os.environ.get("PYOBJC_METADATA_CACHE")
+        try:
+            os.environ["PYOBJC_METADATA_CACHE"] = path
+            TestSupport._metadata_cache = None
+
+            self.assertEqual(TestSupport._get_metadata_cache(), set())
+
+            class Callable:
+                def __init__(self, tp):
+                    self.tp = tp
+
+                def __metadata__(self):
+                    return {
+                        "retval": {"type": objc._C_VOID},
+                        "arguments": [{"type": self.tp}],
+                    }
+
+            valid = Callable(objc._C_ID)
+            invalid = Callable(objc._C_PTR + objc._C_CHR)
+
+            # Use a separate test case to avoid recording a subtest failure
+            # for this test.
+            case = TestCase("run")
+            case._validateCallableMetadata(valid)
+            with self.assertRaisesRegex(AssertionError, "'char\\*' MyClass"):
+                case._validateCallableMetadata(invalid, "MyClass")
+
+            self.assertEqual(len(TestSupport._get_metadata_cache()), 1)
+            self.assertFalse(os.path.exists(path))
+
+            TestSupport._flush_metadata_cache()
+            self.assertTrue(os.path.exists(path))
+
+            TestSupport._metadata_cache = None
+            cache = TestSupport._get_metadata_cache()
+            self.assertEqual(
+                cache, {TestSupport._metadata_digest(valid.__metadata__(), False)}
+            )
+
+            # Only the checks that passed are cached
+            case._validateCallableMetadata(valid)
+            with self.assertRaises(AssertionError):
+                case._validateCallableMetadata(invalid)
+
+            # Merge with the contents of the file
+            TestSupport._save_metadata_cache(path, {b"other"})
+            self.assertEqual(TestSupport._load_metadata_cache(path), cache | {b"other"})
+
+            with open(path, "wb") as fp:
+                pickle.dump((-1, {b"other"}), fp)
+            self.assertEqual(TestSupport._load_metadata_cache(path), set())
+
+            with open(path, "wb") as fp:
+                fp.write(b"garbage")
+            self.assertEqual(TestSupport._load_metadata_cache(path), set())
+
+            self.assertEqual(
+                TestSupport._load_metadata_cache(os.path.join(tmpdir, "missing")),
+                set(),
+            )
+
+        finally:
+            TestSupport._metadata_cache = orig_cache
+            if orig_env is None:
+                del os.environ["PYOBJC_METADATA_CACHE"]
+            else:
+                os.environ["PYOBJC_METADATA_CACHE"] = orig_env
+            shutil.rmtree(tmpdir)
+
     def run(self, *args, **kwds):
         unittest.TestCase.run(self, *args, **kwds)
@@ -0,0 +1,64 @@
+"""
+Benchmarks for calling functions on the main thread with PyObjCTools.AppHelper
+"""
+import threading
+
+from pyobjcbench import benchmark
+
+COUNT = 10000
+
+
+def _run(post):
+    from Foundation import NSDate, NSRunLoop
+
+    def run():
+        calls = []
+        thread = threading.Thread(target=post, args=(calls,))
+        thread.start()
+        thread.join()
+
+        runLoop = NSRunLoop.currentRunLoop()
+        while not calls:
+            runLoop.runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(0.001))
+        return calls
+
+    return run
+
+
+@benchmark()
+def call_after():
+    """Perform 10000 calls posted from a worker thread with callAfter"""
+    from PyObjCTools import AppHelper
+
+    def post(calls):
+        for idx in range(COUNT - 1):
+            AppHelper.callAfter(int, idx)
+        AppHelper.callAfter(calls.append, None)
+
+    return _run(post)
+
+
+@benchmark()
+def call_after_coalesced():
+    """Post 10000 updates for the same key from a worker thread"""
+    from PyObjCTools import AppHelper
+
+    def post(calls):
+        for idx in range(COUNT):
+            AppHelper.callAfterCoalesced("update", calls.append, idx)
+
+    return _run(post)
+
+
+@benchmark(runtime=False)
+def call_queue():
+    """Add 10000 calls to a CallQueue and run them"""
+    from PyObjCTools import AppHelper
+
+    def run():
+        queue = AppHelper.CallQueue()
+        for idx in range(COUNT):
+            queue.add(int, (idx,))
+        queue.run()
+
+    return run
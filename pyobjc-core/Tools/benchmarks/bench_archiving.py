@@ -0,0 +1,146 @@
+"""
+Benchmarks for archiving Python objects with NSKeyedArchiver
+"""
+import os
+import sys
+import types
+
+import objc
+from pyobjcbench import benchmark
+
+NSKeyedArchiver = objc.lookUpClass("NSKeyedArchiver")
+NSKeyedUnarchiver = objc.lookUpClass("NSKeyedUnarchiver")
+
+
+class Samples(list):
+    pass
+
+
+class Record:
+    def __init__(self, idx):
+        self.name = f"record {idx}"
+        self.value = idx
+        self.ratio = idx / 7
+        self.tag = b"tag"
+
+
+def make_samples():
+    samples = Samples(range(5000))
+    samples.extend(i / 3 for i in range(5000))
+    samples.extend(f"value {i}" for i in range(5000))
+    return samples
+
+
+def make_records():
+    return [Record(i) for i in range(1000)]
+
+
+def make_globals():
+    return [
+        value
+        for module in (os, os.path, sys, types)
+        for name, value in sorted(vars(module).items())
+        if not name.startswith("_")
+        and isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType))
+        and getattr(value, "__qualname__", None) == name
+    ]
+
+
+def make_unowned_globals(count=100):
+    # Functions without a __module__ attribute are looked up in all
+    # modules in sys.modules.
+    module = types.ModuleType("bench_archiving_globals")
+    sys.modules[module.__name__] = module
+
+    result = []
+    for idx in range(count):
+
+        def function():
+            pass
+
+        function.__qualname__ = function.__name__ = f"function{idx}"
+        function.__module__ = None
+        setattr(module, function.__name__, function)
+        result.append(function)
+    return result
+
+
+def _archive(value, bulk):
+    orig = objc.options.nscoding_bulk_encoding
+    objc.options.nscoding_bulk_encoding = bulk
+    try:
+        return NSKeyedArchiver.archivedDataWithRootObject_(value)
+    finally:
+        objc.options.nscoding_bulk_encoding = orig
+
+
+def _encode(value, bulk):
+    def run():
+        _archive(value, bulk)
+
+    return run
+
+
+def _decode(value, bulk):
+    data = _archive(value, bulk)
+    return lambda: NSKeyedUnarchiver.unarchiveObjectWithData_(data)
+
+
+@benchmark()
+def encode_samples():
+    """Archive a list subclass with 15000 primitive values"""
+    return _encode(make_samples(), False)
+
+
+@benchmark()
+def encode_samples_bulk():
+    """Archive a list subclass with 15000 primitive values (bulk encoding)"""
+    return _encode(make_samples(), True)
+
+
+@benchmark()
+def decode_samples():
+    """Unarchive a list subclass with 15000 primitive values"""
+    return _decode(make_samples(), False)
+
+
+@benchmark()
+def decode_samples_bulk():
+    """Unarchive a list subclass with 15000 primitive values (bulk encoding)"""
+    return _decode(make_samples(), True)
+
+
+@benchmark()
+def encode_records():
+    """Archive 1000 instances with primitive attributes"""
+    return _encode(make_records(), False)
+
+
+@benchmark()
+def encode_records_bulk():
+    """Archive 1000 instances with primitive attributes (bulk encoding)"""
+    return _encode(make_records(), True)
+
+
+@benchmark()
+def decode_records():
+    """Unarchive 1000 instances with primitive attributes"""
+    return _decode(make_records(), False)
+
+
+@benchmark()
+def decode_records_bulk():
+    """Unarchive 1000 instances with primitive attributes (bulk encoding)"""
+    return _decode(make_records(), True)
+
+
+@benchmark()
+def encode_globals():
+    """Archive a list of functions and classes from stdlib modules"""
+    return _encode(make_globals(), False)
+
+
+@benchmark()
+def encode_unowned_globals():
+    """Archive a list of 100 functions without __module__"""
+    return _encode(make_unowned_globals(), False)
@@ -0,0 +1,58 @@
+"""
+Benchmarks for parsing BridgeSupport files
+"""
+import io
+
+from pyobjcbench import benchmark
+
+
+def make_bridgesupport(count):
+    parts = ['<?xml version="1.0" standalone="yes"?>', "<signatures>"]
+    for i in range(count):
+        parts.append(
+            f'<struct name="BenchRect{i}" '
+            f'type64="{{BenchRect{i}=&quot;origin&quot;{{CGPoint=dd}}'
+            f'&quot;size&quot;{{CGSize=dd}}}}"/>'
+        )
+        parts.append(f'<enum name="BenchEnum{i}" value="{i}"/>')
+        parts.append(f'<constant name="BenchConstant{i}" type="@"/>')
+        parts.append(f'<string_constant name="BenchString{i}" value="value {i}"/>')
+        parts.append(
+            f'<function name="BenchFunction{i}">'
+            '<arg type64="^{CGRect={CGPoint=dd}{CGSize=dd}}" type_modifier="n"/>'
+            '<arg type64="q"/>'
+            '<retval type="Z"/>'
+            "</function>"
+        )
+        parts.append(
+            f'<class name="BenchClass{i}">'
+            f'<method selector="benchValue{i}:error:">'
+            '<arg index="0" type64="q"/>'
+            '<arg index="1" type64="^@" type_modifier="o"/>'
+            '<retval type="Z"/>'
+            "</method>"
+            f'<method selector="benchCallback{i}:">'
+            '<arg index="0" block="true"><arg type="@"/><retval type="v"/></arg>'
+            "</method>"
+            "</class>"
+        )
+    parts.append("</signatures>")
+    return "\n".join(parts).encode()
+
+
+@benchmark(runtime=False)
+def parse():
+    """Parse a BridgeSupport file with 1000 entries of every kind"""
+    from objc._bridgesupport import _BridgeSupportParser
+
+    data = make_bridgesupport(1000)
+    return lambda: _BridgeSupportParser(data, "BenchFramework")
+
+
+@benchmark(runtime=False)
+def parse_file():
+    """Parse a BridgeSupport file with 1000 entries of every kind from a stream"""
+    from objc._bridgesupport import _BridgeSupportParser
+
+    data = make_bridgesupport(1000)
+    return lambda: _BridgeSupportParser(io.BytesIO(data), "BenchFramework")
@@ -0,0 +1,137 @@
+"""
+Benchmarks for attribute lookup and calling methods and functions
+"""
+import math
+
+from pyobjcbench import benchmark
+
+
+def _lookup(name):
+    import objc
+
+    return objc.lookUpClass(name)
+
+
+@benchmark(runtime=False)
+def object_description_lookup():
+    """Python object: look up '__repr__'"""
+    o = object()
+    return lambda: o.__repr__
+
+
+@benchmark()
+def nsobject_description_lookup():
+    """NSObject: look up 'description'"""
+    o = _lookup("NSObject").alloc().init()
+    return lambda: o.description
+
+
+@benchmark()
+def nsarray_description_lookup():
+    """NSArray: look up 'description'"""
+    o = _lookup("NSArray").alloc().init()
+    return lambda: o.description
+
+
+@benchmark(runtime=False)
+def object_description_bound_call():
+    """Python object: call bound '__repr__'"""
+    return object().__repr__
+
+
+@benchmark()
+def nsobject_description_bound_call():
+    """NSObject: call bound 'description'"""
+    return _lookup("NSObject").alloc().init().description
+
+
+@benchmark()
+def nsarray_description_bound_call():
+    """NSArray: call bound 'description'"""
+    return _lookup("NSArray").alloc().init().description
+
+
+@benchmark()
+def nsobject_description_unbound_call():
+    """NSObject: look up and call 'description'"""
+    o = _lookup("NSObject").alloc().init()
+    return lambda: o.description()
+
+
+@benchmark()
+def nsarray_description_unbound_call():
+    """NSArray: look up and call 'description'"""
+    o = _lookup("NSArray").alloc().init()
+    return lambda: o.description()
+
+
+@benchmark()
+def nsobject_description_imp_call():
+    """NSObject: call IMP for 'description'"""
+    o = _lookup("NSObject").alloc().init()
+    m = o.methodForSelector_(b"description")
+    return lambda: m(o)
+
+
+@benchmark()
+def nsarray_description_imp_call():
+    """NSArray: call IMP for 'description'"""
+    o = _lookup("NSArray").alloc().init()
+    m = o.methodForSelector_(b"description")
+    return lambda: m(o)
+
+
+@benchmark(runtime=False)
+def python_function_call():
+    """Call math.sin"""
+    f = math.sin
+    return lambda: f(5.0)
+
+
+@benchmark()
+def objc_function_call():
+    """Call sin() through objc.loadBundleFunctions"""
+    import objc
+
+    d = {}
+    objc.loadBundleFunctions(None, d, [("sin", b"dd")])
+    f = d["sin"]
+    return lambda: f(5.0)
+
+
+@benchmark()
+def call_from_objc():
+    """Call a Python method from Objective-C (10 times)"""
+    import objc
+
+    NSObject = objc.lookUpClass("NSObject")
+    NSArray = objc.lookUpClass("NSArray")
+
+    class CallFromObjC1(NSObject):
+        __slots__ = ("count",)
+
+        def init(self):
+            self = objc.super(CallFromObjC1, self).init()
+            self.count = 0
+            return self
+
+        def aSelector(self):
+            self.count += 1
+
+    o = CallFromObjC1.new()
+    a = NSArray.arrayWithArray_([o] * 10)
+    return lambda: a.makeObjectsPerformSelector_(b"aSelector")
+
+
+@benchmark()
+def hasattr_nsobject_true():
+    """NSObject: hasattr for existing method"""
+    o = _lookup("NSObject").alloc().init()
+    return lambda: hasattr(o, "description")
+
+
+@benchmark()
+def hasattr_nsobject_false():
+    """NSObject: hasattr for missing attribute"""
+    o = _lookup("NSObject").alloc().init()
+    return lambda: hasattr(o, "invalidselector")
@@ -0,0 +1,175 @@
+"""
+Benchmarks for PyObjCTools.Conversion with deep and wide collections
+"""
+import Foundation
+from PyObjCTools.Conversion import (
+    deserializePropertyList,
+    iterPropertyListFromPythonCollection,
+    propertyListFromPythonCollection,
+    pythonCollectionFromPropertyList,
+    serializePropertyList,
+)
+from pyobjcbench import benchmark
+
+
+def make_wide():
+    return {
+        f"key{i}": [i, i / 3, f"value {i}", {"index": i, "flag": i % 2 == 0}]
+        for i in range(2000)
+    }
+
+
+def make_flat():
+    return list(range(5000)) + [f"value {i}" for i in range(5000)]
+
+
+def make_deep(depth=2000):
+    value = {"leaf": 1}
+    for i in range(depth):
+        value = {"level": i, "child": [value]}
+    return value
+
+
+def make_shared():
+    shared = [{"index": i} for i in range(100)]
+    return [shared] * 200
+
+
+def _to_objc(value):
+    # Round trip through a binary property list to get a collection
+    # with Foundation containers only.
+    NSPropertyListSerialization = Foundation.NSPropertyListSerialization
+    data, _ = NSPropertyListSerialization.dataWithPropertyList_format_options_error_(
+        value, Foundation.NSPropertyListBinaryFormat_v1_0, 0, None
+    )
+    (
+        result,
+        _,
+        _,
+    ) = NSPropertyListSerialization.propertyListWithData_options_format_error_(
+        data, Foundation.NSPropertyListMutableContainers, None, None
+    )
+    return result
+
+
+@benchmark()
+def to_objc_wide():
+    """propertyListFromPythonCollection for 2000 small containers"""
+    value = make_wide()
+    return lambda: propertyListFromPythonCollection(value)
+
+
+@benchmark()
+def to_objc_flat():
+    """propertyListFromPythonCollection for a list with 10000 values"""
+    value = make_flat()
+    return lambda: propertyListFromPythonCollection(value)
+
+
+@benchmark()
+def to_objc_deep():
+    """propertyListFromPythonCollection for a collection nested 4000 levels deep"""
+    value = make_deep()
+    return lambda: propertyListFromPythonCollection(value)
+
+
+@benchmark()
+def to_objc_shared():
+    """propertyListFromPythonCollection for a list with 200 references to a list"""
+    value = make_shared()
+    return lambda: propertyListFromPythonCollection(value)
+
+
+@benchmark()
+def to_objc_iter():
+    """iterPropertyListFromPythonCollection for 2000 small containers"""
+    value = make_wide()
+
+    def run():
+        for _ in iterPropertyListFromPythonCollection(value):
+            pass
+
+    return run
+
+
+@benchmark()
+def from_objc_wide():
+    """pythonCollectionFromPropertyList for 2000 small containers"""
+    value = _to_objc(make_wide())
+    return lambda: pythonCollectionFromPropertyList(value)
+
+
+@benchmark()
+def from_objc_flat():
+    """pythonCollectionFromPropertyList for an array with 10000 values"""
+    value = _to_objc(make_flat())
+    return lambda: pythonCollectionFromPropertyList(value)
+
+
+@benchmark()
+def from_objc_deep():
+    """pythonCollectionFromPropertyList for a collection nested 4000 levels deep"""
+    value = _to_objc(make_deep())
+    return lambda: pythonCollectionFromPropertyList(value)
+
+
+def _serialize(fmt, backend):
+    value = make_wide()
+    return lambda: serializePropertyList(value, fmt, backend=backend)
+
+
+def _deserialize(fmt, backend):
+    data = bytes(serializePropertyList(make_wide(), fmt))
+    if backend == "python":
+        return lambda: deserializePropertyList(data, backend=backend)
+
+    # Compare with converting to Python objects after deserializing
+    return lambda: pythonCollectionFromPropertyList(deserializePropertyList(data))
+
+
+@benchmark()
+def serialize_xml():
+    """serializePropertyList for 2000 small containers (xml)"""
+    return _serialize("xml", "foundation")
+
+
+@benchmark()
+def serialize_xml_python():
+    """serializePropertyList for 2000 small containers (xml, python backend)"""
+    return _serialize("xml", "python")
+
+
+@benchmark()
+def serialize_binary():
+    """serializePropertyList for 2000 small containers (binary)"""
+    return _serialize("binary", "foundation")
+
+
+@benchmark()
+def serialize_binary_python():
+    """serializePropertyList for 2000 small containers (binary, python backend)"""
+    return _serialize("binary", "python")
+
+
+@benchmark()
+def deserialize_xml():
+    """Deserialize 2000 small containers into Python objects (xml)"""
+    return _deserialize("xml", "foundation")
+
+
+@benchmark()
+def deserialize_xml_python():
+    """Deserialize 2000 small containers into Python objects (xml, python backend)"""
+    return _deserialize("xml", "python")
+
+
+@benchmark()
+def deserialize_binary():
+    """Deserialize 2000 small containers into Python objects (binary)"""
+    return _deserialize("binary", "foundation")
+
+
+@benchmark()
+def deserialize_binary_python():
+    """Deserialize 2000 small containers into Python objects (binary, python backend)"""
+    return _deserialize("binary", "python")
@@ -0,0 +1,105 @@
+"""
+Benchmarks for attribute access on NSManagedObject instances
+"""
+import CoreData
+from pyobjcbench import benchmark
+
+ATTRIBUTES = ("name", "title", "city", "street", "country")
+
+
+class Record(CoreData.NSManagedObject):
+    pass
+
+
+def make_context():
+    entity = CoreData.NSEntityDescription.new()
+    entity.setName_("Record")
+
+    properties = []
+    for name in ATTRIBUTES:
+        attribute = CoreData.NSAttributeDescription.new()
+        attribute.setName_(name)
+        attribute.setAttributeType_(CoreData.NSStringAttributeType)
+        properties.append(attribute)
+    entity.setProperties_(properties)
+
+    model = CoreData.NSManagedObjectModel.new()
+    model.setEntities_([entity])
+
+    coordinator = (
+        CoreData.NSPersistentStoreCoordinator.alloc().initWithManagedObjectModel_(model)
+    )
+    coordinator.addPersistentStoreWithType_configuration_URL_options_error_(
+        CoreData.NSInMemoryStoreType, None, None, None, None
+    )
+
+    context = CoreData.NSManagedObjectContext.new()
+    context.setPersistentStoreCoordinator_(coordinator)
+    return entity, context
+
+
+def make_objects(cls, count=1000):
+    entity, context = make_context()
+    objects = [
+        cls.alloc().initWithEntity_insertIntoManagedObjectContext_(entity, context)
+        for _ in range(count)
+    ]
+    # Keep the context alive while the benchmark runs
+    return context, objects
+
+
+def _set_attributes(cls):
+    context, objects = make_objects(cls)
+
+    def run():
+        for obj in objects:
+            obj.name = "name"
+            obj.title = "title"
+            obj.city = "city"
+            obj.street = "street"
+            obj.country = "country"
+
+    run.context = context
+    return run
+
+
+def _get_attributes(cls):
+    context, objects = make_objects(cls)
+    for obj in objects:
+        for name in ATTRIBUTES:
+            setattr(obj, name, name)
+
+    def run():
+        for obj in objects:
+            obj.name
+            obj.title
+            obj.city
+            obj.street
+            obj.country
+
+    run.context = context
+    return run
+
+
+@benchmark()
+def set_attributes():
+    """Set 5 attributes on 1000 NSManagedObject instances"""
+    return _set_attributes(CoreData.NSManagedObject)
+
+
+@benchmark()
+def set_attributes_subclass():
+    """Set 5 attributes on 1000 instances of a Python subclass of NSManagedObject"""
+    return _set_attributes(Record)
+
+
+@benchmark()
+def get_attributes():
+    """Get 5 attributes on 1000 NSManagedObject instances"""
+    return _get_attributes(CoreData.NSManagedObject)
+
+
+@benchmark()
+def get_attributes_subclass():
+    """Get 5 attributes on 1000 instances of a Python subclass of NSManagedObject"""
+    return _get_attributes(Record)
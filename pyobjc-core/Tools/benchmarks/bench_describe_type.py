@@ -0,0 +1,30 @@
+"""
+Benchmarks for the type descriptions used in docstrings
+"""
+from pyobjcbench import benchmark
+
+TYPES = [
+    b"i",
+    b"@",
+    b"^v",
+    b"^?",
+    b"@?",
+    b"n^{CGRect={CGPoint=dd}{CGSize=dd}}",
+    b"o^@",
+    b"[16C]",
+    b"(bench_union=iq)",
+    b"r*",
+    b"^^{__CFString=}",
+]
+
+
+@benchmark(runtime=False)
+def describe_types():
+    """Describe a mix of type encodings"""
+    from objc._callable_docstr import describe_type
+
+    def run():
+        for typestr in TYPES:
+            describe_type(typestr)
+
+    return run
@@ -0,0 +1,230 @@
+"""
+Benchmarks for PyObjCTools.KeyValueCoding with Python objects
+"""
+from pyobjcbench import benchmark
+
+
+class Record:
+    def __init__(self, name, value, children=()):
+        self.name = name
+        self.value = value
+        self.children = list(children)
+
+    def total(self):
+        return self.value
+
+
+def make_tree():
+    return Record(
+        "root",
+        0,
+        [
+            Record(f"child{i}", i, [Record(f"leaf{i}.{j}", j) for j in range(10)])
+            for i in range(10)
+        ],
+    )
+
+
+@benchmark(runtime=False)
+def getkey_attribute():
+    """getKey for an attribute"""
+    from PyObjCTools.KeyValueCoding import getKey
+
+    record = Record("name", 42)
+    return lambda: getKey(record, "value")
+
+
+@benchmark(runtime=False)
+def getkey_method():
+    """getKey for a method"""
+    from PyObjCTools.KeyValueCoding import getKey
+
+    record = Record("name", 42)
+    return lambda: getKey(record, "total")
+
+
+@benchmark(runtime=False)
+def getkeypath_dict():
+    """getKeyPath for a nested dict"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    value = {"a": {"b": {"c": {"d": 1}}}}
+    return lambda: getKeyPath(value, "a.b.c.d")
+
+
+@benchmark(runtime=False)
+def getkeypath_list():
+    """getKeyPath mapping a key over a list"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    tree = make_tree()
+    return lambda: getKeyPath(tree, "children.name")
+
+
+@benchmark(runtime=False)
+def getkeypath_sum():
+    """getKeyPath with the @sum operator"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    tree = make_tree()
+    return lambda: getKeyPath(tree, "children.@sum.value")
+
+
+@benchmark(runtime=False)
+def getkeypath_union():
+    """getKeyPath with the @unionOfArrays operator"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    groups = [child.children for child in make_tree().children]
+    return lambda: getKeyPath(groups, "@unionOfArrays.name")
+
+
+@benchmark(runtime=False)
+def getkeypath_records():
+    """getKeyPath for a nested attribute of 1000 records"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    records = [Record(f"r{i}", i, [Record("child", i)]) for i in range(1000)]
+
+    def func():
+        for record in records:
+            getKeyPath(record, "children.value")
+
+    return func
+
+
+@benchmark(runtime=False)
+def compiled_keypath_records():
+    """compileKeyPath for a nested attribute of 1000 records"""
+    from PyObjCTools.KeyValueCoding import compileKeyPath
+
+    records = [Record(f"r{i}", i, [Record("child", i)]) for i in range(1000)]
+    accessor = compileKeyPath("children.value")
+
+    def func():
+        for record in records:
+            accessor(record)
+
+    return func
+
+
+@benchmark(runtime=False)
+def compiled_keypath_method():
+    """compileKeyPath for a method"""
+    from PyObjCTools.KeyValueCoding import compileKeyPath
+
+    record = Record("name", 42)
+    accessor = compileKeyPath("total")
+    return lambda: accessor(record)
+
+
+@benchmark(runtime=False)
+def compiled_keypath_dict():
+    """compileKeyPath for a nested dict"""
+    from PyObjCTools.KeyValueCoding import compileKeyPath
+
+    value = {"a": {"b": {"c": {"d": 1}}}}
+    accessor = compileKeyPath("a.b.c.d")
+    return lambda: accessor(value)
+
+
+@benchmark(runtime=False)
+def compiled_keypath_sum():
+    """compileKeyPath with the @sum operator"""
+    from PyObjCTools.KeyValueCoding import compileKeyPath
+
+    tree = make_tree()
+    accessor = compileKeyPath("children.@sum.value")
+    return lambda: accessor(tree)
+
+
+@benchmark(runtime=False)
+def sum_large():
+    """@sum over 100000 dicts"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    values = [{"amount": i % 1000} for i in range(100000)]
+    return lambda: getKeyPath(values, "@sum.amount")
+
+
+@benchmark(runtime=False)
+def avg_large_float():
+    """@avg over 100000 records with float values"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    values = [Record(f"r{i}", i / 7) for i in range(100000)]
+    return lambda: getKeyPath(values, "@avg.value")
+
+
+@benchmark(runtime=False)
+def max_large():
+    """@max over 100000 records"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    values = [Record(f"r{i}", i % 1000) for i in range(100000)]
+    return lambda: getKeyPath(values, "@max.value")
+
+
+@benchmark(runtime=False)
+def distinct_union_large():
+    """@distinctUnionOfObjects over 100000 dicts"""
+    from PyObjCTools.KeyValueCoding import getKeyPath
+
+    values = [{"customer": f"customer{i % 5000}"} for i in range(100000)]
+    return lambda: getKeyPath(values, "@distinctUnionOfObjects.customer")
+
+
+@benchmark(runtime=False)
+def getkey_homogeneous():
+    """getKey for an attribute of 1000 records of the same type"""
+    from PyObjCTools.KeyValueCoding import getKey
+
+    records = [Record(f"r{i}", i) for i in range(1000)]
+
+    def func():
+        for record in records:
+            getKey(record, "value")
+
+    return func
+
+
+@benchmark(runtime=False)
+def getkey_homogeneous_uncached():
+    """getKey for an attribute of 1000 records without the strategy cache"""
+    from PyObjCTools.KeyValueCoding import _generic_get_key
+
+    records = [Record(f"r{i}", i) for i in range(1000)]
+
+    def func():
+        for record in records:
+            _generic_get_key(record, "value")
+
+    return func
+
+
+@benchmark(runtime=False)
+def setkey_homogeneous():
+    """setKey for an attribute of 1000 records of the same type"""
+    from PyObjCTools.KeyValueCoding import setKey
+
+    records = [Record(f"r{i}", i) for i in range(1000)]
+
+    def func():
+        for record in records:
+            setKey(record, "value", 1)
+
+    return func
+
+
+@benchmark(runtime=False)
+def setkey_homogeneous_uncached():
+    """setKey for an attribute of 1000 records without the strategy cache"""
+    from PyObjCTools.KeyValueCoding import _generic_set_key
+
+    records = [Record(f"r{i}", i) for i in range(1000)]
+
+    def func():
+        for record in records:
+            _generic_set_key(record, "value", 1)
+
+    return func
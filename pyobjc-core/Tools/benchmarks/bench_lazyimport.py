@@ -0,0 +1,149 @@
+"""
+Benchmarks for the lazy loader used by framework wrappers
+"""
+import re
+import subprocess
+import sys
+
+from pyobjcbench import benchmark
+
+# Metadata with a size comparable to that of AppKit
+NAMES = [f"NSBenchEnum{i}" for i in range(20000)]
+ENUMS = "$" + "".join(f"{nm}@{i}$" for i, nm in enumerate(NAMES))
+LOOKUP = NAMES[::20]
+
+
+@benchmark(runtime=False)
+def resolve_enums_regex():
+    """Resolve 1000 enums by scanning metadata using a regular expression"""
+
+    def run():
+        for name in LOOKUP:
+            re.search(rf"\${name}@([^$]*)\$", ENUMS)
+
+    return run
+
+
+@benchmark(runtime=False)
+def resolve_enums():
+    """Resolve 1000 enums in a new lazy module"""
+    import objc
+
+    def run():
+        mod = objc.ObjCLazyModule(
+            "BenchFramework", None, None, {"enums": ENUMS}, None, {}, ()
+        )
+        for name in LOOKUP:
+            getattr(mod, name)
+
+    return run
+
+
+@benchmark()
+def hasattr_missing():
+    """hasattr for a missing name in a chain of 4 lazy modules"""
+    import objc
+
+    enums = "$" + "".join(f"NSBenchEnum{i}@{i}$" for i in range(5000))
+    mod = None
+    for i in range(4):
+        mod = objc.ObjCLazyModule(
+            f"BenchFramework{i}",
+            None,
+            None,
+            {"enums": enums},
+            None,
+            {},
+            (mod,) if mod is not None else (),
+        )
+    return lambda: hasattr(mod, "NSNoSuchName")
+
+
+@benchmark()
+def resolve_and_dir():
+    """Resolve a name and call dir() (10 times)"""
+    import objc
+
+    mod = objc.ObjCLazyModule(
+        "BenchFramework", None, None, {"enums": ENUMS}, None, {}, ()
+    )
+
+    def run():
+        for i in range(10):
+            getattr(mod, f"NSBenchEnum{i}")
+            dir(mod)
+
+    return run
+
+
+@benchmark()
+def import_appkit():
+    """Import AppKit in a new interpreter"""
+    cmd = [sys.executable, "-c", "import AppKit"]
+    return lambda: subprocess.check_call(cmd)
+
+
+@benchmark()
+def import_foundation():
+    """Import Foundation in a new interpreter"""
+    cmd = [sys.executable, "-c", "import Foundation"]
+    return lambda: subprocess.check_call(cmd)
+
+
+CONVENIENCE_CLASSES = [
+    "NSArray",
+    "NSMutableArray",
+    "NSDictionary",
+    "NSMutableDictionary",
+    "NSSet",
+    "NSMutableSet",
+    "NSString",
+    "NSMutableString",
+    "NSData",
+    "NSMutableData",
+    "NSNumber",
+    "NSValue",
+    "NSDate",
+    "NSNull",
+    "NSEnumerator",
+]
+
+
+def _setup_conveniences():
+    # Make sure the classes are in use and return a function that
+    # adds a convenience method to all of them. The function resets
+    # the list of conveniences to avoid growing it on every run.
+    import objc
+    import objc._convenience as convenience
+
+    original = {}
+    for classname in CONVENIENCE_CLASSES:
+        objc.lookUpClass(classname)
+        original[classname] = convenience.CLASS_METHODS.get(classname, ())
+
+    def register():
+        for classname in CONVENIENCE_CLASSES:
+            convenience.CLASS_METHODS[classname] = original[classname]
+            objc.addConvenienceForClass(classname, (("_bench_convenience", len),))
+
+    return register
+
+
+@benchmark()
+def add_conveniences():
+    """Add conveniences to 15 classes that are in use"""
+    return _setup_conveniences()
+
+
+@benchmark()
+def add_conveniences_batch():
+    """Add conveniences to 15 classes that are in use, in a batch"""
+    import objc
+
+    register = _setup_conveniences()
+
+    def run():
+        with objc.batchConveniences():
+            register()
+
+    return run
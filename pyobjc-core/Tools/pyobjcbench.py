@@ -1,271 +1,514 @@
 #!/usr/bin/env python
 """
-Script for gathering performance statistics.
-
-This is very much a work in progress, and will morph into a tool
-simular to pybench, but just measuring the speed of a number of
-PyObjC primitives:
+Benchmark suite for PyObjC.
+
+Usage::
+
+    pyobjcbench.py run [--pure] [--filter PATTERN] [-o FILE | --record]
+    pyobjcbench.py compare [--threshold PCT] BASELINE RESULT ...
+    pyobjcbench.py list [--pure]
+
+Benchmarks are defined in the modules in the "benchmarks" directory
+next to this script (files named "bench_*.py"), additional modules can
+be added using the "--module" option of the "run" command.
+
+A benchmark is a function decorated with :func:`benchmark` that performs
+the setup for the benchmark and returns a callable without arguments
+that will be timed::
+
+    from pyobjcbench import benchmark
+
+    @benchmark(runtime=False)
+    def describe_int():
+        from objc._callable_docstr import describe_type
+        return lambda: describe_type(b"i")
+
+Benchmarks that don't use Objective-C classes, instances or frameworks
+should be marked with ``runtime=False``, those can be run using
+"run --pure". Modules with such benchmarks should only import PyObjC
+in the benchmark functions, the other benchmarks in the module can
+then be run where PyObjC isn't available. Benchmarks that raise
+:exc:`ImportError` during setup are reported and skipped.
+
+Each benchmark is run a number of times for warmup, then calibrated to
+a number of loops that take at least "--min-time" seconds, and then
+timed "--repeat" times. The results contain the time per loop for all
+repetitions, and the median and interquartile range.
+
+The "compare" command compares the results of one or more runs with
+a baseline and exits with status 1 when a benchmark is significantly
+slower than in the baseline, that is when the median is more than
+"--threshold" percent slower and a Mann-Whitney U test shows that the
+difference is statistically significant.
+"""
 
-* For methods, functions and blocks:
+import argparse
+import datetime
+import fnmatch
+import gc
+import importlib.util
+import itertools
+import json
+import math
+import pathlib
+import platform
+import sys
+import time
 
-  - Call with 0, 1, 5 simple arguments
-  - Same with by reference arguments
+# Version of the JSON format for results
+SCHEMA_VERSION = 1
 
-* For methods:
-  - Attribute lookup
-  - Attribute lookup + call (e.g. how they are usually called)
+BENCHMARK_DIR = pathlib.Path(__file__).resolve().parent / "benchmarks"
+RESULTS_DIR = pathlib.Path(__file__).resolve().parent / "results"
 
-* objc.repythonify for a number of types
+BENCHMARKS = {}
 
-* Add benchmark with ctypes for calling functions
+# Benchmark modules use "from pyobjcbench import benchmark",
+# ensure that they use this module when run as a script.
+sys.modules.setdefault("pyobjcbench", sys.modules[__name__])
 
-"""
 
-import textwrap
-import timeit
-import sys
-import pathlib
+class Benchmark:
+    def __init__(self, name, setup, runtime, description):
+        self.name = name
+        self.setup = setup
+        self.runtime = runtime
+        self.description = description
 
-import objc
 
-if len(sys.argv) == 2 and sys.argv[1] == "--record":
-    records_dir = pathlib.Path(__file__).parent / "results"
-    if not records_dir.is_dir():
-        records_dir.mkdir()
+def benchmark(name=None, *, runtime=True):
+    """
+    Decorator for benchmark functions.
 
-    record_fp = open(
-        records_dir / f"pyobjcbench-{objc.__version__}.txt",
-        "w",
-    )
+    The name of the benchmark is the name of the module without the
+    "bench_" prefix, followed by *name* (default: the function name).
+    Set *runtime* to False for benchmarks that can run without the
+    Objective-C runtime.
+    """
 
-    def print_bench(title, time):
-        print(f"{title:30s}: {time:.3f}")
-        print(f"{title:30s}: {time:.3f}", file=record_fp)
+    def decorator(function):
+        modname = function.__module__.rpartition(".")[-1]
+        if modname.startswith("bench_"):
+            modname = modname[6:]
+        fullname = f"{modname}.{name or function.__name__}"
 
-    def print_header(key, value):
-        print(f"@{key} {value}")
-        print(f"@{key} {value}", file=record_fp)
+        if fullname in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark {fullname!r}")
 
-else:
+        BENCHMARKS[fullname] = Benchmark(
+            fullname,
+            function,
+            runtime,
+            (function.__doc__ or "").strip().split("\n")[0],
+        )
+        return function
 
-    def print_bench(title, time):
-        print(f"{title:30s}: {time:.3f}")
+    return decorator
 
-    def print_header(key, value):
-        print(f"@{key} {value}")
 
+def load_benchmarks(paths):
+    """
+    Load the benchmark modules at *paths*
 
-NSObject = objc.lookUpClass("NSObject")
-NSArray = objc.lookUpClass("NSArray")
+    Modules that cannot be imported, for example because they use
+    a framework wrapper that isn't installed, are reported and skipped.
+    """
+    for path in paths:
+        path = pathlib.Path(path)
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[path.stem] = module
+        try:
+            spec.loader.exec_module(module)
+        except ImportError as exc:
+            del sys.modules[path.stem]
+            for name in [
+                name
+                for name, bench in BENCHMARKS.items()
+                if bench.setup.__module__ == path.stem
+            ]:
+                del BENCHMARKS[name]
+            print(f"Skipping {path.name}: {exc}", file=sys.stderr)
+
+
+#
+# Measurement and statistics
+#
+
+
+def _time_loops(func, loops):
+    it = itertools.repeat(None, loops)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in it:
+            func()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def measure(func, *, warmup=3, repeat=10, min_time=0.1):
+    """
+    Returns the number of loops and a list of *repeat* samples
+    with the time per loop for *func*.
+    """
+    for _ in range(warmup):
+        func()
 
-BENCHMARKS = []
+    loops = 1
+    while True:
+        elapsed = _time_loops(func, loops)
+        if elapsed >= min_time:
+            break
 
+        if elapsed <= 0:
+            loops *= 10
+        else:
+            loops = max(loops * 2, int(loops * min_time / elapsed * 1.1))
 
-def benchmark(func):
-    BENCHMARKS.append(func)
-    return func
+    return loops, [_time_loops(func, loops) / loops for _ in range(repeat)]
 
 
-@benchmark
-def descriptor_lookup():
-    print_bench(
-        "object description lookup",
-        timeit.timeit(setup="o = object()", stmt="o.__repr__"),
-    )
-    print_bench(
-        "NSObject description lookup",
-        timeit.timeit(
-            setup='import objc; NSObject = objc.lookUpClass("NSObject"); '
-            "o = NSObject.alloc().init()",
-            stmt="o.description",
-        ),
-    )
-    print_bench(
-        "NSArray description lookup",
-        timeit.timeit(
-            setup='import objc; NSArray = objc.lookUpClass("NSArray"); '
-            "o = NSArray.alloc().init()",
-            stmt="o.description",
-        ),
-    )
+def quantile(sorted_values, q):
+    """
+    Returns quantile *q* of a sorted list, using linear interpolation
+    """
+    pos = (len(sorted_values) - 1) * q
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(samples):
+    values = sorted(samples)
+    q1 = quantile(values, 0.25)
+    q3 = quantile(values, 0.75)
+    mean = sum(values) / len(values)
+    if len(values) > 1:
+        stdev = math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+    else:
+        stdev = 0.0
+
+    return {
+        "median": quantile(values, 0.5),
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "min": values[0],
+        "max": values[-1],
+        "mean": mean,
+        "stdev": stdev,
+    }
+
+
+def mann_whitney_u(a, b):
+    """
+    Two-sided Mann-Whitney U test using the normal approximation,
+    returns the p-value.
+    """
+    n1 = len(a)
+    n2 = len(b)
+    combined = sorted(itertools.chain(((v, 0) for v in a), ((v, 1) for v in b)))
+
+    # Assign ranks, using the average rank for ties
+    ranks = [0.0] * len(combined)
+    tie_correction = 0.0
+    idx = 0
+    while idx < len(combined):
+        end = idx
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[idx][0]:
+            end += 1
+        for j in range(idx, end + 1):
+            ranks[j] = (idx + end) / 2 + 1
+        count = end - idx + 1
+        tie_correction += count**3 - count
+        idx = end + 1
+
+    rank_sum = sum(r for r, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+
+    n = n1 + n2
+    mu = n1 * n2 / 2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_correction / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+
+    z = (abs(u - mu) - 0.5) / sigma
+    return min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+#
+# Running benchmarks
+#
+
+
+def select_benchmarks(patterns, pure):
+    result = []
+    for name, bench in sorted(BENCHMARKS.items()):
+        if pure and bench.runtime:
+            continue
+        if patterns and not any(fnmatch.fnmatchcase(name, p) for p in patterns):
+            continue
+        result.append(bench)
+    return result
+
+
+def run_benchmarks(benchmarks, *, warmup, repeat, min_time, verbose=True):
+    results = {}
+    for bench in benchmarks:
+        try:
+            func = bench.setup()
+        except ImportError as exc:
+            print(f"Skipping {bench.name}: {exc}", file=sys.stderr)
+            continue
+
+        loops, samples = measure(func, warmup=warmup, repeat=repeat, min_time=min_time)
+        info = summarize(samples)
+        if verbose:
+            print(
+                f"{bench.name:45s} {_fmt_time(info['median']):>10s}"
+                f" +- {_fmt_time(info['iqr'] / 2):>10s}"
+            )
+
+        info["runtime"] = bench.runtime
+        info["loops"] = loops
+        info["samples"] = samples
+        results[bench.name] = info
+
+    return results
+
+
+def environment():
+    try:
+        import objc
+    except ImportError:
+        objc_version = None
+    else:
+        objc_version = objc.__version__
+
+    return {
+        "python": ".".join(str(x) for x in sys.version_info[:3]),
+        "implementation": platform.python_implementation(),
+        "objc": objc_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def _fmt_time(value):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if value * scale >= 1:
+            return f"{value * scale:.2f} {unit}"
+    return f"{value * 1e9:.0f} ns"
+
+
+def cmd_run(args):
+    paths = sorted(BENCHMARK_DIR.glob("bench_*.py"))
+    paths.extend(args.module)
+    load_benchmarks(paths)
+
+    benchmarks = select_benchmarks(args.filter, args.pure)
+    if not benchmarks:
+        print("No benchmarks selected", file=sys.stderr)
+        return 2
+
+    env = environment()
+    print(f"@python {env['python']}")
+    print(f"@objc {env['objc']}")
     print()
 
-
-@benchmark
-def bound_method_call():
-    print_bench(
-        "object description bound call",
-        timeit.timeit(setup="m = object().__repr__", stmt="m()"),
-    )
-    print_bench(
-        "NSObject description bound call",
-        timeit.timeit(
-            setup='import objc; NSObject = objc.lookUpClass("NSObject"); '
-            "m = NSObject.alloc().init().description",
-            stmt="m()",
-        ),
-    )
-    print_bench(
-        "NSArray description bound call",
-        timeit.timeit(
-            setup='import objc; NSArray = objc.lookUpClass("NSArray"); '
-            "m = NSArray.alloc().init().description",
-            stmt="m()",
+    data = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "environment": env,
+        "settings": {
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "benchmarks": run_benchmarks(
+            benchmarks, warmup=args.warmup, repeat=args.repeat, min_time=args.min_time
         ),
-    )
-    print()
+    }
 
+    output = args.output
+    if output is None and args.record:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"pyobjcbench-{env['objc']}-py{env['python']}.json"
 
-@benchmark
-def unbound_method_call():
-    print_bench(
-        "object description unbound call",
-        timeit.timeit(setup="o = object()", stmt="o.__repr__()"),
-    )
-    print_bench(
-        "NSObject description unbound call",
-        timeit.timeit(
-            setup='import objc; NSObject = objc.lookUpClass("NSObject"); '
-            "o = NSObject.alloc().init()",
-            stmt="o.description()",
-        ),
-    )
-    print_bench(
-        "NSArray description unbound call",
-        timeit.timeit(
-            setup='import objc; NSArray = objc.lookUpClass("NSArray"); '
-            "o = NSArray.alloc().init()",
-            stmt="o.description()",
-        ),
-    )
-    print()
+    if output is not None:
+        with open(output, "w") as fp:
+            json.dump(data, fp, indent=2)
+            fp.write("\n")
 
+    return 0
 
-@benchmark
-def imp_call():
-    print_bench(
-        "object description IMP call",
-        timeit.timeit(setup="o = object(); m = object.__repr__", stmt="m(o)"),
-    )
-    print_bench(
-        "NSObject description IMP call",
-        timeit.timeit(
-            setup='import objc; NSObject = objc.lookUpClass("NSObject"); '
-            "o = NSObject.alloc().init(); m = o.methodForSelector_(b'description')",
-            stmt="m(o)",
-        ),
-    )
-    print_bench(
-        "NSArray description IMP call",
-        timeit.timeit(
-            setup='import objc; NSArray = objc.lookUpClass("NSArray"); '
-            "o = NSArray.alloc().init(); m = o.methodForSelector_(b'description')",
-            stmt="m(o)",
-        ),
-    )
-    print()
 
+def cmd_list(args):
+    load_benchmarks(sorted(BENCHMARK_DIR.glob("bench_*.py")))
+    for bench in select_benchmarks(args.filter, args.pure):
+        marker = " " if bench.runtime else "*"
+        print(f"{marker} {bench.name:45s} {bench.description}")
+    return 0
 
-@benchmark
-def function_call():
-    print_bench(
-        "python function call",
-        timeit.timeit(setup="import math; f=math.sin", stmt="f(5.0)"),
-    )
-    setup = textwrap.dedent(
-        """\
-    import objc
-    objc.loadBundleFunctions(None, globals(), [("sin", b"dd")])
-    f = sin
-    """
-    )
-    print_bench(
-        "objc function call",
-        timeit.timeit(setup=setup, stmt="f(5.0)"),
-    )
+
+#
+# Comparing results
+#
 
 
-@benchmark
-def call_from_objc():
-    # XXX: This needs a helper module, there's unnecessary
-    #      overhead in statement under test.
-    setup = textwrap.dedent(
-        """\
-    import objc
-    NSObject = objc.lookUpClass("NSObject")
-    NSArray = objc.lookUpClass("NSArray")
-    class CallFromObjC1(NSObject):
-        __slots__ = ("count",)
+def load_results(path):
+    with open(path) as fp:
+        data = json.load(fp)
 
-        def init(self):
-            self = super().init()
-            self.count = 0
-            return self
+    if data.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported results format")
 
-        def aSelector(self):
-            self.count += 1
+    return data
 
 
-    o = CallFromObjC1.new()
-    a = NSArray.arrayWithArray_([o]*10)
+def compare(base, other, *, threshold, alpha):
     """
+    Compare two result sets, returns a list of
+    (name, base median, other median, relative change, p-value, verdict)
+    for benchmarks that are present in both.
+    """
+    result = []
+    for name in sorted(base["benchmarks"]):
+        if name not in other["benchmarks"]:
+            continue
+
+        b = base["benchmarks"][name]
+        o = other["benchmarks"][name]
+        change = (o["median"] - b["median"]) / b["median"]
+        p = mann_whitney_u(b["samples"], o["samples"])
+
+        if p < alpha and change > threshold:
+            verdict = "slower"
+        elif p < alpha and change < -threshold:
+            verdict = "faster"
+        else:
+            verdict = ""
+
+        result.append((name, b["median"], o["median"], change, p, verdict))
+
+    return result
+
+
+def cmd_compare(args):
+    base = load_results(args.baseline)
+    regressions = 0
+
+    for path in args.results:
+        other = load_results(path)
+        print(
+            f"{args.baseline} (objc {base['environment']['objc']}) -> "
+            f"{path} (objc {other['environment']['objc']})"
+        )
+
+        fmt = "{:45s} {:>10s} {:>10s} {:>8s} {:>7s}  {}"
+        print(fmt.format("benchmark", "baseline", "result", "change", "p", ""))
+        print("-" * 92)
+        for name, b, o, change, p, verdict in compare(
+            base, other, threshold=args.threshold / 100, alpha=args.alpha
+        ):
+            print(
+                fmt.format(
+                    name,
+                    _fmt_time(b),
+                    _fmt_time(o),
+                    f"{change * 100:+.1f}%",
+                    f"{p:.3f}",
+                    verdict,
+                )
+            )
+            if verdict == "slower":
+                regressions += 1
+
+        missing = set(base["benchmarks"]) ^ set(other["benchmarks"])
+        if missing:
+            print(f"Not in both results: {', '.join(sorted(missing))}")
+        print()
+
+    if regressions:
+        print(f"{regressions} significant regression(s)")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PyObjC benchmark suite")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    p = subparsers.add_parser("run", help="Run benchmarks")
+    p.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Only run benchmarks matching the glob pattern",
     )
-
-    print_bench(
-        "call no-args from objc",
-        timeit.timeit(setup=setup, stmt="a.makeObjectsPerformSelector_(b'aSelector')"),
+    p.add_argument(
+        "--pure",
+        action="store_true",
+        help="Only run benchmarks that don't need the Objective-C runtime",
     )
-
-
-# @benchmark
-def hasattr_speed():
-    print()
-    print_bench(
-        "hasattr object is True",
-        timeit.timeit(setup="o = object()", stmt="hasattr(o, '__repr__')"),
+    p.add_argument(
+        "--module",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Load benchmarks from an additional module",
     )
-    print_bench(
-        "hasattr NSObject is True",
-        timeit.timeit(
-            setup='import objc; NSObject = objc.lookUpClass("NSObject"); '
-            "o = NSObject.alloc().init()",
-            stmt="hasattr(o, 'description')",
-        ),
+    p.add_argument("--warmup", type=int, default=3, help="Warmup runs (default: 3)")
+    p.add_argument(
+        "--repeat", type=int, default=10, help="Timed repetitions (default: 10)"
     )
-    print_bench(
-        "hasattr NSArray is True",
-        timeit.timeit(
-            setup='import objc; NSArray = objc.lookUpClass("NSArray"); '
-            "o = NSArray.alloc().init()",
-            stmt="hasattr(o, 'description')",
-        ),
+    p.add_argument(
+        "--min-time",
+        type=float,
+        default=0.1,
+        help="Minimal duration of a repetition in seconds (default: 0.1)",
     )
-    print()
-    print_bench(
-        "hasattr object is False",
-        timeit.timeit(setup="o = object()", stmt="hasattr(o, 'attribute')"),
+    p.add_argument("-o", "--output", help="Write results as JSON to this file")
+    p.add_argument(
+        "--record",
+        action="store_true",
+        help="Write results to the results directory next to this script",
     )
-    print_bench(
-        "hasattr NSObject is False",
-        timeit.timeit(
-            setup='import objc; NSObject = objc.lookUpClass("NSObject"); '
-            "o = NSObject.alloc().init()",
-            stmt="hasattr(o, 'invalidselector')",
-        ),
+    p.set_defaults(function=cmd_run)
+
+    p = subparsers.add_parser("list", help="List benchmarks")
+    p.add_argument("--filter", action="append", default=[], metavar="PATTERN")
+    p.add_argument("--pure", action="store_true")
+    p.set_defaults(function=cmd_list)
+
+    p = subparsers.add_parser(
+        "compare", help="Compare results, exits with status 1 for regressions"
     )
-    print_bench(
-        "hasattr NSArray is False",
-        timeit.timeit(
-            setup='import objc; NSArray = objc.lookUpClass("NSArray"); '
-            "o = NSArray.alloc().init()",
-            stmt="hasattr(o, 'invalidselector')",
-        ),
+    p.add_argument("baseline")
+    p.add_argument("results", nargs="+")
+    p.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="Minimal slowdown in percent to report a regression (default: 5)",
     )
-    print()
+    p.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Significance level (default: 0.05)",
+    )
+    p.set_defaults(function=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.function(args)
 
 
-print_header("python", ".".join(str(x) for x in sys.version_info[:3]))
-print_header("objc", objc.__version__)
-print()
-for func in BENCHMARKS:
-    func()
+if __name__ == "__main__":
+    sys.exit(main())
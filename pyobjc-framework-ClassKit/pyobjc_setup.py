@@ -52,6 +52,42 @@ class oc_build_py(build_py.build_py):
         finally:
             self.packages = p
 
+    def run(self):
+        build_py.build_py.run(self)
+        self.compile_metadata()
+
+    def compile_metadata(self):
+        # Precompiled metadata files contain Python bytecode, and
+        # are therefore created while building for a specific
+        # Python version.
+        try:
+            from objc._metadatafile import compileMetadataFile
+        except ImportError:
+            log.info("pyobjc-core not available, not precompiling metadata")
+            return
+
+        for fn in self.get_outputs(include_bytecode=0):
+            if os.path.basename(fn) != "_metadata.py":
+                continue
+
+            # Only packages that load their metadata using
+            # objc._metadatafile.metadataForModule use the precompiled file.
+            init = os.path.join(os.path.dirname(fn), "__init__.py")
+            try:
+                with open(init) as fp:
+                    if "metadataForModule" not in fp.read():
+                        continue
+            except OSError:
+                continue
+
+            log.info("precompiling metadata %s", fn)
+            try:
+                compileMetadataFile(fn)
+            except Exception as exc:
+                # The "_metadata" module is used when there is
+                # no precompiled file.
+                log.warn("cannot precompile metadata %s: %s", fn, exc)
+
 
 REPO_NAME = "pyobjc"
 
@@ -9,7 +9,6 @@ import sys
 # Manually written wrappers:
 import Foundation
 import objc
-from AppKit import _metadata
 from AppKit._inlines import _inline_list_
 
 
@@ -50,7 +49,7 @@ sys.modules["AppKit"] = mod = objc.ObjCLazyModule(
     "AppKit",
     "com.apple.AppKit",
     objc.pathForFramework("/System/Library/Frameworks/AppKit.framework"),
-    _metadata.__dict__,
+    objc._metadatafile.metadataForModule("AppKit._metadata"),
     _inline_list_,
     {
         "__doc__": __doc__,
@@ -184,4 +183,4 @@ mod.NSRightTextAlignment = mod.NSTextAlignmentRight
 mod.NSCenterTextAlignment = mod.NSTextAlignmentCenter
 
 
-del sys.modules["AppKit._metadata"]
+sys.modules.pop("AppKit._metadata", None)
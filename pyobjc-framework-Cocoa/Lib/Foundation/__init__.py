@@ -9,19 +9,18 @@ import sys
 import CoreFoundation
 import Foundation._Foundation
 import objc
-from Foundation import _metadata
 from Foundation._inlines import _inline_list_
 
-objc.addConvenienceForClass(
-    "NSAttributedString", (("__len__", lambda self: self.length()),)
-)
 
-objc.addConvenienceForBasicMapping("NSMergeConflict", True)
-objc.addConvenienceForBasicMapping("NSUbiquitousKeyValueStore", False)
-objc.addConvenienceForBasicMapping("NSUserDefaults", False)
+def _setup_conveniences():
+    objc.addConvenienceForClass(
+        "NSAttributedString", (("__len__", lambda self: self.length()),)
+    )
 
+    objc.addConvenienceForBasicMapping("NSMergeConflict", True)
+    objc.addConvenienceForBasicMapping("NSUbiquitousKeyValueStore", False)
+    objc.addConvenienceForBasicMapping("NSUserDefaults", False)
 
-def _setup_conveniences():
     NSNull = objc.lookUpClass("NSNull")
 
     def nscache_getitem(self, key):
@@ -163,13 +162,14 @@ def _setup_conveniences():
     )
 
 
-_setup_conveniences()
+with objc.batchConveniences():
+    _setup_conveniences()
 
 sys.modules["Foundation"] = mod = objc.ObjCLazyModule(
     "Foundation",
     "com.apple.Foundation",
     objc.pathForFramework("/System/Library/Frameworks/Foundation.framework"),
-    _metadata.__dict__,
+    objc._metadatafile.metadataForModule("Foundation._metadata"),
     _inline_list_,
     {
         "__doc__": __doc__,
@@ -183,7 +183,7 @@ sys.modules["Foundation"] = mod = objc.ObjCLazyModule(
 )
 
 
-del sys.modules["Foundation._metadata"]
+sys.modules.pop("Foundation._metadata", None)
 
 
 for nm in dir(Foundation._Foundation):
@@ -7,6 +7,8 @@ Exported functions:
 * endSheetMethod - set correct signature for NSSheet callbacks
 * callAfter - call a function on the main thread (async)
 * callLater - call a function on the main thread after a delay (async)
+* callAfterCoalesced - callAfter, replacing pending calls with the same key
+* callLaterCoalesced - callLater, replacing pending calls with the same key
 """
 
 __all__ = (
@@ -16,10 +18,18 @@ __all__ = (
     "endSheetMethod",
     "callAfter",
     "callLater",
+    "callAfterCoalesced",
+    "callLaterCoalesced",
+    "CallQueue",
 )
 
+import collections
+import heapq
+import itertools
 import os
 import sys
+import threading
+import time
 import traceback
 
 import objc
@@ -30,7 +40,6 @@ from AppKit import (
     NSRunAlertPanel,
 )
 from Foundation import (
-    NSAutoreleasePool,
     NSDate,
     NSDefaultRunLoopMode,
     NSLog,
@@ -105,26 +114,244 @@ class PyObjCMessageRunner(NSObject):
         func(*args, **kwargs)
 
 
+class _Call:
+    __slots__ = ("func", "args", "kwargs", "key", "cancelled", "timed")
+
+    def __init__(self, func, args, kwargs, key):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.cancelled = False
+
+        # True while the call is in the timer heap
+        self.timed = False
+
+
+class CallQueue:
+    """
+    Thread-safe queue of calls that should be performed on the main thread.
+
+    This class only does the bookkeeping, the owner of the queue must
+    arrange for :meth:`run` to be called on the main thread when :meth:`add`
+    returns true and when the delay returned by :meth:`run` has expired.
+    *clock* returns the current time in seconds.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        self._timers = []
+        self._sequence = itertools.count()
+        self._keys = {}
+
+        # Number of cancelled calls in self._timers
+        self._cancelledTimers = 0
+
+        # True when the owner has been asked to call run()
+        self._wakeup = False
+
+        # Time at which the owner will call run() for the first timer
+        self._deadline = None
+
+    def add(self, func, args=(), kwargs=None, delay=None, key=None):
+        """
+        Add a call to *func*, to be performed after *delay* seconds or
+        as soon as possible when *delay* is None. When *key* is not None
+        a pending call that was added with the same key is cancelled.
+
+        Returns True when the owner of the queue should arrange for
+        :meth:`run` to be called.
+        """
+        call = _Call(func, args, kwargs if kwargs is not None else {}, key)
+        with self._lock:
+            if key is not None:
+                previous = self._keys.get(key)
+                if previous is not None:
+                    previous.cancelled = True
+                    if previous.timed:
+                        self._cancelledTimers += 1
+                self._keys[key] = call
+
+            if delay is None or delay <= 0:
+                self._pending.append(call)
+                needs_wakeup = True
+            else:
+                when = self._clock() + delay
+                call.timed = True
+                heapq.heappush(self._timers, (when, next(self._sequence), call))
+                needs_wakeup = self._deadline is None or when < self._deadline
+
+            if self._cancelledTimers:
+                self._discardCancelledTimers()
+
+            if not needs_wakeup or self._wakeup:
+                return False
+            self._wakeup = True
+            return True
+
+    def run(self):
+        """
+        Perform all calls that are due, in the order they were added
+        and followed by timed calls in the order of their deadline.
+
+        Returns the delay in seconds until the next timed call, or None
+        when there are no timed calls. When a call raises an exception
+        the remaining calls stay in the queue and the exception is
+        propagated, :meth:`run` should be called again in that case.
+        """
+        with self._lock:
+            self._wakeup = False
+            batch = self._pending
+            self._pending = collections.deque()
+            if self._timers:
+                now = self._clock()
+                timers = self._timers
+                while timers and timers[0][0] <= now:
+                    call = heapq.heappop(timers)[2]
+                    call.timed = False
+                    if call.cancelled:
+                        self._cancelledTimers -= 1
+                    else:
+                        batch.append(call)
+
+            # Calls that are about to run can no longer be replaced
+            keys = self._keys
+            if keys:
+                for call in batch:
+                    if call.key is not None and keys.get(call.key) is call:
+                        del keys[call.key]
+
+        while batch:
+            call = batch.popleft()
+            if call.cancelled:
+                continue
+            try:
+                call.func(*call.args, **call.kwargs)
+            except BaseException:
+                with self._lock:
+                    # The remaining calls can be replaced again, unless
+                    # a call with the same key was added in the meantime.
+                    for call in batch:
+                        if call.key is None or call.cancelled:
+                            continue
+                        if call.key in keys:
+                            call.cancelled = True
+                        else:
+                            keys[call.key] = call
+                    self._pending.extendleft(reversed(batch))
+                    self._wakeup = True
+                raise
+
+        with self._lock:
+            if self._cancelledTimers:
+                self._discardCancelledTimers()
+            if not self._timers:
+                self._deadline = None
+                return None
+            self._deadline = self._timers[0][0]
+            return max(0.0, self._deadline - self._clock())
+
+    def _discardCancelledTimers(self):
+        # Must be called with the lock held. Removes cancelled calls at
+        # the start of the heap, and rebuilds the heap when most calls
+        # in it are cancelled.
+        timers = self._timers
+        if self._cancelledTimers * 2 > len(timers):
+            timers[:] = [entry for entry in timers if not entry[2].cancelled]
+            heapq.heapify(timers)
+            self._cancelledTimers = 0
+
+        else:
+            while timers and timers[0][2].cancelled:
+                heapq.heappop(timers)
+                self._cancelledTimers -= 1
+
+
+class PyObjCCallQueueDispatcher(NSObject):
+    """
+    Performs the calls in a `CallQueue` on the MainThread's `NSRunLoop`.
+    """
+
+    def initWithQueue_(self, queue):
+        """
+        Designated initializer.
+        """
+        self = super().init()
+        if not self:
+            return None
+
+        self._queue = queue
+
+        return self
+
+    def wakeup(self):
+        """
+        Posts a message to the Main thread to run the queue, can be
+        called on any thread.
+        """
+        with objc.autorelease_pool():
+            self.performSelectorOnMainThread_withObject_waitUntilDone_(
+                self.runQueue_, None, False
+            )
+
+    def runQueue_(self, ignored):
+        """
+        This is run once we're on the Main thread.
+        """
+        assert NSThread.isMainThread(), "Call is not executing on the Main thread!"
+
+        try:
+            delay = self._queue.run()
+        except BaseException:
+            # The calls after the one that failed are still queued.
+            self.performSelector_withObject_afterDelay_(self.runQueue_, None, 0.0)
+            raise
+
+        NSObject.cancelPreviousPerformRequestsWithTarget_selector_object_(
+            self, "runQueue:", None
+        )
+        if delay is not None:
+            self.performSelector_withObject_afterDelay_(self.runQueue_, None, delay)
+
+
+_callQueue = CallQueue()
+_dispatcher = PyObjCCallQueueDispatcher.alloc().initWithQueue_(_callQueue)
+
+
 def callAfter(func, *args, **kwargs):
     """
     Call a function on the Main thread (async).
     """
-    pool = NSAutoreleasePool.alloc().init()
-    runner = PyObjCMessageRunner.alloc().initWithPayload_((func, args, kwargs))
-    runner.callAfter()
-    del runner
-    del pool
+    if _callQueue.add(func, args, kwargs):
+        _dispatcher.wakeup()
 
 
 def callLater(delay, func, *args, **kwargs):
     """
     Call a function on the Main thread after a delay (async).
     """
-    pool = NSAutoreleasePool.alloc().init()
-    runner = PyObjCMessageRunner.alloc().initWithPayload_((func, args, kwargs))
-    runner.callLater_(delay)
-    del runner
-    del pool
+    if _callQueue.add(func, args, kwargs, delay):
+        _dispatcher.wakeup()
+
+
+def callAfterCoalesced(key, func, *args, **kwargs):
+    """
+    Call a function on the Main thread (async), cancelling a pending
+    call with the same key.
+    """
+    if _callQueue.add(func, args, kwargs, key=key):
+        _dispatcher.wakeup()
+
+
+def callLaterCoalesced(delay, key, func, *args, **kwargs):
+    """
+    Call a function on the Main thread after a delay (async), cancelling
+    a pending call with the same key.
+    """
+    if _callQueue.add(func, args, kwargs, delay, key):
+        _dispatcher.wakeup()
 
 
 class PyObjCAppHelperApplicationActivator(NSObject):
@@ -0,0 +1,324 @@
+"""
+An asyncio event loop that is driven by the CFRunLoop of the main thread.
+
+Exported classes:
+* RunLoopEventLoop - asyncio event loop that runs the CFRunLoop while waiting
+* RunLoopEventLoopPolicy - event loop policy that creates RunLoopEventLoops
+* RunLoopSelector - selector that delegates waiting to a run loop adapter
+* CFRunLoopAdapter - run loop adapter for the CFRunLoop of the current thread
+
+Usage::
+
+    asyncio.set_event_loop_policy(RunLoopEventLoopPolicy())
+    asyncio.run(main())
+
+The ready queue, timers and I/O bookkeeping are those of asyncio itself, the
+event loop only replaces the selector. The selector asks an adapter to wait
+for file descriptors, and :class:`CFRunLoopAdapter` does that by running the
+run loop (and dispatching AppKit events when there is an ``NSApplication``).
+That way UI callbacks and coroutines run on the same thread without polling.
+"""
+
+__all__ = (
+    "RunLoopEventLoop",
+    "RunLoopEventLoopPolicy",
+    "RunLoopSelector",
+    "CFRunLoopAdapter",
+)
+
+import asyncio
+import selectors
+
+import objc
+from AppKit import NSApp, NSEvent, NSEventMaskAny, NSEventTypeApplicationDefined
+from CoreFoundation import (
+    CFFileDescriptorCreate,
+    CFFileDescriptorCreateRunLoopSource,
+    CFFileDescriptorDisableCallBacks,
+    CFFileDescriptorEnableCallBacks,
+    CFFileDescriptorGetNativeDescriptor,
+    CFFileDescriptorInvalidate,
+    CFRunLoopAddSource,
+    CFRunLoopGetCurrent,
+    CFRunLoopRemoveSource,
+    CFRunLoopRunInMode,
+    CFRunLoopStop,
+    kCFFileDescriptorReadCallBack,
+    kCFFileDescriptorWriteCallBack,
+    kCFRunLoopCommonModes,
+    kCFRunLoopDefaultMode,
+)
+from Foundation import NSDate, NSDefaultRunLoopMode, NSZeroPoint
+
+# Subtype of the application defined event that is used to wake up
+# -[NSApplication nextEventMatchingMask:untilDate:inMode:dequeue:]
+_WAKEUP_SUBTYPE = 0x5059
+
+# Timeout for CFRunLoopRunInMode when there is no timeout
+_FOREVER = 1.0e10
+
+
+def _callBackTypes(events):
+    result = 0
+    if events & selectors.EVENT_READ:
+        result |= kCFFileDescriptorReadCallBack
+    if events & selectors.EVENT_WRITE:
+        result |= kCFFileDescriptorWriteCallBack
+    return result
+
+
+def _selectorEvents(callBackTypes):
+    result = 0
+    if callBackTypes & kCFFileDescriptorReadCallBack:
+        result |= selectors.EVENT_READ
+    if callBackTypes & kCFFileDescriptorWriteCallBack:
+        result |= selectors.EVENT_WRITE
+    return result
+
+
+def _fileDescriptorCallout(cffd, callBackTypes, adapter):
+    adapter._fileDescriptorReady(
+        CFFileDescriptorGetNativeDescriptor(cffd), _selectorEvents(callBackTypes)
+    )
+
+
+class CFRunLoopAdapter:
+    """
+    Run loop adapter that waits for file descriptors by running the
+    CFRunLoop of the thread that created the adapter in *mode*.
+
+    When there is a shared ``NSApplication`` the adapter fetches and
+    dispatches AppKit events instead of running the run loop directly.
+    """
+
+    def __init__(self, mode=kCFRunLoopDefaultMode):
+        self._mode = mode
+        self._runLoop = CFRunLoopGetCurrent()
+        self._descriptors = {}
+        self._ready = {}
+        self._reported = []
+        self._waiting = False
+        self._interrupted = False
+        self._launched = False
+
+    def register(self, fd, events):
+        cffd = CFFileDescriptorCreate(None, fd, False, _fileDescriptorCallout, self)
+        source = CFFileDescriptorCreateRunLoopSource(None, cffd, 0)
+        CFRunLoopAddSource(self._runLoop, source, kCFRunLoopCommonModes)
+        CFFileDescriptorEnableCallBacks(cffd, _callBackTypes(events))
+        self._descriptors[fd] = [cffd, source, events]
+
+    def modify(self, fd, events):
+        info = self._descriptors[fd]
+        CFFileDescriptorDisableCallBacks(info[0], _callBackTypes(info[2] & ~events))
+        CFFileDescriptorEnableCallBacks(info[0], _callBackTypes(events))
+        info[2] = events
+
+    def unregister(self, fd):
+        cffd, source, _ = self._descriptors.pop(fd)
+        self._ready.pop(fd, None)
+        CFRunLoopRemoveSource(self._runLoop, source, kCFRunLoopCommonModes)
+        CFFileDescriptorInvalidate(cffd)
+
+    def close(self):
+        for fd in list(self._descriptors):
+            self.unregister(fd)
+
+    def wait(self, timeout):
+        """
+        Run the run loop until a file descriptor is ready, :meth:`wakeup`
+        is called, a run loop source is handled or *timeout* seconds have
+        passed. Returns a list of (fd, events) pairs.
+        """
+        # Callbacks are disabled after they are called, reenable them
+        # for descriptors that were reported during the previous wait.
+        for fd in self._reported:
+            info = self._descriptors.get(fd)
+            if info is not None:
+                CFFileDescriptorEnableCallBacks(info[0], _callBackTypes(info[2]))
+
+        if self._ready:
+            # Descriptors became ready while a nested run loop was active
+            timeout = 0
+
+        self._waiting = True
+        self._interrupted = False
+        try:
+            with objc.autorelease_pool():
+                if NSApp() is not None:
+                    self._waitForEvent(timeout)
+                else:
+                    CFRunLoopRunInMode(
+                        self._mode, _FOREVER if timeout is None else timeout, True
+                    )
+        finally:
+            self._waiting = False
+
+        ready = self._ready
+        self._ready = {}
+        self._reported = list(ready)
+        return list(ready.items())
+
+    def _waitForEvent(self, timeout):
+        app = NSApp()
+        if not self._launched:
+            self._launched = True
+            if not app.isRunning():
+                app.finishLaunching()
+
+        if timeout is None:
+            until = NSDate.distantFuture()
+        else:
+            until = NSDate.dateWithTimeIntervalSinceNow_(timeout)
+
+        event = app.nextEventMatchingMask_untilDate_inMode_dequeue_(
+            NSEventMaskAny, until, NSDefaultRunLoopMode, True
+        )
+        if event is None:
+            return
+        if (
+            event.type() == NSEventTypeApplicationDefined
+            and event.subtype() == _WAKEUP_SUBTYPE
+        ):
+            return
+        app.sendEvent_(event)
+
+    def wakeup(self):
+        """
+        Make :meth:`wait` return as soon as possible, this is a no-op when
+        the adapter is not waiting.
+        """
+        if not self._waiting or self._interrupted:
+            return
+        self._interrupted = True
+
+        app = NSApp()
+        if app is not None:
+            event = NSEvent.otherEventWithType_location_modifierFlags_timestamp_windowNumber_context_subtype_data1_data2_(  # noqa: B950
+                NSEventTypeApplicationDefined,
+                NSZeroPoint,
+                0,
+                0.0,
+                0,
+                None,
+                _WAKEUP_SUBTYPE,
+                0,
+                0,
+            )
+            app.postEvent_atStart_(event, True)
+        else:
+            CFRunLoopStop(self._runLoop)
+
+    def _fileDescriptorReady(self, fd, events):
+        if fd not in self._descriptors:
+            return
+        self._ready[fd] = self._ready.get(fd, 0) | events
+        self.wakeup()
+
+
+class RunLoopSelector(selectors._BaseSelectorImpl):
+    """
+    Selector that delegates waiting for file descriptors to a run loop
+    adapter.
+
+    The adapter must implement ``register(fd, events)``,
+    ``modify(fd, events)``, ``unregister(fd)``, ``close()``, ``wakeup()``
+    and ``wait(timeout)``, where the latter returns a list of (fd, events)
+    pairs.
+    """
+
+    def __init__(self, adapter):
+        super().__init__()
+        self._adapter = adapter
+
+    def register(self, fileobj, events, data=None):
+        key = super().register(fileobj, events, data)
+        try:
+            self._adapter.register(key.fd, events)
+        except BaseException:
+            super().unregister(fileobj)
+            raise
+        return key
+
+    def unregister(self, fileobj):
+        key = super().unregister(fileobj)
+        self._adapter.unregister(key.fd)
+        return key
+
+    def modify(self, fileobj, events, data=None):
+        try:
+            key = self._fd_to_key[self._fileobj_lookup(fileobj)]
+        except KeyError:
+            raise KeyError(f"{fileobj!r} is not registered") from None
+
+        if not events or events & ~(selectors.EVENT_READ | selectors.EVENT_WRITE):
+            raise ValueError(f"Invalid events: {events!r}")
+
+        if events != key.events:
+            self._adapter.modify(key.fd, events)
+
+        key = key._replace(events=events, data=data)
+        self._fd_to_key[key.fd] = key
+        return key
+
+    def select(self, timeout=None):
+        if timeout is not None and timeout < 0:
+            timeout = 0
+
+        ready = []
+        fd_to_key = self._fd_to_key
+        for fd, events in self._adapter.wait(timeout):
+            key = fd_to_key.get(fd)
+            if key is None:
+                continue
+            events &= key.events
+            if events:
+                ready.append((key, events))
+        return ready
+
+    def wakeup(self):
+        self._adapter.wakeup()
+
+    def close(self):
+        super().close()
+        self._adapter.close()
+
+
+class RunLoopEventLoop(asyncio.SelectorEventLoop):
+    """
+    asyncio event loop that waits for events using a run loop adapter,
+    *adapter* defaults to a :class:`CFRunLoopAdapter` for the current
+    thread.
+    """
+
+    def __init__(self, adapter=None):
+        if adapter is None:
+            adapter = CFRunLoopAdapter()
+        self._runLoopSelector = RunLoopSelector(adapter)
+        super().__init__(self._runLoopSelector)
+
+    # Callbacks from the run loop (UI events, timers) run while the
+    # selector is waiting, make sure that work they schedule is picked
+    # up without waiting for the next I/O event.
+
+    # The keyword arguments are passed through because "context" was
+    # added in Python 3.7.
+
+    def call_soon(self, callback, *args, **kwargs):
+        handle = super().call_soon(callback, *args, **kwargs)
+        self._runLoopSelector.wakeup()
+        return handle
+
+    def call_at(self, when, callback, *args, **kwargs):
+        handle = super().call_at(when, callback, *args, **kwargs)
+        self._runLoopSelector.wakeup()
+        return handle
+
+
+class RunLoopEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    """
+    Event loop policy that creates :class:`RunLoopEventLoop` instances.
+    """
+
+    def new_event_loop(self):
+        return RunLoopEventLoop()
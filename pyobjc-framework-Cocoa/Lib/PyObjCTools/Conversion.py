@@ -9,6 +9,8 @@ collections.
 __all__ = [
     "pythonCollectionFromPropertyList",
     "propertyListFromPythonCollection",
+    "iterPythonCollectionFromPropertyList",
+    "iterPropertyListFromPythonCollection",
     "serializePropertyList",
     "deserializePropertyList",
     "toPythonDecimal",
@@ -17,7 +19,10 @@ __all__ = [
 
 import datetime
 import decimal
+import functools
+import plistlib
 import time
+import xml.parsers.expat
 
 import Foundation
 import objc
@@ -68,8 +73,24 @@ FORMATS = {
     "ascii": Foundation.NSPropertyListOpenStepFormat,
 }
 
+# Formats supported by the "python" backend, plistlib cannot
+# read or write the old-style ASCII format.
+PYTHON_FORMATS = {
+    "xml": plistlib.FMT_XML,
+    "binary": plistlib.FMT_BINARY,
+}
+
+BACKENDS = ("foundation", "python")
+
+
+def _check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid backend: {backend}")
 
-def serializePropertyList(aPropertyList, format="xml"):  # noqa: A002
+
+def serializePropertyList(
+    aPropertyList, format="xml", backend="foundation"  # noqa: A002
+):
     """
     Serialize a property list to an NSData object.  Format is one of the
     following strings:
@@ -89,7 +110,20 @@ def serializePropertyList(aPropertyList, format="xml"):  # noqa: A002
     bridged so it will fail in that case.  If you expect to have these
     objects in your property list, then use propertyListFromPythonCollection
     before serializing it.
+
+    With backend "python" the property list must consist of Python
+    objects that are supported by plistlib, which is used to serialize
+    the value to bytes without converting it to Objective-C objects first.
+    This backend does not support the ascii format.
     """
+    _check_backend(backend)
+    if backend == "python":
+        try:
+            fmt = PYTHON_FORMATS[format]
+        except KeyError:
+            raise ValueError(f"Invalid format: {format}")
+        return plistlib.dumps(aPropertyList, fmt=fmt)
+
     try:
         formatOption = FORMATS[format]
     except KeyError:
@@ -105,14 +139,24 @@ def serializePropertyList(aPropertyList, format="xml"):  # noqa: A002
     return data
 
 
-def deserializePropertyList(propertyListData):
+def deserializePropertyList(propertyListData, backend="foundation"):
     """
     Deserialize a property list from a NSData, str or bytes object
 
-    Returns an Objective-C property list.
+    Returns an Objective-C property list, or a property list
+    consisting of Python objects when backend is "python". The
+    latter uses plistlib and supports the xml and binary formats.
     """
+    _check_backend(backend)
     if isinstance(propertyListData, str):
         propertyListData = propertyListData.encode("utf-8")
+
+    if backend == "python":
+        try:
+            return plistlib.loads(propertyListData)
+        except xml.parsers.expat.ExpatError as exc:
+            raise ValueError(str(exc)) from None
+
     (
         plist,
         fmt,
@@ -125,7 +169,228 @@ def deserializePropertyList(propertyListData):
     return plist
 
 
-def propertyListFromPythonCollection(aPyCollection, conversionHelper=None):
+# Kinds of values for the conversion functions below, the
+# first three are containers that are converted item by item.
+_DICT = 1
+_LIST = 2
+_SET = 3
+_VALUE = 4
+_STR = 5
+_INT = 6
+_FLOAT = 7
+_DATA = 8
+_DATE = 9
+_DECIMAL = 10
+_NULL = 11
+_OTHER = 12
+
+
+class _Frame:
+    """
+    A container that is being converted by _convert.
+    """
+
+    __slots__ = (
+        "items",
+        "result",
+        "buffer",
+        "add",
+        "finish",
+        "parent",
+        "key",
+        "ident",
+    )
+
+    def __init__(self, start, value, kind, parent, key):
+        (self.result, self.buffer, self.items, self.add, self.finish) = start(
+            value, kind
+        )
+        self.parent = parent
+        self.key = key
+        self.ident = id(value)
+
+
+def _convert(value, kinds, classify, start, leaves, preserveIdentity):
+    """
+    Convert *value* using an explicit stack of containers instead of
+    recursion.
+
+    *kinds* is a mapping from type to the kind of value, *classify* calculates
+    the kind for other types. *start* returns the result for a container,
+    a buffer for the converted items, an iterator of (key, item) pairs, a
+    function for adding a converted item to the buffer and a function
+    that moves the buffer into the result (or None). *leaves* contains the
+    conversion function for other values, indexed by kind.
+
+    When *preserveIdentity* is true containers that occur multiple times
+    are converted once and the results share the converted container,
+    otherwise every occurrence is converted separately and ValueError
+    is raised for a container that contains itself.
+    """
+    tp = type(value)
+    kind = kinds.get(tp) or classify(tp)
+    if kind > _SET:
+        return leaves[kind](value)
+
+    # Maps the id of a container to the container and its conversion
+    # result. Without *preserveIdentity* this only contains the containers
+    # that are being converted.
+    memo = {}
+
+    frame = _Frame(start, value, kind, None, None)
+    memo[id(value)] = (value, frame.result)
+
+    while True:
+        add = frame.add
+        for key, item in frame.items:
+            tp = type(item)
+            kind = kinds.get(tp) or classify(tp)
+            if kind == _VALUE:
+                add(key, item)
+                continue
+
+            elif kind > _SET:
+                add(key, leaves[kind](item))
+                continue
+
+            seen = memo.get(id(item))
+            if seen is not None:
+                if not preserveIdentity:
+                    raise ValueError("Cannot convert a container that contains itself")
+                add(key, seen[1])
+                continue
+
+            frame = _Frame(start, item, kind, frame, key)
+            memo[id(item)] = (item, frame.result)
+            break
+
+        else:
+            # All items are converted, add them to the container in one
+            # go and add the container to its parent.
+            if frame.finish is not None:
+                frame.finish(frame.result, frame.buffer)
+
+            if not preserveIdentity:
+                del memo[frame.ident]
+
+            parent = frame.parent
+            if parent is None:
+                return frame.result
+            parent.add(frame.key, frame.result)
+            frame = parent
+
+
+def _leaves(table, conversionHelper, message):
+    """
+    Return the conversion functions for leaf values, *table* contains
+    the functions that don't depend on *conversionHelper*.
+    """
+
+    def other(value):
+        if conversionHelper is not None:
+            return conversionHelper(value)
+        raise TypeError(message % type(value))
+
+    result = [other] * (_OTHER + 1)
+    for kind, function in table.items():
+        result[kind] = function(other) if kind == _NULL else function
+    return result
+
+
+_PYTHON_KINDS = {
+    dict: _DICT,
+    list: _LIST,
+    tuple: _LIST,
+    set: _SET,
+    frozenset: _SET,
+    datetime.date: _DATE,
+    datetime.datetime: _DATE,
+    decimal.Decimal: _DECIMAL,
+    str: _VALUE,
+    bool: _VALUE,
+    int: _VALUE,
+    float: _VALUE,
+    type(None): _VALUE,
+    bytes: _VALUE,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _python_kind(tp):
+    if issubclass(tp, dict):
+        return _DICT
+    elif issubclass(tp, (list, tuple)):
+        return _LIST
+    elif issubclass(tp, (datetime.datetime, datetime.date)):
+        return _DATE
+    elif issubclass(tp, (set, frozenset)):
+        return _SET
+    elif issubclass(tp, decimal.Decimal):
+        return _DECIMAL
+    elif issubclass(tp, PYTHON_TYPES):
+        return _VALUE
+    return _OTHER
+
+
+def _python_check_keys(value):
+    for key in value:
+        if not isinstance(key, str):
+            raise TypeError("Property list keys must be strings")
+
+
+def _python_finish_dict(result, buffer):
+    result.addEntriesFromDictionary_(buffer)
+
+
+def _python_finish_sequence(result, buffer):
+    result.addObjectsFromArray_(buffer)
+
+
+def _python_start(value, kind):
+    # Converted items are collected in a Python container and are added
+    # to the Foundation container with a single call when all items
+    # are converted.
+    if kind == _DICT:
+        _python_check_keys(value)
+        buffer = {}
+        return (
+            Foundation.NSMutableDictionary.dictionary(),
+            buffer,
+            iter(value.items())
+            if type(value) is dict
+            else ((k, value[k]) for k in value),
+            buffer.__setitem__,
+            _python_finish_dict,
+        )
+
+    buffer = [None] * len(value)
+    return (
+        Foundation.NSMutableArray.array()
+        if kind == _LIST
+        else Foundation.NSMutableSet.set(),
+        buffer,
+        enumerate(value),
+        buffer.__setitem__,
+        _python_finish_sequence,
+    )
+
+
+def _python_date(value):
+    return Foundation.NSDate.dateWithTimeIntervalSince1970_(
+        time.mktime(value.timetuple())
+    )
+
+
+_PYTHON_LEAVES = {
+    _VALUE: lambda value: value,  # bridge will convert
+    _DATE: _python_date,
+    _DECIMAL: fromPythonDecimal,
+}
+
+
+def propertyListFromPythonCollection(
+    aPyCollection, conversionHelper=None, preserveIdentity=False
+):
     """
     Convert a Python collection (dict, list, tuple, string) into an
     Objective-C collection.
@@ -136,52 +401,166 @@ def propertyListFromPythonCollection(aPyCollection, conversionHelper=None):
     should convert the object and return the converted form.  If the conversion
     helper cannot convert the type, it should raise an exception or return
     None.
+
+    There is no limit on the nesting depth. By default every occurrence
+    of a container is converted separately, and ValueError is raised when
+    a container contains itself. When preserveIdentity is true, containers
+    that occur multiple times are converted once and the result contains
+    the same mutable Foundation container in all those places, and
+    containers that contain themselves result in a Foundation container
+    that contains itself.
     """
-    if isinstance(aPyCollection, dict):
-        collection = Foundation.NSMutableDictionary.dictionary()
-        for aKey in aPyCollection:
-            if not isinstance(aKey, str):
-                raise TypeError("Property list keys must be strings")
-            convertedValue = propertyListFromPythonCollection(
-                aPyCollection[aKey], conversionHelper=conversionHelper
+    return _convert(
+        aPyCollection,
+        _PYTHON_KINDS,
+        _python_kind,
+        _python_start,
+        _leaves(
+            _PYTHON_LEAVES,
+            conversionHelper,
+            "Type '%s' encountered in Python collection; don't know how to convert.",
+        ),
+        preserveIdentity,
+    )
+
+
+def iterPropertyListFromPythonCollection(
+    aPyCollection, conversionHelper=None, preserveIdentity=False
+):
+    """
+    Like propertyListFromPythonCollection(), but yields the converted
+    items of a Python collection one by one instead of converting the
+    entire collection at once: (key, value) tuples for a dict and values
+    for other collections.
+
+    With preserveIdentity shared containers are only converted once
+    within a single item.
+    """
+    kind = _PYTHON_KINDS.get(type(aPyCollection)) or _python_kind(type(aPyCollection))
+    if kind > _SET:
+        raise TypeError(
+            f"Expecting a collection, got instance of {type(aPyCollection)}"
+        )
+
+    if kind == _DICT:
+        _python_check_keys(aPyCollection)
+        for key in aPyCollection:
+            yield key, propertyListFromPythonCollection(
+                aPyCollection[key], conversionHelper, preserveIdentity
             )
-            collection[aKey] = convertedValue
-        return collection
-    elif isinstance(aPyCollection, (list, tuple)):
-        collection = Foundation.NSMutableArray.array()
-        for aValue in aPyCollection:
-            convertedValue = propertyListFromPythonCollection(
-                aValue, conversionHelper=conversionHelper
+
+    else:
+        for item in aPyCollection:
+            yield propertyListFromPythonCollection(
+                item, conversionHelper, preserveIdentity
             )
-            collection.append(convertedValue)
-        return collection
-    elif isinstance(aPyCollection, (datetime.datetime, datetime.date)):
-        return Foundation.NSDate.dateWithTimeIntervalSince1970_(
-            time.mktime(aPyCollection.timetuple())
+
+
+_NSNull = Foundation.NSNull.null()
+
+_OBJC_KINDS = {
+    objc.pyobjc_unicode: _STR,
+    OC_PythonLong: _INT,
+    OC_PythonFloat: _FLOAT,
+    str: _VALUE,
+    bool: _VALUE,
+    int: _VALUE,
+    float: _VALUE,
+    type(None): _VALUE,
+    bytes: _VALUE,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _objc_kind(tp):
+    if issubclass(tp, Foundation.NSDictionary):
+        return _DICT
+    elif issubclass(tp, Foundation.NSArray):
+        return _LIST
+    elif issubclass(tp, Foundation.NSSet):
+        return _SET
+    elif issubclass(tp, Foundation.NSData):
+        return _DATA
+    elif issubclass(tp, Foundation.NSDate):
+        return _DATE
+    elif issubclass(tp, (objc.pyobjc_unicode, Foundation.NSString)):
+        return _STR
+    elif issubclass(tp, OC_PythonLong):
+        return _INT
+    elif issubclass(tp, OC_PythonFloat):
+        return _FLOAT
+    elif issubclass(tp, Foundation.NSDecimalNumber):
+        return _DECIMAL
+    elif issubclass(tp, Foundation.NSNull):
+        return _NULL
+    elif issubclass(tp, PYTHON_TYPES):
+        return _VALUE
+    return _OTHER
+
+
+def _objc_key(value):
+    # Keys are converted without a conversion helper
+    if type(value) is objc.pyobjc_unicode:
+        return str(value)
+    return pythonCollectionFromPropertyList(value)
+
+
+def _objc_finish_set(result, buffer):
+    result.update(tuple(item) if isinstance(item, list) else item for item in buffer)
+
+
+def _objc_start(value, kind):
+    if kind == _DICT:
+        result = {}
+        keys = value.allKeys()
+        return (
+            result,
+            result,
+            zip(
+                [_objc_key(k) for k in keys],
+                value.objectsForKeys_notFoundMarker_(keys, _NSNull),
+            ),
+            result.__setitem__,
+            None,
         )
-    elif isinstance(aPyCollection, (set, frozenset)):
-        collection = Foundation.NSMutableSet.set()
-        for aValue in aPyCollection:
-            convertedValue = propertyListFromPythonCollection(
-                aValue, conversionHelper=conversionHelper
-            )
-            collection.add(convertedValue)
-        return collection
-
-    elif isinstance(aPyCollection, decimal.Decimal):
-        return fromPythonDecimal(aPyCollection)
-    elif isinstance(aPyCollection, PYTHON_TYPES):
-        # bridge will convert
-        return aPyCollection
-    elif conversionHelper is not None:
-        return conversionHelper(aPyCollection)
-    raise TypeError(
-        "Type '%s' encountered in Python collection; don't know how to convert."
-        % type(aPyCollection)
-    )
 
+    elif kind == _LIST:
+        result = [None] * len(value)
+        return result, result, enumerate(value), result.__setitem__, None
+
+    else:
+        buffer = [None] * len(value)
+        return set(), buffer, enumerate(value), buffer.__setitem__, _objc_finish_set
+
+
+def _objc_date(value):
+    return datetime.datetime.fromtimestamp(value.timeIntervalSince1970())
+
+
+def _objc_null(other):
+    def null(value):
+        if value is _NSNull:
+            return None
+        return other(value)
+
+    return null
+
+
+_OBJC_LEAVES = {
+    _STR: str,
+    _INT: int,
+    _FLOAT: float,
+    _VALUE: lambda value: value,
+    _DATA: bytes,
+    _DATE: _objc_date,
+    _DECIMAL: toPythonDecimal,
+    _NULL: _objc_null,
+}
 
-def pythonCollectionFromPropertyList(aCollection, conversionHelper=None):
+
+def pythonCollectionFromPropertyList(
+    aCollection, conversionHelper=None, preserveIdentity=False
+):
     """
     Converts a Foundation based property list into a Python
     collection (all members will be instances or subclasses of standard Python
@@ -190,49 +569,55 @@ def pythonCollectionFromPropertyList(aCollection, conversionHelper=None):
     Like propertyListFromPythonCollection(), conversionHelper is an optional
     callable that will be invoked any time an encountered object cannot be
     converted.
+
+    By default every occurrence of a container is converted separately.
+    When preserveIdentity is true, containers that occur multiple times
+    are converted once and the result contains the same list or dict in
+    all those places. Note that Foundation can return the same instance
+    for equal immutable containers, such as empty arrays, those then
+    share the same Python container as well.
     """
-    if isinstance(aCollection, Foundation.NSDictionary):
-        pyCollection = {}
-        for k in aCollection:
-            convertedValue = pythonCollectionFromPropertyList(
-                aCollection[k], conversionHelper
+    return _convert(
+        aCollection,
+        _OBJC_KINDS,
+        _objc_kind,
+        _objc_start,
+        _leaves(
+            _OBJC_LEAVES,
+            conversionHelper or None,
+            "Type '%s' encountered in ObjC collection;  don't know how to convert.",
+        ),
+        preserveIdentity,
+    )
+
+
+def iterPythonCollectionFromPropertyList(
+    aCollection, conversionHelper=None, preserveIdentity=False
+):
+    """
+    Like pythonCollectionFromPropertyList(), but yields the converted
+    items of a Foundation collection one by one instead of converting
+    the entire collection at once: (key, value) tuples for a dictionary
+    and values for other collections.
+
+    With preserveIdentity shared containers are only converted once
+    within a single item.
+    """
+    kind = _OBJC_KINDS.get(type(aCollection)) or _objc_kind(type(aCollection))
+    if kind > _SET:
+        raise TypeError(f"Expecting a collection, got instance of {type(aCollection)}")
+
+    if kind == _DICT:
+        for key in aCollection:
+            yield _objc_key(key), pythonCollectionFromPropertyList(
+                aCollection[key], conversionHelper, preserveIdentity
             )
-            pyCollection[pythonCollectionFromPropertyList(k)] = convertedValue
-        return pyCollection
-    elif isinstance(aCollection, Foundation.NSArray):
-        return [
-            pythonCollectionFromPropertyList(item, conversionHelper)
-            for item in aCollection
-        ]
-
-    elif isinstance(aCollection, Foundation.NSSet):
-        value = set()
+
+    else:
         for item in aCollection:
-            item = pythonCollectionFromPropertyList(item, conversionHelper)
-            if isinstance(item, list):
+            item = pythonCollectionFromPropertyList(
+                item, conversionHelper, preserveIdentity
+            )
+            if kind == _SET and isinstance(item, list):
                 item = tuple(item)
-
-            value.add(item)
-        return value
-    elif isinstance(aCollection, Foundation.NSData):
-        return bytes(aCollection)
-    elif isinstance(aCollection, Foundation.NSDate):
-        return datetime.datetime.fromtimestamp(aCollection.timeIntervalSince1970())
-    elif isinstance(aCollection, (objc.pyobjc_unicode, Foundation.NSString)):
-        return str(aCollection)
-    elif isinstance(aCollection, OC_PythonLong):
-        return int(aCollection)
-    elif isinstance(aCollection, OC_PythonFloat):
-        return float(aCollection)
-    elif isinstance(aCollection, Foundation.NSDecimalNumber):
-        return toPythonDecimal(aCollection)
-    elif aCollection is Foundation.NSNull.null():
-        return None
-    elif isinstance(aCollection, PYTHON_TYPES):
-        return aCollection
-    elif conversionHelper:
-        return conversionHelper(aCollection)
-    raise TypeError(
-        "Type '%s' encountered in ObjC collection;  don't know how to convert."
-        % type(aCollection)
-    )
+            yield item
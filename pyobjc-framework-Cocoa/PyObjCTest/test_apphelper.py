@@ -1,15 +1,224 @@
-import Cocoa  # noqa: F401
+import threading
+
+import Cocoa
 import objc
 from PyObjCTools import AppHelper
 from PyObjCTools.TestSupport import TestCase
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def runUntil(predicate, timeout=2.0):
+    runLoop = Cocoa.NSRunLoop.currentRunLoop()
+    deadline = Cocoa.NSDate.dateWithTimeIntervalSinceNow_(timeout)
+    while not predicate() and deadline.timeIntervalSinceNow() > 0:
+        runLoop.runUntilDate_(Cocoa.NSDate.dateWithTimeIntervalSinceNow_(0.01))
+
+
+class TestCallQueue(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.queue = AppHelper.CallQueue(clock=self.clock)
+        self.calls = []
+
+    def record(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    def test_batch(self):
+        self.assertTrue(self.queue.add(self.record, (1,)))
+        self.assertFalse(self.queue.add(self.record, (2,), {"a": 3}))
+        self.assertFalse(self.queue.add(self.record))
+
+        self.assertIs(self.queue.run(), None)
+        self.assertEqual(self.calls, [((1,), {}), ((2,), {"a": 3}), ((), {})])
+
+        self.assertIs(self.queue.run(), None)
+        self.assertEqual(len(self.calls), 3)
+
+        # A new wakeup is needed after running the queue
+        self.assertTrue(self.queue.add(self.record, (4,)))
+
+    def test_add_while_running(self):
+        def func():
+            self.calls.append("func")
+            self.assertTrue(self.queue.add(self.record, (1,)))
+
+        self.queue.add(func)
+        self.queue.run()
+        self.assertEqual(self.calls, ["func"])
+
+        self.queue.run()
+        self.assertEqual(self.calls, ["func", ((1,), {})])
+
+    def test_timers(self):
+        self.assertTrue(self.queue.add(self.record, (1,), delay=2.0))
+        self.assertEqual(self.queue.run(), 2.0)
+        self.assertEqual(self.calls, [])
+
+        # Later than the next wakeup
+        self.assertFalse(self.queue.add(self.record, (2,), delay=3.0))
+        self.assertFalse(self.queue.add(self.record, (3,), delay=2.0))
+
+        # Earlier than the next wakeup
+        self.assertTrue(self.queue.add(self.record, (4,), delay=1.0))
+        self.assertEqual(self.queue.run(), 1.0)
+        self.assertEqual(self.calls, [])
+
+        self.clock.now = 1.5
+        self.assertEqual(self.queue.run(), 0.5)
+        self.assertEqual(self.calls, [((4,), {})])
+
+        self.clock.now = 5.0
+        self.queue.add(self.record, (5,))
+        self.assertIs(self.queue.run(), None)
+        self.assertEqual(
+            self.calls,
+            [((4,), {}), ((5,), {}), ((1,), {}), ((3,), {}), ((2,), {})],
+        )
+
+    def test_no_delay(self):
+        self.queue.add(self.record, (1,), delay=0)
+        self.queue.add(self.record, (2,), delay=-1)
+        self.assertIs(self.queue.run(), None)
+        self.assertEqual(self.calls, [((1,), {}), ((2,), {})])
+
+    def test_coalesce(self):
+        self.queue.add(self.record, (1,), key="a")
+        self.queue.add(self.record, (2,), key="b")
+        self.queue.add(self.record, (3,), key="a")
+        self.queue.add(self.record, (4,))
+        self.queue.add(self.record, (5,), key="a")
+        self.queue.run()
+        self.assertEqual(self.calls, [((2,), {}), ((4,), {}), ((5,), {})])
+
+        # Keys are forgotten once the call has run
+        self.calls = []
+        self.queue.add(self.record, (6,), key="a")
+        self.queue.run()
+        self.assertEqual(self.calls, [((6,), {})])
+
+    def test_coalesce_timers(self):
+        self.queue.add(self.record, (1,), delay=1.0, key="a")
+        self.queue.add(self.record, (2,), key="a")
+        self.queue.add(self.record, (3,), delay=2.0, key="b")
+        self.queue.run()
+        self.assertEqual(self.calls, [((2,), {})])
+
+        self.queue.add(self.record, (4,), delay=5.0, key="b")
+        self.clock.now = 3.0
+        self.assertEqual(self.queue.run(), 2.0)
+        self.assertEqual(self.calls, [((2,), {})])
+
+        self.clock.now = 5.0
+        self.assertIs(self.queue.run(), None)
+        self.assertEqual(self.calls, [((2,), {}), ((4,), {})])
+
+    def test_exception(self):
+        def fail():
+            raise RuntimeError("failed")
+
+        self.queue.add(self.record, (1,))
+        self.queue.add(fail)
+        self.queue.add(self.record, (2,))
+        self.queue.add(self.record, (3,), delay=1.0)
+
+        with self.assertRaisesRegex(RuntimeError, "failed"):
+            self.queue.run()
+        self.assertEqual(self.calls, [((1,), {})])
+
+        # A wakeup is still pending
+        self.assertFalse(self.queue.add(self.record, (4,)))
+
+        self.assertEqual(self.queue.run(), 1.0)
+        self.assertEqual(self.calls, [((1,), {}), ((2,), {}), ((4,), {})])
+
+    def test_coalesce_many_timers(self):
+        for i in range(10000):
+            self.queue.add(self.record, (i,), delay=10.0, key="a")
+        self.assertLessEqual(len(self.queue._timers), 2)
+
+        self.clock.now = 10.0
+        self.queue.run()
+        self.assertEqual(self.calls, [((9999,), {})])
+        self.assertEqual(self.queue._timers, [])
+
+    def test_exception_coalesce(self):
+        def fail():
+            raise RuntimeError("failed")
+
+        self.queue.add(fail)
+        self.queue.add(self.record, (1,), key="a")
+        with self.assertRaisesRegex(RuntimeError, "failed"):
+            self.queue.run()
+
+        # Calls that weren't performed can still be replaced
+        self.queue.add(self.record, (2,), key="a")
+        self.queue.run()
+        self.assertEqual(self.calls, [((2,), {})])
+
+        def add_and_fail():
+            self.queue.add(self.record, (4,), key="b")
+            raise RuntimeError("failed")
+
+        self.calls = []
+        self.queue.add(add_and_fail)
+        self.queue.add(self.record, (3,), key="b")
+        with self.assertRaisesRegex(RuntimeError, "failed"):
+            self.queue.run()
+
+        self.queue.run()
+        self.assertEqual(self.calls, [((4,), {})])
+
+
 class TestAppHelper(TestCase):
     def test_callAfter(self):
-        pass
+        calls = []
+
+        def worker():
+            for idx in range(100):
+                AppHelper.callAfter(calls.append, idx)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        runUntil(lambda: len(calls) == 100)
+        self.assertEqual(calls, list(range(100)))
 
     def test_callLater(self):
-        pass
+        calls = []
+
+        AppHelper.callLater(0.2, calls.append, 2)
+        AppHelper.callLater(0.1, calls.append, 1)
+        AppHelper.callAfter(calls.append, 0)
+
+        runUntil(lambda: len(calls) == 3)
+        self.assertEqual(calls, [0, 1, 2])
+
+    def test_callAfterCoalesced(self):
+        calls = []
+
+        for idx in range(10):
+            AppHelper.callAfterCoalesced("key", calls.append, idx)
+
+        runUntil(lambda: calls)
+        self.assertEqual(calls, [9])
+
+    def test_callLaterCoalesced(self):
+        calls = []
+
+        AppHelper.callLaterCoalesced(0.1, "key", calls.append, 1)
+        AppHelper.callLaterCoalesced(0.05, "key", calls.append, 2)
+        AppHelper.callLater(0.2, calls.append, 3)
+
+        runUntil(lambda: len(calls) == 2)
+        self.assertEqual(calls, [2, 3])
 
     def test_stopEventLoop(self):
         pass
@@ -0,0 +1,231 @@
+import asyncio
+import collections
+import selectors
+import socket
+import threading
+import time
+
+import Foundation
+from PyObjCTools.AsyncioEventLoop import (
+    CFRunLoopAdapter,
+    RunLoopEventLoop,
+    RunLoopEventLoopPolicy,
+    RunLoopSelector,
+)
+from PyObjCTools.TestSupport import TestCase
+
+try:
+    from test.test_asyncio import test_events
+    from test.test_asyncio import utils as test_utils
+except ImportError:
+    test_events = None
+
+
+class FakeRunLoopAdapter:
+    """
+    Run loop adapter that uses a regular selector, *sources* contains
+    callables that are called while waiting (like run loop sources).
+    """
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.sources = collections.deque()
+        self.waiting = False
+        self.woken = False
+
+    def register(self, fd, events):
+        self.selector.register(fd, events)
+
+    def modify(self, fd, events):
+        self.selector.modify(fd, events)
+
+    def unregister(self, fd):
+        self.selector.unregister(fd)
+
+    def close(self):
+        self.selector.close()
+
+    def wakeup(self):
+        if self.waiting:
+            self.woken = True
+
+    def wait(self, timeout):
+        self.waiting = True
+        self.woken = False
+        try:
+            while self.sources:
+                self.sources.popleft()()
+            if self.woken:
+                timeout = 0
+            return [(key.fd, events) for key, events in self.selector.select(timeout)]
+        finally:
+            self.waiting = False
+
+
+class TestRunLoopSelector(TestCase):
+    def setUp(self):
+        self.adapter = FakeRunLoopAdapter()
+        self.selector = RunLoopSelector(self.adapter)
+        self.sockets = socket.socketpair()
+
+    def tearDown(self):
+        self.selector.close()
+        for sock in self.sockets:
+            sock.close()
+
+    def test_register(self):
+        rd, wr = self.sockets
+        key = self.selector.register(rd, selectors.EVENT_READ, "data")
+        self.assertEqual(key.fd, rd.fileno())
+        self.assertEqual(
+            self.adapter.selector.get_key(rd.fileno()).events, selectors.EVENT_READ
+        )
+
+        self.assertEqual(self.selector.select(0), [])
+        wr.send(b"x")
+        self.assertEqual(self.selector.select(1.0), [(key, selectors.EVENT_READ)])
+
+        key = self.selector.modify(rd, selectors.EVENT_READ | selectors.EVENT_WRITE)
+        self.assertEqual(key.data, None)
+        self.assertEqual(
+            self.adapter.selector.get_key(rd.fileno()).events,
+            selectors.EVENT_READ | selectors.EVENT_WRITE,
+        )
+        self.assertEqual(
+            self.selector.select(1.0),
+            [(key, selectors.EVENT_READ | selectors.EVENT_WRITE)],
+        )
+
+        self.selector.unregister(rd)
+        with self.assertRaises(KeyError):
+            self.adapter.selector.get_key(rd.fileno())
+        self.assertEqual(self.selector.select(0), [])
+
+    def test_modify_errors(self):
+        rd, _ = self.sockets
+        with self.assertRaises(KeyError):
+            self.selector.modify(rd, selectors.EVENT_READ)
+
+        self.selector.register(rd, selectors.EVENT_READ)
+        with self.assertRaises(ValueError):
+            self.selector.modify(rd, 0)
+
+    def test_register_fails(self):
+        rd, _ = self.sockets
+        self.adapter.selector.register(rd, selectors.EVENT_READ)
+
+        with self.assertRaises(KeyError):
+            self.selector.register(rd, selectors.EVENT_READ)
+        self.assertEqual(len(self.selector.get_map()), 0)
+
+
+class TestRunLoopEventLoop(TestCase):
+    def setUp(self):
+        self.adapter = FakeRunLoopAdapter()
+        self.loop = RunLoopEventLoop(self.adapter)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_source_sets_result(self):
+        future = self.loop.create_future()
+        self.adapter.sources.append(lambda: future.set_result(42))
+        self.loop.call_later(10.0, future.cancel)
+
+        start = time.monotonic()
+        self.assertEqual(self.loop.run_until_complete(future), 42)
+        self.assertLess(time.monotonic() - start, 5.0)
+
+    def test_source_schedules_timer(self):
+        future = self.loop.create_future()
+        self.loop.call_later(10.0, future.cancel)
+        self.adapter.sources.append(
+            lambda: self.loop.call_later(0.01, future.set_result, 42)
+        )
+
+        start = time.monotonic()
+        self.assertEqual(self.loop.run_until_complete(future), 42)
+        self.assertLess(time.monotonic() - start, 5.0)
+
+    def test_policy(self):
+        loop = RunLoopEventLoopPolicy().new_event_loop()
+        try:
+            self.assertIsInstance(loop, RunLoopEventLoop)
+        finally:
+            loop.close()
+
+
+class TestCFRunLoopEventLoop(TestCase):
+    def setUp(self):
+        self.loop = RunLoopEventLoop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_default_adapter(self):
+        self.assertIsInstance(self.loop._runLoopSelector._adapter, CFRunLoopAdapter)
+
+    def test_sleep(self):
+        start = time.monotonic()
+        self.loop.run_until_complete(asyncio.sleep(0.1))
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_sockets(self):
+        async def main():
+            rd, wr = await asyncio.open_connection(sock=a)
+            rd2, wr2 = await asyncio.open_connection(sock=b)
+            wr.write(b"hello\n")
+            line = await rd2.readline()
+            wr.close()
+            wr2.close()
+            return line
+
+        a, b = socket.socketpair()
+        self.assertEqual(self.loop.run_until_complete(main()), b"hello\n")
+
+    def test_threadsafe(self):
+        future = self.loop.create_future()
+
+        def worker():
+            time.sleep(0.05)
+            self.loop.call_soon_threadsafe(future.set_result, 42)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertEqual(self.loop.run_until_complete(future), 42)
+        thread.join()
+
+    def test_run_loop_timer(self):
+        # A run loop timer that doesn't know about asyncio
+        future = self.loop.create_future()
+        self.loop.call_later(10.0, future.cancel)
+
+        timer = Foundation.NSTimer.timerWithTimeInterval_repeats_block_(
+            0.05, False, lambda timer: future.set_result(42)
+        )
+        Foundation.NSRunLoop.currentRunLoop().addTimer_forMode_(
+            timer, Foundation.NSDefaultRunLoopMode
+        )
+
+        start = time.monotonic()
+        self.assertEqual(self.loop.run_until_complete(future), 42)
+        self.assertLess(time.monotonic() - start, 5.0)
+
+
+if test_events is not None:
+
+    class TestFakeConformance(
+        test_events.UnixEventLoopTestsMixin,
+        test_events.SubprocessTestsMixin,
+        test_utils.TestCase,
+    ):
+        def create_event_loop(self):
+            return RunLoopEventLoop(FakeRunLoopAdapter())
+
+    class TestCFRunLoopConformance(
+        test_events.UnixEventLoopTestsMixin,
+        test_events.SubprocessTestsMixin,
+        test_utils.TestCase,
+    ):
+        def create_event_loop(self):
+            return RunLoopEventLoop()
@@ -65,6 +65,64 @@ class TestConversion(TestCase):
 
             self.assertRaises(ValueError, Conversion.deserializePropertyList, data[:-2])
 
+    def test_serializePropertyList_python(self):
+        value = {"a": [42, 1.5, "hello", b"bytes", True], "b": {"c": []}}
+
+        for fmt in ("xml", "binary"):
+            with self.subTest(fmt):
+                data = Conversion.serializePropertyList(value, fmt, backend="python")
+                self.assertIsInstance(data, bytes)
+
+                # The output is compatible with NSPropertyListSerialization
+                self.assertEqual(Conversion.deserializePropertyList(data), value)
+
+                data = Conversion.serializePropertyList(value, fmt)
+                out_val = Conversion.deserializePropertyList(data, backend="python")
+                self.assertIsInstance(out_val, dict)
+                self.assertIsInstance(out_val["b"], dict)
+                self.assertEqual(out_val, value)
+
+        self.assertRaises(
+            ValueError,
+            Conversion.serializePropertyList,
+            value,
+            "ascii",
+            backend="python",
+        )
+        self.assertRaises(
+            ValueError, Conversion.serializePropertyList, value, backend="invalid"
+        )
+        self.assertRaises(
+            TypeError, Conversion.serializePropertyList, [dir], backend="python"
+        )
+
+    def test_deserializePropertyList_python(self):
+        in_val = {"a": 42}
+
+        for fmt in ("xml", "binary"):
+            data = Conversion.serializePropertyList(in_val, fmt)
+
+            out_val = Conversion.deserializePropertyList(bytes(data), backend="python")
+            self.assertEqual(out_val, in_val)
+            self.assertNotIsInstance(next(iter(out_val.keys())), objc.pyobjc_unicode)
+
+            if fmt == "xml":
+                out_val = Conversion.deserializePropertyList(
+                    bytes(data).decode("utf-8"), backend="python"
+                )
+                self.assertEqual(out_val, in_val)
+
+            self.assertRaises(
+                ValueError,
+                Conversion.deserializePropertyList,
+                bytes(data)[:-2],
+                backend="python",
+            )
+
+        self.assertRaises(
+            ValueError, Conversion.deserializePropertyList, b"", backend="invalid"
+        )
+
     def test_propertyListFromPythonCollection(self):
         for value, result_type in (
             ({"a": 42}, Cocoa.NSDictionary),
@@ -235,3 +293,139 @@ class TestConversion(TestCase):
             self.assertIsInstance(v[2], set)
             self.assertIsInstance(next(iter(v[2])), tuple)
             self.assertEqual(next(iter(v[2])), (4, 5))
+
+    def test_deep_nesting(self):
+        value = []
+        for _ in range(10000):
+            value = [value]
+
+        v = Conversion.propertyListFromPythonCollection(value)
+        depth = 0
+        current = v
+        while len(current):
+            self.assertIsInstance(current, Cocoa.NSArray)
+            current = current[0]
+            depth += 1
+        self.assertEqual(depth, 10000)
+
+        v = Conversion.pythonCollectionFromPropertyList(v)
+        depth = 0
+        current = v
+        while current:
+            self.assertIsInstance(current, list)
+            current = current[0]
+            depth += 1
+        self.assertEqual(depth, 10000)
+
+    def test_shared_containers(self):
+        shared = [1, 2]
+        value = {"a": shared, "b": [shared, shared]}
+
+        # By default every occurrence is converted separately
+        v = Conversion.propertyListFromPythonCollection(value)
+        self.assertEqual(v, value)
+        self.assertIsNot(v["a"], v["b"][0])
+        self.assertIsNot(v["b"][0], v["b"][1])
+
+        p = Conversion.pythonCollectionFromPropertyList(v)
+        self.assertEqual(p, value)
+        self.assertIsNot(p["a"], p["b"][0])
+
+        v = Conversion.propertyListFromPythonCollection(value, preserveIdentity=True)
+        self.assertIs(v["a"], v["b"][0])
+        self.assertIs(v["a"], v["b"][1])
+
+        p = Conversion.pythonCollectionFromPropertyList(v)
+        self.assertEqual(p, value)
+        self.assertIsNot(p["a"], p["b"][0])
+
+        p = Conversion.pythonCollectionFromPropertyList(v, preserveIdentity=True)
+        self.assertEqual(p, value)
+        self.assertIs(p["a"], p["b"][0])
+
+        v = list(
+            Conversion.iterPropertyListFromPythonCollection(
+                [[shared, shared]], preserveIdentity=True
+            )
+        )
+        self.assertIs(v[0][0], v[0][1])
+
+    def test_recursive_containers(self):
+        value = [1]
+        value.append(value)
+
+        with self.assertRaisesRegex(ValueError, "contains itself"):
+            Conversion.propertyListFromPythonCollection(value)
+
+        v = Conversion.propertyListFromPythonCollection(value, preserveIdentity=True)
+        self.assertEqual(v[0], 1)
+        self.assertIs(v[1], v)
+
+        with self.assertRaisesRegex(ValueError, "contains itself"):
+            Conversion.pythonCollectionFromPropertyList(v)
+
+        p = Conversion.pythonCollectionFromPropertyList(v, preserveIdentity=True)
+        self.assertEqual(p[0], 1)
+        self.assertIs(p[1], p)
+
+        # Break the reference cycle
+        v.removeObjectAtIndex_(1)
+
+    def test_dict_subclass(self):
+        class MyDict(dict):
+            pass
+
+        value = MyDict(a=[1], b=MyDict(c=2))
+        v = Conversion.propertyListFromPythonCollection(value)
+        self.assertIsInstance(v, Cocoa.NSDictionary)
+        self.assertEqual(v, {"a": [1], "b": {"c": 2}})
+
+        with self.assertRaisesRegex(TypeError, "keys must be strings"):
+            Conversion.propertyListFromPythonCollection([MyDict({1: 2})])
+
+    def test_iterPropertyListFromPythonCollection(self):
+        v = list(Conversion.iterPropertyListFromPythonCollection([1, [2], {"a": 3}]))
+        self.assertEqual(v, [1, [2], {"a": 3}])
+        self.assertIsInstance(v[1], Cocoa.NSArray)
+        self.assertIsInstance(v[2], Cocoa.NSDictionary)
+
+        v = list(Conversion.iterPropertyListFromPythonCollection({"a": [1], "b": 2}))
+        self.assertEqual(v, [("a", [1]), ("b", 2)])
+        self.assertIsInstance(v[0][1], Cocoa.NSArray)
+
+        it = Conversion.iterPropertyListFromPythonCollection([[1], dir])
+        self.assertEqual(next(it), [1])
+        with self.assertRaises(TypeError):
+            next(it)
+
+        v = list(Conversion.iterPropertyListFromPythonCollection([dir], str))
+        self.assertEqual(v, [str(dir)])
+
+        with self.assertRaisesRegex(TypeError, "Expecting a collection"):
+            list(Conversion.iterPropertyListFromPythonCollection(42))
+
+    def test_iterPythonCollectionFromPropertyList(self):
+        value = Cocoa.NSArray.arrayWithArray_(
+            [1, Cocoa.NSArray.arrayWithArray_([2]), Cocoa.NSNull.null()]
+        )
+        v = list(Conversion.iterPythonCollectionFromPropertyList(value))
+        self.assertEqual(v, [1, [2], None])
+        self.assertIsInstance(v[1], list)
+
+        value = Cocoa.NSDictionary.dictionaryWithDictionary_(
+            {"a": Cocoa.NSArray.arrayWithArray_([1])}
+        )
+        v = list(Conversion.iterPythonCollectionFromPropertyList(value))
+        self.assertEqual(v, [("a", [1])])
+        self.assertNotIsInstance(v[0][0], objc.pyobjc_unicode)
+
+        value = Cocoa.NSSet.setWithSet_({Cocoa.NSArray.arrayWithArray_([4, 5])})
+        v = list(Conversion.iterPythonCollectionFromPropertyList(value))
+        self.assertEqual(v, [(4, 5)])
+
+        with self.assertRaisesRegex(TypeError, "Expecting a collection"):
+            list(
+                Conversion.iterPythonCollectionFromPropertyList(
+                    Cocoa.NSObject.alloc().init()
+                )
+            )
@@ -23,12 +23,25 @@ if os.uname()[2] < "13.":
         return None
 
 else:
+    # Cache for _first_python. The result only depends on the MRO of
+    # a class, which cannot change for Objective-C classes, and a new
+    # subclass gets its own entry in the cache.
+    _first_python_cache = {}
 
     def _first_python(cls):
-        for cls in cls.mro():  # noqa: B020
-            if "__objc_python_subclass__" in cls.__dict__:
-                return cls
-        return None
+        try:
+            return _first_python_cache[cls]
+        except KeyError:
+            pass
+
+        for base in cls.__mro__:
+            if "__objc_python_subclass__" in base.__dict__:
+                break
+        else:
+            base = None
+
+        _first_python_cache[cls] = base
+        return base
 
 
 def NSMOsetValue_ForKey_(self, name, value):
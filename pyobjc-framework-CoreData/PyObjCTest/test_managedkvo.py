@@ -162,3 +162,28 @@ class TestSubclass(TestCase):
 
         self.assertEqual(testValue, managedObject.attributeWithoutModel)
         self.assertTrue("attributeWithoutModel" in managedObject.__dict__)
+
+
+class TestFirstPython(TestCase):
+    def test_first_python(self):
+        from CoreData import _convenience
+
+        self.assertIs(_convenience._first_python(CoreData.NSManagedObject), None)
+        self.assertIs(
+            _convenience._first_python(CoreDataTestObject), CoreDataTestObject
+        )
+
+        # Repeated lookups use the cache
+        self.assertIs(
+            _convenience._first_python(CoreDataTestObject), CoreDataTestObject
+        )
+
+        class CoreDataTestSubObject(CoreDataTestObject):
+            pass
+
+        self.assertIs(
+            _convenience._first_python(CoreDataTestSubObject), CoreDataTestSubObject
+        )
+        self.assertIs(
+            _convenience._first_python(CoreDataTestObject), CoreDataTestObject
+        )